@@ -1 +1,5 @@
 # Seed Shop Management System - Backend Application
+import time
+
+# Reference point for the startup profiler (app/utils/startup.py)
+IMPORT_STARTED = time.perf_counter()
@@ -11,13 +11,131 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
+    # Refresh tokens make short access tokens cheap; see /api/auth/refresh
+    JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # 'jose' (python-jose) or 'hmac' (stdlib verifier for HS256/384/512)
+    JWT_BACKEND: str = "jose"
+
+    # Verified-token cache
+    TOKEN_CACHE_SIZE: int = 4096
+    TOKEN_CACHE_NEGATIVE_TTL_SECONDS: float = 30
+    TOKEN_CACHE_EXPIRY_MARGIN_SECONDS: float = 5
 
     # Database
     DATABASE_URL: str = "sqlite:///./seed_shop.db"
 
+    # Connection pool and query limits for server databases (PostgreSQL)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    # Rows fetched per round trip when streaming catalog lists
+    DB_STREAM_BATCH_SIZE: int = 500
+
     # Environment
     ENVIRONMENT: str = "development"
 
+    # Multi-worker serving
+    WORKERS: int = 1
+    STARTUP_LOCK_PATH: str = "./seed_shop.startup.lock"
+    SHARED_STATE_BACKEND: str = "local"  # 'local' or 'sqlite'
+    SHARED_STATE_PATH: str = "./seed_shop.state.db"
+    SHARED_STATE_POLL_SECONDS: float = 0.5
+
+    # Expiry of a restocked lot when the restock gives none (days after packing)
+    SEED_LOT_SHELF_LIFE_DAYS: int = 365
+
+    # Multi-store inventory: comma-separated store ids, each stocked in its
+    # own SQLite shard under STORE_SHARD_DIR (empty: no stores)
+    STORES: str = ""
+    STORE_SHARD_DIR: str = "./shards"
+    # How often shard stock changes are rolled up into cross-store totals
+    STORE_ROLLUP_INTERVAL_SECONDS: float = 1.0
+
+    # Background jobs (app/services/jobs.py): worker threads per app process
+    JOB_RUNNER: bool = True
+    JOB_WORKERS: int = 2
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    # Retry n waits JOB_RETRY_BASE_SECONDS * 2**(n-1), capped
+    JOB_RETRY_BASE_SECONDS: float = 2.0
+    JOB_RETRY_MAX_SECONDS: float = 300.0
+    # A running job whose worker vanished is requeued after this long
+    JOB_LEASE_SECONDS: float = 600.0
+    # On shutdown, wait this long for running jobs to finish
+    JOB_DRAIN_SECONDS: float = 30.0
+
+    # SQLite maintenance (app/services/maintenance.py), run by one process
+    MAINTENANCE_ENABLED: bool = True
+    MAINTENANCE_LOCK_PATH: str = "./seed_shop.maintenance.lock"
+    MAINTENANCE_TICK_SECONDS: float = 30.0
+    # Due tasks wait for a tick with at most this many requests per second,
+    # unless they are overdue by twice their interval
+    MAINTENANCE_IDLE_RPS: float = 2.0
+    MAINTENANCE_ANALYZE_HOURS: float = 24.0
+    MAINTENANCE_OPTIMIZE_HOURS: float = 1.0
+    MAINTENANCE_CHECKPOINT_SECONDS: float = 300.0
+    MAINTENANCE_VACUUM_HOURS: float = 1.0
+    # Free pages returned to the OS per incremental vacuum step
+    MAINTENANCE_VACUUM_PAGES: int = 2000
+    # Rows sampled per index by ANALYZE (SQLite analysis_limit)
+    MAINTENANCE_ANALYSIS_LIMIT: int = 1000
+
+    # Online backups (app/services/backups.py)
+    BACKUP_DIR: str = "./backups"
+    # Snapshots kept after each backup; older ones are deleted
+    BACKUP_KEEP: int = 7
+    # Pages copied per backup step, and the pause after each step that
+    # leaves the disk and the GIL to requests
+    BACKUP_STEP_PAGES: int = 256
+    BACKUP_STEP_SLEEP_SECONDS: float = 0.01
+    # gzip level for snapshots; 0 keeps them as plain .db files
+    BACKUP_COMPRESS_LEVEL: int = 6
+    # Run PRAGMA quick_check on every copy before keeping it
+    BACKUP_VERIFY: bool = True
+
+    # Audit log of catalog mutations (app/services/audit.py): entries are
+    # buffered in memory and inserted in batches by a background task
+    AUDIT_LOG: bool = True
+    AUDIT_FLUSH_SECONDS: float = 1.0
+    AUDIT_BATCH_SIZE: int = 500
+    # Entries held in memory at most; beyond it new entries are dropped
+    # (and counted) rather than slowing requests down
+    AUDIT_BUFFER_MAX: int = 50000
+    # Entries that cannot be inserted on shutdown are appended here and
+    # inserted on the next start
+    AUDIT_SPILL_PATH: str = "./seed_shop.audit-spill.jsonl"
+
+    # "Frequently bought together" (app/services/recommendations.py)
+    RECOMMENDATIONS_TOP_K: int = 10
+    # Hours between rebuilds of the co-occurrence matrix from all orders;
+    # 0 leaves it to the incremental updates made at checkout
+    RECOMMENDATIONS_REBUILD_HOURS: float = 24.0
+
+    # Demand forecasts and reorder suggestions (app/services/forecast.py)
+    # Hours between forecast runs; 0 runs them only on demand
+    FORECAST_REBUILD_HOURS: float = 24.0
+    # Days of sales history read; a year and more adds seasonality
+    FORECAST_HISTORY_DAYS: int = 730
+    # Half-life in days of the weighting behind the recent demand rate
+    FORECAST_HALF_LIFE_DAYS: float = 14.0
+    # Days until a reorder arrives, and days of demand it should cover
+    FORECAST_LEAD_TIME_DAYS: int = 7
+    FORECAST_COVER_DAYS: int = 28
+    # Safety stock in standard deviations of daily demand (1.65 ~ 95%)
+    FORECAST_SERVICE_Z: float = 1.65
+    # Seeds per block of the SKU x day matrix, which bounds memory
+    FORECAST_CHUNK_SEEDS: int = 20000
+
+    # Answer GET /api/seeds/query from an in-memory columnar snapshot
+    CATALOG_SNAPSHOT: bool = False
+
+    # Group-commit purchases: coalesce concurrent purchases into one transaction
+    PURCHASE_BATCHING: bool = False
+    PURCHASE_BATCH_WINDOW_MS: float = 2.0
+    PURCHASE_BATCH_MAX: int = 256
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,25 +1,117 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, CheckConstraint
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.sql import func
-from app.config import settings
 import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+from fastapi import Depends
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from app.config import settings
+from app.migrations import LATEST_VERSION as SCHEMA_VERSION
+
+
+def _sqlite_file(url: str) -> Optional[str]:
+    """Absolute path of a file-backed SQLite URL, else None"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return None
+    database = parsed.database
+    if not database or database == ":memory:" or database.startswith("file:"):
+        return None
+    return os.path.abspath(database)
+
+
+def postgres_engine_options() -> dict:
+    """Pool and connection settings for a PostgreSQL engine.
+
+    Connections are pinged on checkout so a restarted server or a dropped
+    idle connection costs a reconnect instead of a failed request, and every
+    statement runs under a server-side statement_timeout.
+    """
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,
+        "connect_args": {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}",
+        },
+    }
+
+
+def create_engines(url: str):
+    """Build the (writer, reader) engine pair for a database URL.
+
+    For a SQLite file the writer is a single pooled connection in WAL mode,
+    so writes are serialized in-process instead of fighting over the file
+    lock, and the reader pool opens mode=ro connections that never block
+    behind the writer. PostgreSQL handles concurrent writers itself and gets
+    one tuned pool for both roles, as do other databases.
+    """
+    if make_url(url).get_backend_name() == "postgresql":
+        engine = create_engine(url, **postgres_engine_options())
+        return engine, engine
+
+    path = _sqlite_file(url)
+    if path is None:
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False} if url.startswith("sqlite") else {}
+        )
+        return engine, engine
+
+    writer = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+    )
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+    @event.listens_for(writer, "connect")
+    def _configure_writer(dbapi_conn, _):
+        # Takes effect only while the file is still empty; older databases
+        # switch with the maintenance task enable_incremental_vacuum
+        dbapi_conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA synchronous=NORMAL")
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    reader = create_engine(
+        f"sqlite:///file:{path}?mode=ro&uri=true",
+        connect_args={"check_same_thread": False},
+        # Never make a request wait for a read connection
+        pool_size=8,
+        max_overflow=-1,
+    )
+    return writer, reader
+
+
+# Create database engines
+engine, read_engine = create_engines(settings.DATABASE_URL)
+
+# Create session factories. Writer sessions keep objects loaded after commit
+# so a mutation can release the single writer connection and still return
+# the updated row.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Base class for models
 Base = declarative_base()
 
 
-# Dependency to get database session
-def get_db():
+# Dependency to get a read-only database session
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency to get a session on the writer connection
+def get_write_db():
     db = SessionLocal()
     try:
         yield db
@@ -27,8 +119,116 @@ def get_db():
         db.close()
 
 
+# Base class for per-store shard models (app/models/store.py). Only these
+# tables live in a shard; the catalog, users and rollups stay on Base.
+ShardBase = declarative_base()
+
+STORE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+
+def configured_stores() -> List[str]:
+    """Store ids from the STORES setting"""
+    stores = [s.strip() for s in settings.STORES.split(",") if s.strip()]
+    for store_id in stores:
+        if not STORE_ID_PATTERN.match(store_id):
+            raise ValueError(f"Invalid store id in STORES: {store_id!r}")
+    return stores
+
+
+class ShardRouter:
+    """Routes each store's inventory sessions to that store's SQLite file.
+
+    Every shard gets the same writer/reader engine pair as the main database
+    (see create_engines), so stores never wait on each other's write lock.
+    Shards are opened, and their tables created, on first use.
+    """
+
+    def __init__(self, stores: List[str], shard_dir: str):
+        self.stores = list(stores)
+        self.shard_dir = shard_dir
+        self._factories: Dict[str, Tuple[sessionmaker, sessionmaker]] = {}
+        self._lock = threading.Lock()
+
+    def url(self, store_id: str) -> str:
+        return f"sqlite:///{os.path.join(self.shard_dir, f'store_{store_id}.db')}"
+
+    def session(self, store_id: str, write: bool = True) -> Session:
+        """A new session on the store's shard; KeyError for unknown stores"""
+        factories = self._factories.get(store_id)
+        if factories is None:
+            factories = self._open(store_id)
+        return factories[0 if write else 1]()
+
+    def _open(self, store_id: str) -> Tuple[sessionmaker, sessionmaker]:
+        if store_id not in self.stores:
+            raise KeyError(store_id)
+        with self._lock:
+            if store_id not in self._factories:
+                import app.models  # noqa: F401 - register the shard models
+                os.makedirs(self.shard_dir, exist_ok=True)
+                writer, reader = create_engines(self.url(store_id))
+                ShardBase.metadata.create_all(bind=writer)
+                self._factories[store_id] = (
+                    sessionmaker(bind=writer, autoflush=False, expire_on_commit=False),
+                    sessionmaker(bind=reader, autoflush=False),
+                )
+            return self._factories[store_id]
+
+    def dispose(self) -> None:
+        with self._lock:
+            for writer, reader in self._factories.values():
+                writer.kw["bind"].dispose()
+                reader.kw["bind"].dispose()
+            self._factories.clear()
+
+
+shard_router = ShardRouter(configured_stores(), settings.STORE_SHARD_DIR)
+
+
+# Sessions are closed as soon as the endpoint returns, before the response
+# is sent, so a pooled connection (the writer has only one) is never held
+# while the event loop serves other requests.
+ReadDB = Depends(get_read_db, scope="function")
+WriteDB = Depends(get_write_db, scope="function")
+
+
+def get_schema_version(bind=None):
+    """Return the schema version recorded in app_meta, or None"""
+    bind = bind or engine
+    try:
+        with bind.connect() as conn:
+            value = conn.execute(
+                text("SELECT value FROM app_meta WHERE key = 'schema_version'")
+            ).scalar()
+    except DBAPIError:
+        # app_meta does not exist yet
+        return None
+    return int(value) if value is not None else None
+
+
 # Initialize database
-def init_db():
-    """Create all tables"""
-    Base.metadata.create_all(bind=engine)
+def init_db(bind=None):
+    """Bring the schema up to date unless it is already current.
 
+    New tables come from create_all; changes to existing tables come from
+    app/migrations. Returns True when anything ran.
+    """
+    bind = bind or engine
+    current_version = get_schema_version(bind)
+    if current_version == SCHEMA_VERSION:
+        return False
+
+    import app.models  # noqa: F401 - register every model on Base
+    from app.migrations import apply_migrations
+    from app.models.meta import set_meta
+
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        apply_migrations(conn, current_version or 1)
+    db = SessionLocal(bind=bind)
+    try:
+        set_meta(db, "schema_version", SCHEMA_VERSION)
+        db.commit()
+    finally:
+        db.close()
+    return True
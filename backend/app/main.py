@@ -1,11 +1,56 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db, SessionLocal
-from app.routers import auth, seeds, inventory
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.database import engine, init_db, SessionLocal
+from app.routers import (
+    auth, seeds, inventory, stores, jobs, admin, audit, pricing, orders, analytics)
 from app.models.seed import Seed
+from app.models.meta import get_meta, set_meta
+from app.services.audit import start_audit_log, stop_audit_log
+from app.services.catalog import CatalogError
+from app.services.forecast import schedule_forecasts
+from app.services.jobs import (
+    enqueue, find_job, retry_failed, start_job_runner, stop_job_runner)
+from app.services.leader import database_lock, file_lock
+from app.services.maintenance import ActivityMeter, start_maintenance, stop_maintenance
+from app.services.purchase_queue import start_purchase_batching, stop_purchase_batching
+from app.services.recommendations import schedule_rebuilds
+from app.services.shared_state import get_shared_state, close_shared_state
+from app.services.stores import start_store_rollup, stop_store_rollup
+from app.utils.startup import profiler, FirstRequestTimer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Workers take turns so schema creation and seeding run exactly once
+    with file_lock(settings.STARTUP_LOCK_PATH), database_lock(engine):
+        run_startup_tasks()
+    get_shared_state().start()
+    await start_audit_log()
+    await start_purchase_batching()
+    await start_store_rollup()
+    await start_job_runner()
+    await start_maintenance()
+    profiler.mark_ready()
+    # Build the OpenAPI schema off the boot path so /docs never waits on it
+    warmup = asyncio.create_task(asyncio.to_thread(app.openapi))
+    yield
+    await warmup
+    await stop_purchase_batching()
+    await stop_store_rollup()
+    await stop_job_runner()
+    await stop_maintenance()
+    # Last: requests and jobs above may still record entries
+    await stop_audit_log()
+    close_shared_state()
+
 
 # Initialize FastAPI app with OpenAPI security scheme for Swagger
 app = FastAPI(
+    lifespan=lifespan,
     title="Seed Shop Management System API",
     description="RESTful API for managing a seed shop inventory",
     version="1.0.0",
@@ -20,6 +65,7 @@ app.openapi_schema = None
 
 
 def get_openapi():
+    """Build the OpenAPI schema on first use; nothing is generated at boot"""
     if app.openapi_schema:
         return app.openapi_schema
     from fastapi.openapi.utils import get_openapi
@@ -57,70 +103,43 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(FirstRequestTimer)
+app.add_middleware(ActivityMeter)
 
-# Initialize database
 
+@app.exception_handler(CatalogError)
+async def catalog_error_handler(request: Request, exc: CatalogError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
-@app.on_event("startup")
-async def startup_event():
-    init_db()
+
+def run_startup_tasks():
+    """Create the schema and seed default data (run under the startup lock)"""
+    with profiler.phase("init_db"):
+        init_db()
     db = SessionLocal()
     try:
-        count = db.query(Seed).count()
-        if count == 0:
-            default_seeds = [
-                {"name": "Sunflower Seed", "category": "Flower", "price": 25.00, "quantity": 50, "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='40' fill='%23FFD700'/%3E%3Ccircle cx='50' cy='30' r='5' fill='%23FFA500'/%3E%3Ccircle cx='65' cy='35' r='5' fill='%23FFA500'/%3E%3Ccircle cx='70' cy='50' r='5' fill='%23FFA500'/%3E%3Ccircle cx='65' cy='65' r='5' fill='%23FFA500'/%3E%3Ccircle cx='50' cy='70' r='5' fill='%23FFA500'/%3E%3Ccircle cx='35' cy='65' r='5' fill='%23FFA500'/%3E%3Ccircle cx='30' cy='50' r='5' fill='%23FFA500'/%3E%3Ccircle cx='35' cy='35' r='5' fill='%23FFA500'/%3E%3C/svg%3E"},
-                {"name": "Pumpkin Seed", "category": "Vegetable", "price": 20.00, "quantity": 60,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cellipse cx='50' cy='50' rx='35' ry='38' fill='%23FF8C00'/%3E%3Cline x1='50' y1='15' x2='50' y2='85' stroke='%23228B22' stroke-width='2'/%3E%3Cline x1='20' y1='50' x2='80' y2='50' stroke='%23228B22' stroke-width='2'/%3E%3C/svg%3E"},
-                {"name": "Sesame Seed", "category": "Herb", "price": 45.00, "quantity": 40, "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='30' cy='30' r='8' fill='%23F5DEB3'/%3E%3Ccircle cx='70' cy='30' r='8' fill='%23F5DEB3'/%3E%3Ccircle cx='30' cy='70' r='8' fill='%23F5DEB3'/%3E%3Ccircle cx='70' cy='70' r='8' fill='%23F5DEB3'/%3E%3Ccircle cx='50' cy='50' r='8' fill='%23F5DEB3'/%3E%3C/svg%3E"},
-                {"name": "Chia Seed", "category": "Superfood", "price": 30.00, "quantity": 55,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='35' fill='%23333333'/%3E%3Ccircle cx='50' cy='50' r='25' fill='%23555555'/%3E%3C/svg%3E"},
-                {"name": "Flaxseed", "category": "Superfood", "price": 15.00, "quantity": 80,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cellipse cx='50' cy='50' rx='15' ry='30' fill='%23CD853F'/%3E%3Cellipse cx='50' cy='50' rx='10' ry='25' fill='%23DEB887'/%3E%3C/svg%3E"},
-                {"name": "Quinoa Seed", "category": "Grain", "price": 35.00, "quantity": 45,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='30' fill='%23F5F5DC'/%3E%3Ccircle cx='40' cy='45' r='8' fill='%23DAA520'/%3E%3Ccircle cx='60' cy='45' r='8' fill='%23DAA520'/%3E%3Ccircle cx='50' cy='65' r='8' fill='%23DAA520'/%3E%3C/svg%3E"},
-                {"name": "Mustard Seed", "category": "Spice", "price": 40.00, "quantity": 35,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='35' fill='%23B8860B'/%3E%3Ccircle cx='50' cy='50' r='20' fill='%23DAA520'/%3E%3C/svg%3E"},
-                {"name": "Cumin Seed", "category": "Spice", "price": 28.00, "quantity": 50,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Crect x='20' y='40' width='60' height='20' fill='%238B7355'/%3E%3Ccircle cx='35' cy='50' r='4' fill='%235C4033'/%3E%3Ccircle cx='50' cy='50' r='4' fill='%235C4033'/%3E%3Ccircle cx='65' cy='50' r='4' fill='%235C4033'/%3E%3C/svg%3E"},
-                {"name": "Fennel Seed", "category": "Spice", "price": 32.00, "quantity": 60,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cellipse cx='50' cy='50' rx='12' ry='28' fill='%238B7355'/%3E%3Cline x1='40' y1='50' x2='60' y2='50' stroke='%235C4033' stroke-width='2'/%3E%3C/svg%3E"},
-                {"name": "Caraway Seed", "category": "Spice", "price": 38.00, "quantity": 55,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cellipse cx='50' cy='50' rx='14' ry='26' fill='%23654321'/%3E%3C/svg%3E"},
-                {"name": "Coriander Seed", "category": "Spice", "price": 35.00, "quantity": 65,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='32' fill='%23D2B48C'/%3E%3Ccircle cx='50' cy='50' r='18' fill='%23C19A6B'/%3E%3C/svg%3E"},
-                {"name": "Fenugreek Seed", "category": "Herb", "price": 42.00, "quantity": 48, "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Crect x='30' y='35' width='40' height='30' fill='%238B4513'/%3E%3Cline x1='35' y1='40' x2='65' y2='40' stroke='%23654321' stroke-width='2'/%3E%3Cline x1='35' y1='50' x2='65' y2='50' stroke='%23654321' stroke-width='2'/%3E%3Cline x1='35' y1='60' x2='65' y2='60' stroke='%23654321' stroke-width='2'/%3E%3C/svg%3E"},
-                {"name": "Hemp Seed", "category": "Superfood", "price": 50.00, "quantity": 35,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='35' fill='%235C4033'/%3E%3Ccircle cx='50' cy='50' r='22' fill='%238B6F47'/%3E%3C/svg%3E"},
-                {"name": "Sesame Seed (Black)", "category": "Herb", "price": 48.00, "quantity": 42,
-                 "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='30' fill='%23000000'/%3E%3Ccircle cx='50' cy='50' r='15' fill='%23333333'/%3E%3C/svg%3E"},
-                {"name": "Sunflower Seed (Striped)", "category": "Flower", "price": 28.00, "quantity": 58,
-                 "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cellipse cx='50' cy='50' rx='28' ry='35' fill='%23FFD700'/%3E%3Cline x1='25' y1='50' x2='75' y2='50' stroke='%23808080' stroke-width='3'/%3E%3C/svg%3E"},
-                {"name": "Pumpkin Seed (Raw)", "category": "Vegetable", "price": 22.00, "quantity": 70,
-                 "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cellipse cx='50' cy='50' rx='30' ry='32' fill='%23228B22'/%3E%3C/svg%3E"},
-                {"name": "Watermelon Seed", "category": "Vegetable", "price": 18.00, "quantity": 75,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Cellipse cx='50' cy='50' rx='25' ry='28' fill='%23000000'/%3E%3Cellipse cx='50' cy='50' rx='18' ry='22' fill='%23333333'/%3E%3C/svg%3E"},
-                {"name": "Muskmelon Seed", "category": "Vegetable", "price": 19.00, "quantity": 68,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='30' fill='%23F4A460'/%3E%3Ccircle cx='50' cy='50' r='18' fill='%23DEB887'/%3E%3C/svg%3E"},
-                {"name": "Poppy Seed", "category": "Herb", "price": 55.00, "quantity": 30,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='32' fill='%23696969'/%3E%3Ccircle cx='50' cy='50' r='18' fill='%23505050'/%3E%3C/svg%3E"},
-                {"name": "Nigella Seed", "category": "Spice", "price": 44.00, "quantity": 40,
-                    "image": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'%3E%3Ccircle cx='50' cy='50' r='28' fill='%23000000'/%3E%3Ccircle cx='45' cy='45' r='4' fill='%23333333'/%3E%3Ccircle cx='55' cy='45' r='4' fill='%23333333'/%3E%3Ccircle cx='50' cy='60' r='4' fill='%23333333'/%3E%3C/svg%3E"},
-            ]
-            # Insert only seeds that don't already exist (by name)
-            existing_names = {n[0].lower() for n in db.query(Seed.name).all()}
-            added = 0
-            for s in default_seeds:
-                if s["name"].lower() not in existing_names:
-                    db.add(Seed(**s))
-                    existing_names.add(s["name"].lower())
-                    added += 1
-            if added > 0:
-                db.commit()
-            print(
-                f"Seeded default seeds: {added} new items (of {len(default_seeds)} defaults)")
-        else:
-            print(f"Database already has {count} seeds; skipping seeding.")
+        with profiler.phase("default_seeds"):
+            # One-shot: once recorded, restarts skip the seeds table entirely.
+            # Seeding records it when it commits, so a seeding job that
+            # failed or never ran is queued again on the next start.
+            from app.seed_data import (
+                DEFAULT_SEEDS_JOB, DEFAULT_SEEDS_MARKER, load_default_seeds)
+            if get_meta(db, DEFAULT_SEEDS_MARKER) is None:
+                count = db.query(Seed).count()
+                job = find_job(db, DEFAULT_SEEDS_JOB)
+                if count and (job is None or job.status == "succeeded"):
+                    print(f"Database already has {count} seeds; skipping seeding.")
+                    set_meta(db, DEFAULT_SEEDS_MARKER, "1")
+                    db.commit()
+                elif settings.JOB_RUNNER:
+                    job = retry_failed(db, job or enqueue(db, DEFAULT_SEEDS_JOB,
+                                                          dedupe_key=DEFAULT_SEEDS_JOB))
+                    print(f"Queued default seeding as job {job.id}")
+                else:
+                    print(f"Loaded {load_default_seeds(db)['added']} default seeds")
+        with profiler.phase("schedule_jobs"):
+            schedule_rebuilds(db)
+            schedule_forecasts(db)
     except Exception:
         db.rollback()
         raise
@@ -131,6 +150,13 @@ async def startup_event():
 app.include_router(auth.router)
 app.include_router(seeds.router)
 app.include_router(inventory.router)
+app.include_router(stores.router)
+app.include_router(jobs.router)
+app.include_router(admin.router)
+app.include_router(audit.router)
+app.include_router(pricing.router)
+app.include_router(orders.router)
+app.include_router(analytics.router)
 
 
 @app.get("/")
@@ -145,3 +171,23 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/startup")
+async def startup_report():
+    """Boot phase timings and time to first served request"""
+    return profiler.report()
+
+
+@app.get("/health/catalog-flights")
+async def catalog_flights_report():
+    """How many list/search requests shared another request's query"""
+    from app.services.catalog import catalog_flights
+    return catalog_flights.stats()
+
+
+@app.get("/health/token-cache")
+async def token_cache_report():
+    """Verified-token cache size and hit rates"""
+    from app.utils.auth import token_cache
+    return token_cache.stats()
@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import ReadDB
 from app.models.user import User
 from app.utils.auth import verify_token
 
@@ -10,59 +10,49 @@ security = HTTPBearer(auto_error=False)
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: Session = ReadDB
 ) -> User:
     """Get the current authenticated user"""
     if not credentials:
-        print("get_current_user: No credentials provided")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    token = credentials.credentials
-    print(f"get_current_user: Token received (first 20 chars): {token[:20]}...")
-    payload = verify_token(token)
-    
+    # Cached: a token seen before is not decoded or re-verified
+    payload = verify_token(credentials.credentials)
     if payload is None:
-        print("get_current_user: Token verification failed")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     user_id_str = payload.get("sub")
     if user_id_str is None:
-        print("get_current_user: No user ID in token payload")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     # Convert string to int (JWT sub must be string)
     try:
         user_id = int(user_id_str)
     except (ValueError, TypeError):
-        print(f"get_current_user: Invalid user ID format: {user_id_str}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    print(f"get_current_user: Looking up user with ID {user_id}")
-    user = db.query(User).filter(User.id == user_id).first()
+
+    user = db.get(User, user_id)
     if user is None:
-        print(f"get_current_user: User with ID {user_id} not found in database")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    print(f"get_current_user: User authenticated - {user.email}")
     return user
 
 
@@ -77,3 +67,20 @@ async def get_current_admin_user(
         )
     return current_user
 
+
+async def get_store_access(
+    store_id: str,
+    current_user: User = Depends(get_current_user)
+) -> str:
+    """The store in the path, if the user is a member of it.
+
+    Membership is read from the user row, which only admins can change
+    (PUT /api/admin/users/{id}/store), not from the token's `store` claim.
+    Admins may act on any store.
+    """
+    if current_user.role != "admin" and current_user.store_id != store_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this store"
+        )
+    return store_id
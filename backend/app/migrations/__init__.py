@@ -0,0 +1,58 @@
+"""Lightweight built-in schema migrations.
+
+Each migration module defines VERSION, DESCRIPTION and `upgrade(conn)`.
+`init_db` runs `Base.metadata.create_all` for brand-new tables and then
+applies every migration newer than the version recorded in app_meta, so
+migrations must be idempotent (IF NOT EXISTS, column checks) because a
+fresh database already has what create_all built from the models.
+"""
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from app.migrations import (
+    m0002_catalog_indexes, m0003_refresh_tokens, m0004_change_seq, m0005_category_facets,
+    m0006_seed_lots, m0007_stores, m0008_jobs, m0009_audit_log, m0010_price_history,
+    m0011_pricing_rules, m0012_orders, m0013_sales_forecast, m0014_change_sequences)
+
+# Version 1 is the original create_all schema, before migrations existed
+MIGRATIONS = [
+    m0002_catalog_indexes,
+    m0003_refresh_tokens,
+    m0004_change_seq,
+    m0005_category_facets,
+    m0006_seed_lots,
+    m0007_stores,
+    m0008_jobs,
+    m0009_audit_log,
+    m0010_price_history,
+    m0011_pricing_rules,
+    m0012_orders,
+    m0013_sales_forecast,
+    m0014_change_sequences,
+]
+
+LATEST_VERSION = max([1] + [m.VERSION for m in MIGRATIONS])
+
+
+def pending(current_version: int) -> List:
+    return [m for m in sorted(MIGRATIONS, key=lambda m: m.VERSION)
+            if m.VERSION > current_version]
+
+
+def apply_migrations(conn: Connection, current_version: int) -> List[int]:
+    """Apply migrations newer than `current_version`; returns versions applied"""
+    applied = []
+    for migration in pending(current_version):
+        migration.upgrade(conn)
+        applied.append(migration.VERSION)
+        print(f"Applied migration {migration.VERSION}: {migration.DESCRIPTION}")
+    return applied
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """ALTER TABLE ... ADD COLUMN unless the column is already there"""
+    columns = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in columns:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
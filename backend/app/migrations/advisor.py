@@ -0,0 +1,167 @@
+"""Index advisor: EXPLAIN QUERY PLAN over the app's query mix.
+
+    python -m app.migrations.advisor [--database-url sqlite:///./seed_shop.db]
+
+Runs the statements issued by the catalog service (seeds and inventory
+routers) and the auth router/middleware against a SQLite database and flags
+full table scans. Queries that must scan (listing every row, substring
+ILIKE filters) are reported but not counted as problems.
+"""
+import argparse
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql import Executable
+
+from app.models.forecast import SeedDailySales
+from app.models.lot import LOT_HAS_STOCK, SeedLot
+from app.models.order import Order, OrderLine
+from app.models.recommendation import SeedPair
+from app.models.refresh_token import RefreshToken
+from app.models.seed import Seed, SeedTombstone
+from app.models.user import User
+from app.services.catalog import related_statement, search_statement
+from app.services.forecast import suggestions_statement
+from app.services.lots import expiring_statement, fefo_statement
+from app.services.prices import history_statement, price_at_statement, prices_at_statement
+
+
+@dataclass
+class QueryCase:
+    name: str
+    statement: Executable
+    scan_expected: bool = False
+    note: str = ""
+
+
+@dataclass
+class PlanReport:
+    case: QueryCase
+    plan: List[str]
+    full_scans: List[str]
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.full_scans) and not self.case.scan_expected
+
+
+def query_cases() -> List[QueryCase]:
+    return [
+        QueryCase("seeds: list all", search_statement(), scan_expected=True,
+                  note="returns every row"),
+        QueryCase("seeds: search by name", search_statement(name="sun"),
+                  scan_expected=True, note="leading-wildcard ILIKE cannot use an index"),
+        QueryCase("seeds: search by category", search_statement(category="spice"),
+                  scan_expected=True, note="leading-wildcard ILIKE cannot use an index"),
+        QueryCase("seeds: search by price range",
+                  search_statement(min_price=10, max_price=30)),
+        QueryCase("seeds: category + price range",
+                  select(Seed.id).where(Seed.category == "Spice",
+                                        Seed.price.between(10, 30))),
+        QueryCase("seeds: changes since a sequence (delta sync)",
+                  search_statement().where(Seed.change_seq > 100)
+                  .order_by(Seed.change_seq).limit(1000)),
+        QueryCase("seeds: tombstones since a sequence (delta sync)",
+                  select(SeedTombstone.seed_id).where(SeedTombstone.change_seq > 100)
+                  .order_by(SeedTombstone.change_seq).limit(1000)),
+        QueryCase("seeds: get by id (get/update/purchase/restock)",
+                  select(Seed).where(Seed.id == 1)),
+        QueryCase("lots: first-expiring lots of a seed (FEFO purchase)",
+                  fefo_statement(1, 3)),
+        QueryCase("lots: lots with stock expiring soon (report)",
+                  expiring_statement(date(2030, 1, 1), 500)),
+        QueryCase("lots: a seed's lots with stock",
+                  select(SeedLot.id).where(SeedLot.seed_id == 1, LOT_HAS_STOCK)
+                  .order_by(SeedLot.expires_on, SeedLot.id)),
+        QueryCase("prices: a seed's price at a time",
+                  price_at_statement(1, datetime(2030, 1, 1))),
+        QueryCase("prices: every seed's price at a time",
+                  prices_at_statement(datetime(2030, 1, 1)), scan_expected=True,
+                  note="scans its own CTE of seed ids; seed_prices is only seeked"),
+        QueryCase("prices: a seed's price history",
+                  history_statement(1, 100)),
+        QueryCase("orders: a user's orders, newest first",
+                  select(Order).where(Order.user_id == 1).order_by(Order.id.desc()).limit(21)),
+        QueryCase("orders: lines of a page of orders",
+                  select(OrderLine).where(OrderLine.order_id.in_([1, 2, 3]))
+                  .order_by(OrderLine.id)),
+        QueryCase("recommendations: a seed's related seeds",
+                  related_statement(1, 10)),
+        QueryCase("recommendations: pair counts within an order (checkout)",
+                  select(SeedPair.orders).where(SeedPair.seed_id.in_([1, 2, 3]),
+                                                SeedPair.related_id.in_([1, 2, 3]))),
+        QueryCase("forecast: a chunk of seeds' daily sales",
+                  select(SeedDailySales.seed_id, SeedDailySales.day, SeedDailySales.units)
+                  .where(SeedDailySales.seed_id.between(1, 20000),
+                         SeedDailySales.day >= 19000)),
+        QueryCase("forecast: seeds to reorder, least cover first",
+                  suggestions_statement(50)),
+        QueryCase("auth: user by email (login/register)",
+                  select(User).where(User.email == "someone@example.com")),
+        QueryCase("auth: user by id (get_current_user)",
+                  select(User).where(User.id == 1)),
+        QueryCase("auth: refresh token by hash (refresh/logout)",
+                  select(RefreshToken).where(RefreshToken.token_hash == "0" * 64)),
+        QueryCase("auth: live refresh tokens by family (reuse revocation)",
+                  select(RefreshToken.id).where(RefreshToken.family_id == "f",
+                                                RefreshToken.revoked_at.is_(None))),
+    ]
+
+
+def explain(conn, statement: Executable) -> List[str]:
+    sql = statement.compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return [row[-1] for row in rows]
+
+
+def is_full_scan(detail: str) -> bool:
+    # "SCAN seeds" is a table scan; "SCAN seeds USING [COVERING] INDEX" is not
+    return detail.startswith("SCAN ") and " USING " not in detail
+
+
+def analyze(engine, cases: List[QueryCase] = None) -> List[PlanReport]:
+    reports = []
+    with engine.connect() as conn:
+        for case in cases or query_cases():
+            try:
+                plan = explain(conn, case.statement)
+            except DBAPIError as e:
+                # e.g. a table added by a migration not yet applied
+                conn.rollback()
+                plan = [f"unavailable: {e.orig}"]
+            reports.append(PlanReport(case, plan, [d for d in plan if is_full_scan(d)]))
+    return reports
+
+
+def main(argv=None) -> int:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    args = parser.parse_args(argv)
+    if not args.database_url.startswith("sqlite"):
+        print("The index advisor only understands SQLite query plans")
+        return 2
+
+    engine = create_engine(args.database_url)
+    reports = analyze(engine)
+    for report in reports:
+        marker = "FULL SCAN" if report.flagged else (
+            "scan (expected)" if report.full_scans else "ok")
+        print(f"[{marker}] {report.case.name}")
+        for detail in report.plan:
+            print(f"    {detail}")
+        if report.case.note and report.full_scans:
+            print(f"    note: {report.case.note}")
+    flagged = [r for r in reports if r.flagged]
+    print(f"\n{len(flagged)} of {len(reports)} queries need an index")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
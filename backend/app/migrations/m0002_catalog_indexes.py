@@ -0,0 +1,19 @@
+"""Composite indexes for the catalog query mix.
+
+(category, price) serves category + price-range searches and per-category
+min/max lookups; (price) serves price-range-only searches. The old
+single-column category index is a prefix of the composite one and only
+costs writes, so it is dropped.
+"""
+from sqlalchemy import text
+
+VERSION = 2
+DESCRIPTION = "seeds (category, price) and (price) indexes"
+
+
+def upgrade(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_seeds_category_price ON seeds (category, price)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_seeds_price ON seeds (price)"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_seeds_category"))
@@ -0,0 +1,12 @@
+"""refresh_tokens table for the refresh/rotation flow.
+
+init_db's create_all builds the table; upgrade() only creates it when the
+migration is applied on its own.
+"""
+VERSION = 3
+DESCRIPTION = "refresh_tokens table"
+
+
+def upgrade(conn):
+    from app.models.refresh_token import RefreshToken
+    RefreshToken.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,25 @@
+"""Delta sync: seeds.change_seq, seed tombstones and the catalog counter.
+
+Existing rows keep change_seq 0; clients pick them up with their initial
+full sync (no `since`).
+"""
+from sqlalchemy import text
+
+VERSION = 4
+DESCRIPTION = "seeds.change_seq, seed_tombstones, catalog change counter"
+
+
+def upgrade(conn):
+    from app.migrations import add_column_if_missing
+    from app.models.meta import SequenceCounter
+    from app.models.seed import SeedTombstone
+
+    add_column_if_missing(conn, "seeds", "change_seq", "INTEGER NOT NULL DEFAULT 0")
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_seeds_change_seq ON seeds (change_seq)"))
+    SeedTombstone.__table__.create(conn, checkfirst=True)
+    SequenceCounter.__table__.create(conn, checkfirst=True)
+    exists = conn.execute(
+        text("SELECT 1 FROM counters WHERE name = 'catalog'")).scalar()
+    if not exists:
+        conn.execute(text("INSERT INTO counters (name, value) VALUES ('catalog', 0)"))
@@ -0,0 +1,13 @@
+"""Category facet tables, filled from the existing seeds."""
+
+VERSION = 5
+DESCRIPTION = "category_stats and category_price_buckets"
+
+
+def upgrade(conn):
+    from app.models.facets import CategoryPriceBucket, CategoryStats
+    from app.services.facets import rebuild_facets
+
+    CategoryStats.__table__.create(conn, checkfirst=True)
+    CategoryPriceBucket.__table__.create(conn, checkfirst=True)
+    rebuild_facets(conn)
@@ -0,0 +1,15 @@
+"""Seed lots, with one lot backfilled per seed that has stock."""
+
+VERSION = 6
+DESCRIPTION = "seed_lots with FEFO and expiry partial indexes, backfilled from stock"
+
+
+def upgrade(conn):
+    from app.models.lot import SeedLot
+    from app.services.lots import backfill_lots
+
+    table = SeedLot.__table__
+    table.create(conn, checkfirst=True)
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+    backfill_lots(conn)
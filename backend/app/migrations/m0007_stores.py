@@ -0,0 +1,16 @@
+"""Multi-store inventory: users.store_id and the cross-store rollup tables.
+
+Per-store stock lives in the store shards, created on first use.
+"""
+
+VERSION = 7
+DESCRIPTION = "users.store_id, store_stock_totals, store_rollup_cursors"
+
+
+def upgrade(conn):
+    from app.migrations import add_column_if_missing
+    from app.models.store import StoreRollupCursor, StoreStockTotal
+
+    add_column_if_missing(conn, "users", "store_id", "VARCHAR")
+    StoreStockTotal.__table__.create(conn, checkfirst=True)
+    StoreRollupCursor.__table__.create(conn, checkfirst=True)
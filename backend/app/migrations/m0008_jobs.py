@@ -0,0 +1,10 @@
+"""Durable background job queue."""
+
+VERSION = 8
+DESCRIPTION = "jobs table"
+
+
+def upgrade(conn):
+    from app.models.job import Job
+
+    Job.__table__.create(conn, checkfirst=True)
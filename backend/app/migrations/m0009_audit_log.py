@@ -0,0 +1,10 @@
+"""Audit log of catalog mutations."""
+
+VERSION = 9
+DESCRIPTION = "audit_log table"
+
+
+def upgrade(conn):
+    from app.models.audit import AuditEntry
+
+    AuditEntry.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,12 @@
+"""Append-only price history, seeded with every seed's current price."""
+
+VERSION = 10
+DESCRIPTION = "seed_prices history with (seed_id, effective_from) index, backfilled"
+
+
+def upgrade(conn):
+    from app.models.price import SeedPrice
+    from app.services.prices import backfill_prices
+
+    SeedPrice.__table__.create(conn, checkfirst=True)
+    backfill_prices(conn)
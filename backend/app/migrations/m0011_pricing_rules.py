@@ -0,0 +1,10 @@
+"""Pricing rules (discounts, quantity breaks, scheduled promotions)."""
+
+VERSION = 11
+DESCRIPTION = "pricing_rules table"
+
+
+def upgrade(conn):
+    from app.models.pricing import PricingRule
+
+    PricingRule.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,12 @@
+"""Orders and "frequently bought together" recommendations."""
+
+VERSION = 12
+DESCRIPTION = "orders, order_lines, seed_pairs and seed_related tables"
+
+
+def upgrade(conn):
+    from app.models.order import Order, OrderLine
+    from app.models.recommendation import RelatedSeed, SeedPair
+
+    for model in (Order, OrderLine, SeedPair, RelatedSeed):
+        model.__table__.create(conn, checkfirst=True)
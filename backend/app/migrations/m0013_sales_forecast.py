@@ -0,0 +1,13 @@
+"""Daily sales history and reorder suggestions, backfilled from orders."""
+
+VERSION = 13
+DESCRIPTION = "seed_sales_daily and reorder_suggestions tables, sales backfilled from orders"
+
+
+def upgrade(conn):
+    from app.models.forecast import ReorderSuggestion, SeedDailySales
+    from app.services.forecast import backfill_sales
+
+    SeedDailySales.__table__.create(conn, checkfirst=True)
+    ReorderSuggestion.__table__.create(conn, checkfirst=True)
+    backfill_sales(conn)
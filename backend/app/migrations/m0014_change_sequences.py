@@ -0,0 +1,13 @@
+"""PostgreSQL: catalog change numbers from a SEQUENCE, not the counters row.
+
+Does nothing on SQLite, where the single writer keeps the row uncontended.
+"""
+
+VERSION = 14
+DESCRIPTION = "catalog_change_seq sequence and its functions (PostgreSQL only)"
+
+
+def upgrade(conn):
+    from app.models.meta import create_change_sequences
+
+    create_change_sequences(conn)
@@ -1,4 +1,22 @@
 from app.models.user import User
-from app.models.seed import Seed
+from app.models.seed import Seed, SeedTombstone
+from app.models.meta import AppMeta, SequenceCounter
+from app.models.refresh_token import RefreshToken
+from app.models.facets import CategoryStats, CategoryPriceBucket
+from app.models.lot import SeedLot
+from app.models.job import Job
+from app.models.audit import AuditEntry
+from app.models.price import SeedPrice
+from app.models.pricing import PricingRule
+from app.models.order import Order, OrderLine
+from app.models.recommendation import RelatedSeed, SeedPair
+from app.models.forecast import ReorderSuggestion, SeedDailySales
+from app.models.store import StockOutbox, StoreRollupCursor, StoreStock, StoreStockTotal
 
-__all__ = ["User", "Seed"]
+__all__ = [
+    "User", "Seed", "SeedTombstone", "AppMeta", "SequenceCounter", "RefreshToken",
+    "CategoryStats", "CategoryPriceBucket", "SeedLot",
+    "StoreStock", "StockOutbox", "StoreStockTotal", "StoreRollupCursor", "Job",
+    "AuditEntry", "SeedPrice", "PricingRule", "Order", "OrderLine", "SeedPair",
+    "RelatedSeed", "SeedDailySales", "ReorderSuggestion",
+]
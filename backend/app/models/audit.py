@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from app.database import Base
+
+
+class AuditEntry(Base):
+    """Who changed which seed, and how (written by app/services/audit.py)"""
+    __tablename__ = "audit_log"
+
+    id = Column(Integer, primary_key=True)
+    # When the change was committed, not when the entry was flushed
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    actor_id = Column(Integer, nullable=True)
+    # Kept as it was at the time, so entries survive the user being deleted
+    actor_email = Column(String, nullable=True)
+    action = Column(String, nullable=False)  # create, update, delete, restock
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    changes = Column(Text, nullable=False)  # JSON {field: [before, after]}
+
+    __table_args__ = (
+        # Newest-first pages per filter (keyset on id); keep in sync with m0009
+        Index('ix_audit_log_entity', 'entity', 'entity_id', 'id'),
+        Index('ix_audit_log_actor', 'actor_id', 'id'),
+        Index('ix_audit_log_action', 'action', 'id'),
+    )
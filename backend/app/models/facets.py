@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Float, Integer, String
+from app.database import Base
+
+
+class CategoryStats(Base):
+    """Per-category aggregates behind GET /api/seeds/facets.
+
+    Kept current by CatalogService in the same transaction as each seed
+    change (see app/services/facets.py); rebuilt from seeds by migration 5
+    and after the default seeds are loaded.
+    """
+    __tablename__ = "category_stats"
+
+    category = Column(String, primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+    in_stock_count = Column(Integer, nullable=False, default=0)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+
+
+class CategoryPriceBucket(Base):
+    """Seeds per category and price bucket (facets.PRICE_BUCKETS)"""
+    __tablename__ = "category_price_buckets"
+
+    category = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True, autoincrement=False)
+    item_count = Column(Integer, nullable=False, default=0)
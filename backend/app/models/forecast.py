@@ -0,0 +1,38 @@
+from sqlalchemy import Column, DateTime, Float, Index, Integer
+from app.database import Base
+
+
+class SeedDailySales(Base):
+    """Units of a seed sold per UTC day: the sales history forecasts read.
+
+    Every purchase path adds to it in its transaction (app/services/forecast.py).
+    """
+    __tablename__ = "seed_sales_daily"
+
+    seed_id = Column(Integer, primary_key=True, autoincrement=False)
+    # Days since 1970-01-01, so a history loads straight into array columns
+    day = Column(Integer, primary_key=True, autoincrement=False)
+    units = Column(Integer, nullable=False, default=0)
+
+
+class ReorderSuggestion(Base):
+    """The latest forecast for a seed, replaced by every forecast run"""
+    __tablename__ = "reorder_suggestions"
+
+    seed_id = Column(Integer, primary_key=True, autoincrement=False)
+    on_hand = Column(Integer, nullable=False)
+    # Recent units per day, and last year's change over the coming period
+    daily_rate = Column(Float, nullable=False)
+    seasonality = Column(Float, nullable=False)
+    forecast_daily = Column(Float, nullable=False)
+    safety_stock = Column(Float, nullable=False)
+    reorder_point = Column(Float, nullable=False)
+    suggested_quantity = Column(Integer, nullable=False)
+    # NULL when nothing is forecast to sell
+    days_of_cover = Column(Float, nullable=True)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Most urgent first; keep in sync with m0013_sales_forecast
+        Index('ix_reorder_suggestions_cover', 'days_of_cover'),
+    )
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Job(Base):
+    """A unit of background work in the durable job queue (app/services/jobs.py)"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON
+    # queued -> running -> succeeded | failed (or back to queued for a retry)
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    # Enqueueing a key that is already present returns the existing job
+    dedupe_key = Column(String, nullable=True, unique=True)
+    created_by = Column(Integer, nullable=True)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)  # JSON
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Claiming the next due job; keep in sync with m0008_jobs
+        Index('ix_jobs_claim', 'status', 'run_after', 'id'),
+    )
@@ -0,0 +1,37 @@
+from sqlalchemy import (
+    CheckConstraint, Column, Date, DateTime, ForeignKey, Index, Integer, literal_column)
+from sqlalchemy.sql import func
+from app.database import Base
+
+# Written as a literal so SQLite can match queries against the partial
+# indexes below (it cannot prove `remaining > ?` implies `remaining > 0`)
+LOT_HAS_STOCK = literal_column("remaining") > literal_column("0")
+
+
+class SeedLot(Base):
+    """A batch of one seed received by a restock, with its expiry date.
+
+    Seed.quantity stays the aggregate of every lot's `remaining`, maintained
+    by CatalogService, so catalog reads never touch this table.
+    """
+    __tablename__ = "seed_lots"
+
+    id = Column(Integer, primary_key=True)
+    seed_id = Column(Integer, ForeignKey("seeds.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    remaining = Column(Integer, nullable=False)
+    packed_on = Column(Date, nullable=False)
+    expires_on = Column(Date, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint('remaining >= 0', name='check_lot_remaining_positive'),
+        # Keep in sync with app/migrations/m0006_seed_lots.py. Both only
+        # cover lots with stock left, so sold-out lots cost nothing.
+        # FEFO allocation: a seed's first-expiring lots
+        Index('ix_seed_lots_fefo', 'seed_id', 'expires_on', 'id',
+              sqlite_where=LOT_HAS_STOCK, postgresql_where=LOT_HAS_STOCK),
+        # Expiring-soon report across all seeds
+        Index('ix_seed_lots_expiry', 'expires_on',
+              sqlite_where=LOT_HAS_STOCK, postgresql_where=LOT_HAS_STOCK),
+    )
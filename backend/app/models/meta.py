@@ -0,0 +1,191 @@
+from sqlalchemy import BigInteger, Column, String, event, select, text, update
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import Base
+
+
+class AppMeta(Base):
+    """Small key/value table for schema version and one-shot task markers"""
+    __tablename__ = "app_meta"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+
+
+def get_meta(db: Session, key: str) -> Optional[str]:
+    return db.execute(select(AppMeta.value).where(AppMeta.key == key)).scalar()
+
+
+def set_meta(db: Session, key: str, value) -> None:
+    """Insert or update a metadata value (caller commits)"""
+    row = db.get(AppMeta, key)
+    if row is None:
+        db.add(AppMeta(key=key, value=str(value)))
+    else:
+        row.value = str(value)
+
+
+class SequenceCounter(Base):
+    """Named monotonically increasing counters (e.g. the catalog change seq)"""
+    __tablename__ = "counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+def next_sequence(db: Session, name: str, count: int = 1) -> int:
+    """Reserve `count` values and return the highest (caller commits).
+
+    The UPDATE locks the counter row until commit, so values become visible
+    in the order they were handed out.
+    """
+    value = db.execute(
+        update(SequenceCounter)
+        .where(SequenceCounter.name == name)
+        .values(value=SequenceCounter.value + count)
+        .returning(SequenceCounter.value)
+    ).scalar()
+    if value is None:
+        # Created by migration 4; databases built by create_all alone lack it
+        db.add(SequenceCounter(name=name, value=count))
+        db.flush()
+        value = count
+    return value
+
+
+def set_sequence(db: Session, name: str, value: int) -> None:
+    """Move a counter to `value` (caller commits)"""
+    row = db.get(SequenceCounter, name)
+    if row is None:
+        db.add(SequenceCounter(name=name, value=value))
+    else:
+        row.value = value
+
+
+def current_sequence(db: Session, name: str) -> int:
+    value = db.execute(
+        select(SequenceCounter.value).where(SequenceCounter.name == name)).scalar()
+    return value or 0
+
+
+# On PostgreSQL these counters come from a SEQUENCE instead of a counters
+# row, whose lock every catalog write would otherwise hold until commit.
+# Values then commit out of order, so while its transaction is open each
+# reservation's lowest value holds an advisory lock in the namespace given
+# here, and readers stop below it (committed_sequence).
+CHANGE_SEQUENCES = {"catalog": 0x5EED}
+
+_RESERVE_FUNCTION = """
+CREATE OR REPLACE FUNCTION reserve_change_seq(seq regclass, lock_base bigint, n integer)
+RETURNS SETOF bigint LANGUAGE plpgsql AS $$
+DECLARE
+    gate integer := (lock_base >> 48)::integer;
+    taken bigint[];
+BEGIN
+    -- Shared gate: committed_change_seq never sees values taken but not
+    -- yet marked in flight
+    PERFORM pg_advisory_lock_shared(gate, 0);
+    BEGIN
+        taken := ARRAY(SELECT nextval(seq) FROM generate_series(1, n) ORDER BY 1);
+        PERFORM pg_advisory_xact_lock(lock_base + taken[1]);
+    EXCEPTION WHEN OTHERS THEN
+        PERFORM pg_advisory_unlock_shared(gate, 0);
+        RAISE;
+    END;
+    PERFORM pg_advisory_unlock_shared(gate, 0);
+    RETURN QUERY SELECT unnest(taken);
+END $$
+"""
+
+_COMMITTED_FUNCTION = """
+CREATE OR REPLACE FUNCTION committed_change_seq(seq regclass, lock_base bigint)
+RETURNS bigint LANGUAGE plpgsql AS $$
+DECLARE
+    gate integer := (lock_base >> 48)::integer;
+    issued bigint;
+    oldest bigint;
+BEGIN
+    PERFORM pg_advisory_lock(gate, 0);
+    BEGIN
+        issued := coalesce(pg_sequence_last_value(seq), 0);
+        SELECT min(((classid::bigint << 32) | objid::bigint) - lock_base) INTO oldest
+        FROM pg_locks
+        WHERE locktype = 'advisory' AND objsubid = 1 AND granted
+          AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+          AND classid::bigint >> 16 = lock_base >> 48;
+    EXCEPTION WHEN OTHERS THEN
+        PERFORM pg_advisory_unlock(gate, 0);
+        RAISE;
+    END;
+    PERFORM pg_advisory_unlock(gate, 0);
+    RETURN least(issued, coalesce(oldest - 1, issued));
+END $$
+"""
+
+
+def _change_sequence(db: Session, name: str) -> Optional[dict]:
+    # Bind parameters for the PostgreSQL functions, or None to use the row
+    if name not in CHANGE_SEQUENCES or db.get_bind().dialect.name != "postgresql":
+        return None
+    return {"seq": f"{name}_change_seq", "lock_base": CHANGE_SEQUENCES[name] << 48}
+
+
+def reserve_sequence(db: Session, name: str, count: int = 1) -> List[int]:
+    """Reserve `count` values of a change counter, lowest first (caller commits).
+
+    On SQLite they are consecutive and commit in order. On PostgreSQL they
+    commit in any order; read changes only up to committed_sequence().
+    """
+    params = _change_sequence(db, name)
+    if params is None:
+        last = next_sequence(db, name, count)
+        return list(range(last - count + 1, last + 1))
+    return list(db.execute(
+        text("SELECT * FROM reserve_change_seq(CAST(:seq AS regclass), :lock_base, :count)"),
+        {**params, "count": count}).scalars())
+
+
+def committed_sequence(db: Session, name: str) -> int:
+    """Highest value of a change counter with no lower value still uncommitted"""
+    params = _change_sequence(db, name)
+    if params is None:
+        return current_sequence(db, name)
+    return db.execute(
+        text("SELECT committed_change_seq(CAST(:seq AS regclass), :lock_base)"),
+        params).scalar()
+
+
+def create_change_sequences(conn) -> None:
+    """Create the PostgreSQL sequences and functions (a no-op elsewhere).
+
+    A new sequence continues from its counter row, which it replaces.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    conn.exec_driver_sql(_RESERVE_FUNCTION)
+    conn.exec_driver_sql(_COMMITTED_FUNCTION)
+    for name in CHANGE_SEQUENCES:
+        sequence = f"{name}_change_seq"
+        if conn.execute(text("SELECT to_regclass(:seq)"), {"seq": sequence}).scalar():
+            continue
+        conn.exec_driver_sql(f"CREATE SEQUENCE {sequence}")
+        value = conn.execute(select(SequenceCounter.value)
+                             .where(SequenceCounter.name == name)).scalar()
+        if value:
+            conn.execute(text("SELECT setval(CAST(:seq AS regclass), :value)"),
+                         {"seq": sequence, "value": value})
+
+
+def _create_change_sequences(target, conn, **kw) -> None:
+    create_change_sequences(conn)
+
+
+def _drop_change_sequences(target, conn, **kw) -> None:
+    if conn.dialect.name == "postgresql":
+        for name in CHANGE_SEQUENCES:
+            conn.exec_driver_sql(f"DROP SEQUENCE IF EXISTS {name}_change_seq")
+
+
+# create_all/drop_all keep the sequences with the counters table
+event.listen(SequenceCounter.__table__, "after_create", _create_change_sequences)
+event.listen(SequenceCounter.__table__, "after_drop", _drop_change_sequences)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Order(Base):
+    """A checkout: the lines bought together and what they cost then"""
+    __tablename__ = "orders"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    total = Column(Float, nullable=False)
+    # Pricing rules version the lines were priced with (app/services/pricing.py)
+    pricing_version = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # A user's orders, newest first; keep in sync with m0012_orders
+        Index('ix_orders_user', 'user_id', 'id'),
+    )
+
+
+class OrderLine(Base):
+    __tablename__ = "order_lines"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    # No foreign key: lines outlive the seed
+    seed_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    list_price = Column(Float, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    rule_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index('ix_order_lines_order', 'order_id', 'seed_id'),
+    )
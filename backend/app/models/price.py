@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Float, Index, Integer
+from app.database import Base
+
+
+class SeedPrice(Base):
+    """One price of one seed, from `effective_from` until the seed's next row.
+
+    Append-only: CatalogService adds a row in the same transaction as every
+    price change, and a row with a NULL price when the seed is deleted.
+    Rows outlive their seed, so past prices of deleted seeds stay known.
+    """
+    __tablename__ = "seed_prices"
+
+    id = Column(Integer, primary_key=True)
+    seed_id = Column(Integer, nullable=False)
+    price = Column(Float, nullable=True)  # NULL: no longer sold from then on
+    # UTC
+    effective_from = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # As-of lookups seek the last row at or before a time for each seed;
+        # keep in sync with app/migrations/m0010_price_history.py
+        Index('ix_seed_prices_asof', 'seed_id', 'effective_from'),
+    )
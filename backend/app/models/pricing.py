@@ -0,0 +1,30 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class PricingRule(Base):
+    """A discount on one seed, one category or every seed.
+
+    Rules are compiled into an in-memory price book (app/services/pricing.py)
+    rather than queried per request, so the table needs no secondary indexes.
+    """
+    __tablename__ = "pricing_rules"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    # Target: seed_id if set, else category if set, else every seed
+    seed_id = Column(Integer, nullable=True)
+    category = Column(String, nullable=True)
+    # Exactly one of the two; amount_off is per unit
+    percent_off = Column(Float, nullable=True)
+    amount_off = Column(Float, nullable=True)
+    # Quantity break: applies when buying at least this many
+    min_quantity = Column(Integer, nullable=False, default=1)
+    # Active window in UTC; open-ended when NULL
+    starts_at = Column(DateTime(timezone=True), nullable=True)
+    ends_at = Column(DateTime(timezone=True), nullable=True)
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True),
+                        onupdate=func.now(), server_default=func.now())
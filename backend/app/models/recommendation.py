@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer
+from app.database import Base
+
+
+class SeedPair(Base):
+    """How many orders contained both seeds: the sparse, symmetric item-item
+    co-occurrence matrix (each pair is stored in both directions).
+
+    Checkout adds to it in its transaction; the rebuild job recomputes it
+    from order_lines (app/services/recommendations.py).
+    """
+    __tablename__ = "seed_pairs"
+
+    seed_id = Column(Integer, primary_key=True, autoincrement=False)
+    related_id = Column(Integer, primary_key=True, autoincrement=False)
+    orders = Column(Integer, nullable=False, default=0)
+
+
+class RelatedSeed(Base):
+    """A seed's top related seeds by co-occurrence, rank 0 first, so
+    GET /api/seeds/{id}/related reads RECOMMENDATIONS_TOP_K rows by key"""
+    __tablename__ = "seed_related"
+
+    seed_id = Column(Integer, primary_key=True, autoincrement=False)
+    rank = Column(Integer, primary_key=True, autoincrement=False)
+    related_id = Column(Integer, nullable=False)
+    orders = Column(Integer, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float
+from sqlalchemy import Column, Integer, String, DateTime, Float, CheckConstraint, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -11,10 +11,32 @@ class Seed(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
-    category = Column(String, index=True, nullable=False)
+    # Indexed through ix_seeds_category_price (category is its prefix)
+    category = Column(String, nullable=False)
     price = Column(Float, nullable=False)
     quantity = Column(Integer, default=0, nullable=False)
     image = Column(String, nullable=True, default=DEFAULT_SEED_IMAGE)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True),
                         onupdate=func.now(), server_default=func.now())
+    # Catalog change sequence at the row's last create/update (see
+    # GET /api/seeds/changes); 0 until first changed through CatalogService
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        CheckConstraint('price >= 0', name='check_price_positive'),
+        CheckConstraint('quantity >= 0', name='check_quantity_positive'),
+        # Keep in sync with app/migrations/m0002_catalog_indexes.py and m0004
+        Index('ix_seeds_category_price', 'category', 'price'),
+        Index('ix_seeds_price', 'price'),
+        Index('ix_seeds_change_seq', 'change_seq'),
+    )
+
+
+class SeedTombstone(Base):
+    """Marks a deleted seed so delta sync can report the deletion"""
+    __tablename__ = "seed_tombstones"
+
+    seed_id = Column(Integer, primary_key=True, autoincrement=False)
+    change_seq = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+from app.database import Base, ShardBase
+
+
+# Shard tables: one copy per store database (see database.ShardRouter)
+
+class StoreStock(ShardBase):
+    """A seed's stock in one store"""
+    __tablename__ = "store_stock"
+
+    seed_id = Column(Integer, primary_key=True, autoincrement=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True),
+                        onupdate=func.now(), server_default=func.now())
+
+
+class StockOutbox(ShardBase):
+    """Stock changes not yet rolled up into StoreStockTotal.
+
+    Written in the same shard transaction as the StoreStock change. Ids are
+    AUTOINCREMENT so they are never reused after the relay deletes rows.
+    """
+    __tablename__ = "stock_outbox"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    seed_id = Column(Integer, nullable=False)
+    delta = Column(Integer, nullable=False)
+
+
+# Main database tables
+
+class StoreStockTotal(Base):
+    """A seed's stock summed over every store, rolled up from the outboxes"""
+    __tablename__ = "store_stock_totals"
+
+    seed_id = Column(Integer, primary_key=True, autoincrement=False)
+    quantity = Column(Integer, nullable=False, default=0)
+
+
+class StoreRollupCursor(Base):
+    """Last outbox id of each store already added to StoreStockTotal"""
+    __tablename__ = "store_rollup_cursors"
+
+    store_id = Column(String, primary_key=True)
+    last_outbox_id = Column(Integer, nullable=False, default=0)
@@ -1,21 +0,0 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, CheckConstraint
-from sqlalchemy.sql import func
-from app.database import Base
-
-
-class Seed(Base):
-    __tablename__ = "seeds"
-
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False, index=True)
-    category = Column(String, nullable=False, index=True)
-    price = Column(Float, nullable=False)
-    quantity = Column(Integer, nullable=False, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True),
-                        server_default=func.now(), onupdate=func.now())
-
-    __table_args__ = (
-        CheckConstraint('price >= 0', name='check_price_positive'),
-        CheckConstraint('quantity >= 0', name='check_quantity_positive'),
-    )
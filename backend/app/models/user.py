@@ -10,5 +10,8 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
     role = Column(String, default="user", nullable=False)  # 'user' or 'admin'
+    # Store the user shops at (one of settings.STORES); issued as the
+    # access token's `store` claim
+    store_id = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,116 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.database import ReadDB, WriteDB, configured_stores, engine
+from app.models.user import User
+from app.schemas.job import JobResponse
+from app.schemas.maintenance import BackupListResponse, MaintenanceResponse, RestoreResponse
+from app.schemas.user import StoreMembership, UserResponse
+from app.middleware.auth import get_current_admin_user
+from app.services import backups, maintenance
+from app.services.jobs import enqueue, job_to_dict
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/maintenance", response_model=MaintenanceResponse)
+async def maintenance_report(
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """File, WAL and freelist sizes, and the last run of each task (Admin only)"""
+    scheduler = maintenance.maintenance_scheduler
+    return {"database": maintenance.database_stats(db.get_bind()),
+            "tasks": maintenance.last_runs(db),
+            "intervals": maintenance.task_intervals(),
+            "leader": scheduler.leader if scheduler else None}
+
+
+@router.post("/maintenance/{task}", response_model=JobResponse,
+             status_code=status.HTTP_202_ACCEPTED)
+async def run_maintenance_task(
+    task: str,
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Run a maintenance task now, in the background (Admin only)"""
+    if task not in maintenance.TASKS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown maintenance task. Choose from: {', '.join(maintenance.TASKS)}"
+        )
+    job = enqueue(db, maintenance.MAINTENANCE_JOB, {"task": task},
+                  max_attempts=1, created_by=current_user.id)
+    return job_to_dict(job)
+
+
+@router.get("/backups", response_model=BackupListResponse)
+async def list_backups(
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Database snapshots, newest first, and the last backup's stats (Admin only)"""
+    return {"backups": backups.list_backups(), "last_backup": backups.last_backup(db)}
+
+
+@router.post("/backups", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_backup(
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Take an online backup in the background, then rotate old ones (Admin only)"""
+    job = enqueue(db, backups.BACKUP_JOB, max_attempts=1, created_by=current_user.id)
+    return job_to_dict(job)
+
+
+@router.post("/backups/{name}/restore", response_model=RestoreResponse)
+async def restore_backup(
+    name: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Replace the database with a snapshot, saving the current one first (Admin only).
+
+    Runs in the request rather than as a job: the jobs table itself is
+    rewound by the restore.
+    """
+    try:
+        return await asyncio.to_thread(backups.restore_backup, engine, name)
+    except backups.UnknownSnapshotError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except backups.BackupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.put("/users/{user_id}/store", response_model=UserResponse)
+async def set_user_store(
+    user_id: int,
+    membership: StoreMembership,
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Make a user a member of one store, or of none (Admin only).
+
+    Store routes check membership on every request; the `store` claim in
+    the user's tokens follows at their next login or refresh.
+    """
+    if membership.store_id is not None and membership.store_id not in configured_stores():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown store"
+        )
+    user = db.get(User, user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    user.store_id = membership.store_id
+    db.commit()
+    db.refresh(user)
+    return user
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+from app.database import ReadDB, WriteDB
+from app.models.user import User
+from app.schemas.analytics import ReorderSuggestionsResponse
+from app.schemas.job import JobResponse
+from app.middleware.auth import get_current_admin_user
+from app.services.forecast import FORECAST_JOB, reorder_suggestions
+from app.services.jobs import enqueue, job_to_dict
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+@router.get("/reorder-suggestions", response_model=ReorderSuggestionsResponse)
+async def get_reorder_suggestions(
+    limit: int = Query(50, ge=1, le=1000),
+    include_all: bool = Query(False, alias="all",
+                              description="Include seeds that need no reorder"),
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Seeds to reorder and how many, from the last forecast run (Admin only)"""
+    return reorder_suggestions(db, limit, include_all=include_all)
+
+
+@router.post("/forecast", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def run_demand_forecast(
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Recompute demand forecasts and reorder suggestions in the background (Admin only)"""
+    return job_to_dict(enqueue(db, FORECAST_JOB, created_by=current_user.id))
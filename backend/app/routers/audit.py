@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.database import ReadDB
+from app.models.user import User
+from app.schemas.audit import AuditPageResponse, AuditStatsResponse
+from app.middleware.auth import get_current_admin_user
+from app.services import audit
+
+router = APIRouter(prefix="/api/audit", tags=["audit"])
+
+
+@router.get("", response_model=AuditPageResponse)
+async def list_audit_entries(
+    seed_id: Optional[int] = Query(None),
+    actor_id: Optional[int] = Query(None),
+    action: Optional[str] = Query(None, pattern="^(create|update|delete|restock)$"),
+    before_id: Optional[int] = Query(None, description="Cursor from next_before_id"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Catalog changes, newest first (Admin only).
+
+    Entries are flushed in batches, so the last AUDIT_FLUSH_SECONDS of
+    changes may not be listed yet.
+    """
+    return audit.query_entries(
+        db, entity="seed" if seed_id is not None else None, entity_id=seed_id,
+        actor_id=actor_id, action=action, before_id=before_id, limit=limit)
+
+
+@router.get("/stats", response_model=AuditStatsResponse)
+async def audit_stats(current_user: User = Depends(get_current_admin_user)):
+    """Entries buffered, flushed and dropped by this process (Admin only)"""
+    log = audit.audit_log
+    return {"buffer": log.stats() if log else None}
@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import ReadDB, WriteDB
+from app.middleware.auth import get_current_user
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
+from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, RefreshRequest
+from app.services.refresh_tokens import (
+    InvalidRefreshToken, issue_refresh_token, revoke_token, revoke_user_tokens,
+    rotate_refresh_token)
 from app.utils.auth import get_password_hash, verify_password, create_access_token
 from datetime import timedelta
 from app.config import settings
@@ -10,17 +15,27 @@ from app.config import settings
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+def _access_token(user: User) -> str:
+    access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {"sub": str(user.id), "email": user.email, "role": user.role}
+    if user.store_id:
+        # Routes the user's store inventory requests to the store's shard
+        claims["store"] = user.store_id
+    return create_access_token(data=claims, expires_delta=access_token_expires)
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = WriteDB, read_db: Session = ReadDB):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    # Check if user already exists (on a reader, so duplicates never queue
+    # behind the single writer connection)
+    existing_user = read_db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
+
     # Create new user
     hashed_password = get_password_hash(user_data.password)
     new_user = User(
@@ -28,22 +43,25 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         password_hash=hashed_password,
         role="user"
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(new_user.id), "email": new_user.email, "role": new_user.role},
-        expires_delta=access_token_expires
-    )
-    
-    return Token(access_token=access_token, token_type="bearer")
+    try:
+        db.add(new_user)
+        db.flush()
+        refresh_token, _ = issue_refresh_token(db, new_user.id)
+        db.commit()
+    except IntegrityError:
+        # Registered concurrently after the check above
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+
+    return Token(access_token=_access_token(new_user), token_type="bearer",
+                 refresh_token=refresh_token)
 
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: Session = ReadDB, write_db: Session = WriteDB):
     """Login user and return JWT token"""
     # Find user
     user = db.query(User).filter(User.email == user_data.email).first()
@@ -52,27 +70,54 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
-    
+
     # Verify password
     if not user_data.password:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Password is required"
         )
-    
+
     password_valid = verify_password(user_data.password, user.password_hash)
     if not password_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
-    
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "role": user.role},
-        expires_delta=access_token_expires
-    )
-    
-    return Token(access_token=access_token, token_type="bearer")
 
+    # The writer session connects only now, after bcrypt has run
+    refresh_token, _ = issue_refresh_token(write_db, user.id)
+    write_db.commit()
+
+    return Token(access_token=_access_token(user), token_type="bearer",
+                 refresh_token=refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, db: Session = WriteDB):
+    """Exchange a refresh token for a new access token and refresh token"""
+    try:
+        user, refresh_token = rotate_refresh_token(db, request.refresh_token)
+    except InvalidRefreshToken as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Token(access_token=_access_token(user), token_type="bearer",
+                 refresh_token=refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest, db: Session = WriteDB):
+    """Revoke a refresh token and every token rotated from the same login"""
+    revoke_token(db, request.refresh_token)
+    return None
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(db: Session = WriteDB, current_user: User = Depends(get_current_user)):
+    """Revoke all of the current user's refresh tokens"""
+    revoke_user_tokens(db, current_user.id)
+    return None
@@ -1,62 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
-from app.database import get_db
-from app.models.seed import Seed
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
 from app.models.user import User
-from app.schemas.seed import SeedResponse
+from app.schemas.seed import ExpiringLotResponse, SeedLotResponse, SeedResponse
 from app.middleware.auth import get_current_user, get_current_admin_user
+from app.services.catalog import CatalogService, get_catalog_reader, get_catalog_writer
+from app.services.purchase_queue import PurchaseBatcher, get_purchase_batcher
 
 router = APIRouter(prefix="/api/seeds", tags=["inventory"])
 
 
 class RestockRequest(BaseModel):
     quantity: int = Field(..., gt=0)
+    # The new lot's dates: packed today and expiring after the configured
+    # shelf life unless given
+    packed_on: Optional[date] = None
+    expires_on: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.expires_on and self.expires_on < (self.packed_on or date.today()):
+            raise ValueError("expires_on must not be before packed_on")
+        return self
 
 
 @router.post("/{seed_id}/purchase", response_model=SeedResponse)
 async def purchase_seed(
     seed_id: int,
-    db: Session = Depends(get_db),
+    catalog: CatalogService = Depends(get_catalog_writer),
+    batcher: Optional[PurchaseBatcher] = Depends(get_purchase_batcher),
     current_user: User = Depends(get_current_user)
 ):
     """Purchase a seed, decreasing its quantity by 1"""
-    seed = db.query(Seed).filter(Seed.id == seed_id).first()
-    if not seed:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Seed not found"
-        )
-
-    if seed.quantity <= 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Seed is out of stock"
-        )
-
-    seed.quantity -= 1
-    db.commit()
-    db.refresh(seed)
-    return seed
+    if batcher is not None:
+        return await batcher.submit(seed_id)
+    return catalog.purchase(seed_id)
 
 
 @router.post("/{seed_id}/restock", response_model=SeedResponse)
 async def restock_seed(
     seed_id: int,
     restock_data: RestockRequest,
-    db: Session = Depends(get_db),
+    catalog: CatalogService = Depends(get_catalog_writer),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Restock a seed with a new lot, increasing its quantity (Admin only)"""
+    return catalog.restock(seed_id, restock_data.quantity,
+                           restock_data.packed_on, restock_data.expires_on,
+                           actor=current_user)
+
+
+@router.get("/lots/expiring", response_model=List[ExpiringLotResponse])
+async def get_expiring_lots(
+    days: int = Query(30, ge=0, le=3650, description="Expiring within this many days"),
+    limit: int = Query(500, ge=1, le=5000),
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Lots with stock left that expire soon or have expired, soonest first (Admin only)"""
+    return catalog.expiring(days, limit)
+
+
+@router.get("/{seed_id}/lots", response_model=List[SeedLotResponse])
+async def get_seed_lots(
+    seed_id: int,
+    catalog: CatalogService = Depends(get_catalog_reader),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """Restock a seed, increasing its quantity (Admin only)"""
-
-    seed = db.query(Seed).filter(Seed.id == seed_id).first()
-    if not seed:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Seed not found"
-        )
-
-    seed.quantity += restock_data.quantity
-    db.commit()
-    db.refresh(seed)
-    return seed
+    """A seed's lots with stock left, in the order purchases use them (Admin only)"""
+    return catalog.lots(seed_id)
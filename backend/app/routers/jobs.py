@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database import ReadDB
+from app.models.job import Job
+from app.models.user import User
+from app.schemas.job import JobResponse, JobStatsResponse
+from app.middleware.auth import get_current_user, get_current_admin_user
+from app.services import jobs as jobs_service
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(
+    job_status: Optional[str] = Query(None, alias="status",
+                                      pattern="^(queued|running|succeeded|failed)$"),
+    kind: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Most recent jobs first (Admin only)"""
+    statement = select(Job).order_by(Job.id.desc()).limit(limit)
+    if job_status:
+        statement = statement.where(Job.status == job_status)
+    if kind:
+        statement = statement.where(Job.kind == kind)
+    return [jobs_service.job_to_dict(job) for job in db.execute(statement).scalars()]
+
+
+@router.get("/stats", response_model=JobStatsResponse)
+async def job_stats(
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Queue depth per status and this process's workers (Admin only)"""
+    runner = jobs_service.job_runner
+    return {"counts": jobs_service.job_counts(db),
+            "runner": runner.stats() if runner else None}
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_user)
+):
+    """Status of a job (its creator or an admin)"""
+    job = db.get(Job, job_id)
+    if job is None or (current_user.role != "admin" and job.created_by != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return jobs_service.job_to_dict(job)
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.database import ReadDB
+from app.models.user import User
+from app.schemas.order import CheckoutRequest, OrderPageResponse, OrderResponse
+from app.middleware.auth import get_current_user
+from app.services.catalog import CatalogService, get_catalog_writer
+from app.services.orders import get_order, list_orders
+from app.services.pricing import pricing_engine
+
+router = APIRouter(prefix="/api/orders", tags=["orders"])
+
+
+@router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
+async def checkout(
+    request: CheckoutRequest,
+    catalog: CatalogService = Depends(get_catalog_writer),
+    current_user: User = Depends(get_current_user)
+):
+    """Buy the cart as one order at its effective prices, all or nothing"""
+    quantities = {}
+    for item in request.items:
+        quantities[item.seed_id] = quantities.get(item.seed_id, 0) + item.quantity
+    book = pricing_engine.current(catalog.db)
+    return catalog.checkout(current_user.id, quantities, book)
+
+
+@router.get("", response_model=OrderPageResponse)
+async def get_my_orders(
+    before_id: Optional[int] = Query(None, description="`next_before_id` of the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_user)
+):
+    """The current user's orders, newest first"""
+    return list_orders(db, current_user.id, before_id, limit)
+
+
+@router.get("/{order_id}", response_model=OrderResponse)
+async def get_one_order(
+    order_id: int,
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_user)
+):
+    """An order (its buyer or an admin)"""
+    order = get_order(db, order_id)
+    if order is None or (order["user_id"] != current_user.id and current_user.role != "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+    return order
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, status
+from typing import List
+from sqlalchemy.orm import Session
+from app.database import ReadDB, WriteDB
+from app.models.user import User
+from app.schemas.pricing import (
+    PricingRuleCreate, PricingRuleResponse, PricingRuleUpdate, QuoteRequest, QuoteResponse)
+from app.middleware.auth import get_current_user, get_current_admin_user
+from app.services import pricing
+
+router = APIRouter(prefix="/api/pricing", tags=["pricing"])
+
+
+@router.get("/rules", response_model=List[PricingRuleResponse])
+async def list_pricing_rules(
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Every pricing rule, enabled or not (Admin only)"""
+    return pricing.list_rules(db)
+
+
+@router.post("/rules", response_model=PricingRuleResponse,
+             status_code=status.HTTP_201_CREATED)
+async def create_pricing_rule(
+    rule: PricingRuleCreate,
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Add a discount, quantity break or scheduled promotion (Admin only)"""
+    return pricing.create_rule(db, rule.model_dump(), actor=current_user)
+
+
+@router.put("/rules/{rule_id}", response_model=PricingRuleResponse)
+async def update_pricing_rule(
+    rule_id: int,
+    changes: PricingRuleUpdate,
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Change a rule; fields sent as null are cleared (Admin only)"""
+    return pricing.update_rule(db, rule_id, changes.model_dump(exclude_unset=True),
+                               actor=current_user)
+
+
+@router.delete("/rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_pricing_rule(
+    rule_id: int,
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Remove a rule (Admin only)"""
+    pricing.delete_rule(db, rule_id, actor=current_user)
+    return None
+
+
+@router.post("/quote", response_model=QuoteResponse)
+async def quote_prices(
+    request: QuoteRequest,
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_user)
+):
+    """Effective prices for a cart, with quantity breaks and promotions"""
+    return pricing.quote(db, [(item.seed_id, item.quantity) for item in request.items],
+                         request.at)
@@ -1,11 +1,23 @@
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
-from app.models.seed import Seed, DEFAULT_SEED_IMAGE
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import WriteDB
 from app.models.user import User
-from app.schemas.seed import SeedCreate, SeedUpdate, SeedResponse
+from app.schemas.job import JobResponse
+from app.schemas.seed import (
+    RelatedSeedResponse, RepriceRequest, RepriceResponse, SeedBatchRequest, SeedBatchResponse, SeedChanges,
+    SeedCreate, SeedFacetsResponse, SeedPriceResponse, SeedQueryResponse, SeedUpdate,
+    SeedResponse)
 from app.middleware.auth import get_current_user, get_current_admin_user
+from app.services.catalog import CatalogService, get_catalog_reader, get_catalog_writer
+from app.services.catalog_snapshot import CatalogSnapshot, get_catalog_snapshot
+from app.services.facets import REBUILD_FACETS_JOB
+from app.services.jobs import enqueue, job_to_dict
+from app.services.pricing import price_seed_dicts
+from app.services.recommendations import REBUILD_RECOMMENDATIONS_JOB
+from app.utils.serialization import SeedListResponse, seed_rows_to_dicts
 
 router = APIRouter(prefix="/api/seeds", tags=["seeds"])
 
@@ -13,30 +25,21 @@ router = APIRouter(prefix="/api/seeds", tags=["seeds"])
 @router.post("", response_model=SeedResponse, status_code=status.HTTP_201_CREATED)
 async def create_seed(
     seed_data: SeedCreate,
-    db: Session = Depends(get_db),
+    catalog: CatalogService = Depends(get_catalog_writer),
     current_user: User = Depends(get_current_admin_user)
 ):
-    seed_dict = seed_data.model_dump()
-    # Use default image if none provided
-    if not seed_dict.get('image'):
-        seed_dict['image'] = DEFAULT_SEED_IMAGE
-    new_seed = Seed(**seed_dict)
-    db.add(new_seed)
-    db.commit()
-    db.refresh(new_seed)
-    return new_seed
+    return catalog.create(seed_data.model_dump(), actor=current_user)
 
 
-@router.get("", response_model=List[SeedResponse])
+@router.get("", response_model=List[SeedResponse], response_class=SeedListResponse)
 async def get_all_seeds(
-    db: Session = Depends(get_db),
+    catalog: CatalogService = Depends(get_catalog_reader),
     current_user: User = Depends(get_current_user)
 ):
-    seeds = db.query(Seed).all()
-    return seeds
+    return SeedListResponse(await catalog.shared_list_json())
 
 
-@router.get("/search", response_model=List[SeedResponse])
+@router.get("/search", response_model=List[SeedResponse], response_class=SeedListResponse)
 async def search_seeds(
     name: Optional[str] = Query(None, description="Search by name"),
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -44,64 +47,193 @@ async def search_seeds(
         None, ge=0, description="Minimum price"),
     max_price: Optional[float] = Query(
         None, ge=0, description="Maximum price"),
-    db: Session = Depends(get_db),
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_user)
+):
+    return SeedListResponse(
+        await catalog.shared_search_json(name, category, min_price, max_price))
+
+
+@router.get("/changes", response_model=SeedChanges)
+async def get_seed_changes(
+    since: Optional[int] = Query(
+        None, ge=0, description="`seq` from the previous sync; omit for a full sync"),
+    limit: int = Query(1000, ge=1, le=5000, description="Maximum changes to return"),
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_user)
+):
+    """Seeds changed and ids deleted since a catalog change sequence"""
+    return catalog.changes(since, limit)
+
+
+@router.get("/query", response_model=SeedQueryResponse)
+async def query_seeds(
+    category: Optional[List[str]] = Query(None, description="Exact categories (any of)"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
+    in_stock: bool = Query(False, description="Only seeds with quantity > 0"),
+    q: Optional[str] = Query(None, description="Name contains"),
+    sort: str = Query("id", pattern="^-?(id|name|price|quantity)$",
+                      description="Sort field, '-' prefix for descending"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    catalog: CatalogService = Depends(get_catalog_reader),
+    snapshot: Optional[CatalogSnapshot] = Depends(get_catalog_snapshot),
+    current_user: User = Depends(get_current_user)
+):
+    """Filter, sort and page seeds, with per-category facet counts and
+    effective prices"""
+    filters = dict(categories=category, min_price=min_price, max_price=max_price,
+                   in_stock=in_stock, q=q, sort=sort, limit=limit, offset=offset)
+    if snapshot is not None:
+        page = snapshot.query(catalog, **filters)
+    else:
+        page = catalog.query(**filters)
+    price_seed_dicts(catalog.db, page["items"])
+    return page
+
+
+@router.get("/facets", response_model=SeedFacetsResponse)
+async def get_seed_facets(
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_user)
+):
+    """Categories with seed and in-stock counts, price range and histogram"""
+    return catalog.facets()
+
+
+@router.post("/facets/rebuild", response_model=JobResponse,
+             status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_seed_facets(
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Recompute the facet tables from scratch in the background (Admin only)"""
+    return job_to_dict(enqueue(db, REBUILD_FACETS_JOB, created_by=current_user.id))
+
+
+@router.post("/recommendations/rebuild", response_model=JobResponse,
+             status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_recommendations(
+    db: Session = WriteDB,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Recompute frequently-bought-together lists from every order (Admin only)"""
+    return job_to_dict(enqueue(db, REBUILD_RECOMMENDATIONS_JOB, created_by=current_user.id))
+
+
+def _batch(catalog: CatalogService, ids: List[int]) -> dict:
+    rows, missing = catalog.get_many(ids)
+    return {"items": seed_rows_to_dicts(rows), "missing": missing}
+
+
+@router.get("/batch", response_model=SeedBatchResponse)
+async def get_seed_batch(
+    ids: List[str] = Query(..., description="Seed ids, comma-separated or repeated"),
+    catalog: CatalogService = Depends(get_catalog_reader),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Seed)
-    if name:
-        query = query.filter(Seed.name.ilike(f"%{name}%"))
-    if category:
-        query = query.filter(Seed.category.ilike(f"%{category}%"))
-    if min_price is not None:
-        query = query.filter(Seed.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Seed.price <= max_price)
-    seeds = query.all()
-    return seeds
+    """Current details for a set of seeds (e.g. the cart) in one query"""
+    try:
+        seed_ids = [int(i) for value in ids for i in value.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=422,
+            detail="ids must be integers"
+        )
+    return _batch(catalog, seed_ids)
+
+
+@router.post("/batch", response_model=SeedBatchResponse)
+async def post_seed_batch(
+    request: SeedBatchRequest,
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_user)
+):
+    """Same as GET /batch, for id lists too long for a URL"""
+    return _batch(catalog, request.ids)
+
+
+@router.get("/prices", response_model=List[SeedPriceResponse])
+async def get_prices_at(
+    at: datetime = Query(..., description="Point in time; UTC unless it has an offset"),
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_user)
+):
+    """Every seed's price at a point in time"""
+    return catalog.prices_at(at)
+
+
+@router.post("/reprice", response_model=RepriceResponse)
+async def reprice_seeds(
+    request: RepriceRequest,
+    catalog: CatalogService = Depends(get_catalog_writer),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Set many prices in one transaction (Admin only)"""
+    return catalog.reprice({item.seed_id: item.price for item in request.items},
+                           actor=current_user)
 
 
 @router.get("/{seed_id}", response_model=SeedResponse)
 async def get_seed(
     seed_id: int,
-    db: Session = Depends(get_db),
+    catalog: CatalogService = Depends(get_catalog_reader),
     current_user: User = Depends(get_current_user)
 ):
-    seed = db.query(Seed).filter(Seed.id == seed_id).first()
-    if not seed:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Seed not found")
-    return seed
+    return catalog.get(seed_id)
+
+
+@router.get("/{seed_id}/related", response_model=List[RelatedSeedResponse])
+async def get_related_seeds(
+    seed_id: int,
+    limit: int = Query(None, ge=1, description="At most RECOMMENDATIONS_TOP_K"),
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_user)
+):
+    """Seeds frequently bought together with this one, most often first"""
+    top_k = settings.RECOMMENDATIONS_TOP_K
+    return catalog.related(seed_id, min(limit or top_k, top_k))
+
+
+@router.get("/{seed_id}/prices", response_model=List[SeedPriceResponse])
+async def get_price_history(
+    seed_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_user)
+):
+    """A seed's prices, newest first"""
+    return catalog.price_history(seed_id, limit)
+
+
+@router.get("/{seed_id}/price", response_model=SeedPriceResponse)
+async def get_price_at(
+    seed_id: int,
+    at: Optional[datetime] = Query(None, description="Point in time (default: now)"),
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_user)
+):
+    """The price a seed had at a point in time"""
+    return catalog.price_at(seed_id, at or datetime.now(timezone.utc))
 
 
 @router.put("/{seed_id}", response_model=SeedResponse)
 async def update_seed(
     seed_id: int,
     seed_data: SeedUpdate,
-    db: Session = Depends(get_db),
+    catalog: CatalogService = Depends(get_catalog_writer),
     current_user: User = Depends(get_current_user)
 ):
-    seed = db.query(Seed).filter(Seed.id == seed_id).first()
-    if not seed:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Seed not found")
-    update_data = seed_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(seed, field, value)
-    db.commit()
-    db.refresh(seed)
-    return seed
+    return catalog.update(seed_id, seed_data.model_dump(exclude_unset=True),
+                          actor=current_user)
 
 
 @router.delete("/{seed_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_seed(
     seed_id: int,
-    db: Session = Depends(get_db),
+    catalog: CatalogService = Depends(get_catalog_writer),
     current_user: User = Depends(get_current_admin_user)
 ):
-    seed = db.query(Seed).filter(Seed.id == seed_id).first()
-    if not seed:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Seed not found")
-    db.delete(seed)
-    db.commit()
+    catalog.delete(seed_id, actor=current_user)
     return None
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.database import ReadDB
+from app.models.user import User
+from app.schemas.store import StockTotalResponse, StoreRestockRequest, StoreStockResponse
+from app.middleware.auth import get_current_user, get_current_admin_user
+from app.services.catalog import CatalogService, get_catalog_reader
+from app.services.stores import (
+    StoreInventory, get_shard_router, get_store_reader, get_store_writer, stock_totals)
+
+router = APIRouter(prefix="/api/stores", tags=["stores"])
+
+StoreReaderDep = Depends(get_store_reader, scope="function")
+StoreWriterDep = Depends(get_store_writer, scope="function")
+
+
+@router.get("", response_model=List[str])
+async def list_stores(current_user: User = Depends(get_current_user)):
+    """Configured store ids"""
+    return get_shard_router().stores
+
+
+@router.get("/stock-totals", response_model=List[StockTotalResponse])
+async def get_stock_totals(
+    ids: Optional[List[int]] = Query(None, description="Only these seeds"),
+    db: Session = ReadDB,
+    current_user: User = Depends(get_current_user)
+):
+    """Stock per seed summed over every store"""
+    return stock_totals(db, ids)
+
+
+@router.get("/{store_id}/stock", response_model=List[StoreStockResponse])
+async def get_store_stock(inventory: StoreInventory = StoreReaderDep):
+    """The store's stock (members of the store and admins)"""
+    return inventory.stock()
+
+
+@router.post("/{store_id}/seeds/{seed_id}/purchase", response_model=StoreStockResponse)
+async def purchase_in_store(seed_id: int, inventory: StoreInventory = StoreWriterDep):
+    """Buy one unit from the store's stock"""
+    return inventory.purchase(seed_id)
+
+
+@router.post("/{store_id}/seeds/{seed_id}/restock", response_model=StoreStockResponse)
+async def restock_store(
+    seed_id: int,
+    restock_data: StoreRestockRequest,
+    inventory: StoreInventory = StoreWriterDep,
+    catalog: CatalogService = Depends(get_catalog_reader),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Add stock of a catalog seed to the store (Admin only)"""
+    catalog.get(seed_id)  # raises SeedNotFoundError
+    return inventory.restock(seed_id, restock_data.quantity)
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class ReorderSuggestionResponse(BaseModel):
+    seed_id: int
+    name: str
+    category: str
+    on_hand: int
+    daily_rate: float
+    seasonality: float
+    forecast_daily: float
+    safety_stock: float
+    reorder_point: float
+    suggested_quantity: int
+    days_of_cover: Optional[float] = None
+    computed_at: datetime
+
+
+class ForecastRunResponse(BaseModel):
+    seeds: int
+    days: int
+    suggested: int
+    computed_at: datetime
+    load_ms: float
+    compute_ms: float
+    write_ms: float
+    duration_ms: float
+
+
+class ReorderSuggestionsResponse(BaseModel):
+    """Least days of cover first; `suggested` counts every seed due a reorder"""
+    last_run: Optional[ForecastRunResponse] = None
+    suggested: int
+    items: List[ReorderSuggestionResponse]
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class AuditEntryResponse(BaseModel):
+    id: int
+    created_at: datetime
+    actor_id: Optional[int] = None
+    actor_email: Optional[str] = None
+    action: str  # create, update, delete or restock
+    entity: str
+    entity_id: int
+    # {field: [before, after]}
+    changes: Dict[str, List[Any]]
+
+
+class AuditPageResponse(BaseModel):
+    """Entries newest first; pass next_before_id as before_id for the next page"""
+    items: List[AuditEntryResponse]
+    next_before_id: Optional[int] = None
+
+
+class AuditStatsResponse(BaseModel):
+    """This process's audit buffer (None when the audit log is off)"""
+    buffer: Optional[Dict[str, int]] = None
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str  # queued, running, succeeded or failed
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    created_by: Optional[int] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    payload: Dict[str, Any]
+    result: Optional[Any] = None
+
+
+class JobStatsResponse(BaseModel):
+    """Jobs per status, and this process's runner (None when disabled)"""
+    counts: Dict[str, int]
+    runner: Optional[Dict[str, int]] = None
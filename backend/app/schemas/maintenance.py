@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class MaintenanceRunResponse(BaseModel):
+    last_run: str
+    duration_ms: float
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class MaintenanceResponse(BaseModel):
+    """Database sizes and the last run of each maintenance task"""
+    database: Dict[str, Any]
+    tasks: Dict[str, MaintenanceRunResponse]
+    # Seconds between scheduled runs of each task
+    intervals: Dict[str, float]
+    # Whether this process runs the schedule (None when the scheduler is off)
+    leader: Optional[bool] = None
+
+
+class BackupResponse(BaseModel):
+    name: str
+    bytes: int
+    created_at: datetime
+    compressed: bool
+
+
+class BackupListResponse(BaseModel):
+    """Snapshots newest first, and the stats of the last backup job"""
+    backups: List[BackupResponse]
+    last_backup: Optional[Dict[str, Any]] = None
+
+
+class RestoreResponse(BaseModel):
+    restored: str
+    # Snapshot of the contents the restore replaced
+    safety_backup: str
+    duration_ms: float
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class CheckoutItem(BaseModel):
+    seed_id: int
+    quantity: int = Field(default=1, ge=1)
+
+
+class CheckoutRequest(BaseModel):
+    """Repeated seeds are added together"""
+    items: List[CheckoutItem] = Field(..., min_length=1)
+
+
+class OrderLineResponse(BaseModel):
+    seed_id: int
+    quantity: int
+    list_price: float
+    unit_price: float
+    rule_id: Optional[int] = None
+    line_total: float
+
+
+class OrderResponse(BaseModel):
+    id: int
+    user_id: int
+    total: float
+    pricing_version: int
+    created_at: datetime
+    lines: List[OrderLineResponse]
+
+
+class OrderPageResponse(BaseModel):
+    """Newest first; pass `next_before_id` as `before_id` for the next page"""
+    items: List[OrderResponse]
+    next_before_id: Optional[int] = None
@@ -0,0 +1,78 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class PricingRuleCreate(BaseModel):
+    """Set exactly one of percent_off and amount_off (per unit). Target a
+    seed_id or a category, or neither for every seed."""
+    name: str = Field(..., min_length=1, max_length=100)
+    seed_id: Optional[int] = None
+    category: Optional[str] = Field(None, min_length=1, max_length=50)
+    percent_off: Optional[float] = Field(None, gt=0, le=100)
+    amount_off: Optional[float] = Field(None, gt=0)
+    min_quantity: int = Field(default=1, ge=1)
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    active: bool = True
+
+
+class PricingRuleUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    seed_id: Optional[int] = None
+    category: Optional[str] = Field(None, min_length=1, max_length=50)
+    percent_off: Optional[float] = Field(None, gt=0, le=100)
+    amount_off: Optional[float] = Field(None, gt=0)
+    min_quantity: Optional[int] = Field(None, ge=1)
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    active: Optional[bool] = None
+
+
+class PricingRuleResponse(BaseModel):
+    """Times are UTC"""
+    id: int
+    name: str
+    seed_id: Optional[int] = None
+    category: Optional[str] = None
+    percent_off: Optional[float] = None
+    amount_off: Optional[float] = None
+    min_quantity: int
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class QuoteItem(BaseModel):
+    seed_id: int
+    quantity: int = Field(default=1, ge=1)
+
+
+class QuoteRequest(BaseModel):
+    items: List[QuoteItem] = Field(..., min_length=1)
+    at: Optional[datetime] = Field(None, description="Price at this time (default: now)")
+
+
+class QuoteLine(BaseModel):
+    seed_id: int
+    name: str
+    quantity: int
+    list_price: float
+    unit_price: float
+    rule_id: Optional[int] = None
+    line_total: float
+
+
+class QuoteResponse(BaseModel):
+    """Priced lines, the requested ids that do not exist, and the pricing
+    rules version the prices were computed with"""
+    version: int
+    priced_at: datetime
+    items: List[QuoteLine]
+    missing: List[int]
+    total: float
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import date, datetime
 
 
 class SeedCreate(BaseModel):
@@ -31,3 +31,91 @@ class SeedResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RelatedSeedResponse(SeedResponse):
+    """A seed and the number of orders it shared with the requested seed"""
+    orders: int
+
+
+class SeedChanges(BaseModel):
+    """Delta sync page: pass `seq` back as `since` to get the next one"""
+    seq: int
+    changed: List[SeedResponse]
+    deleted: List[int]
+    has_more: bool = False
+
+
+class SeedBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+
+class SeedBatchResponse(BaseModel):
+    """Seeds in request order, plus the requested ids that do not exist"""
+    items: List[SeedResponse]
+    missing: List[int]
+
+
+class PricedSeedResponse(SeedResponse):
+    """A seed with its price for one unit after pricing rules"""
+    effective_price: float
+    rule_id: Optional[int] = None
+
+
+class SeedQueryResponse(BaseModel):
+    """One page of filtered seeds, the total match count and category facets"""
+    total: int
+    items: List[PricedSeedResponse]
+    facets: Dict[str, int]
+
+
+class CategoryFacet(BaseModel):
+    category: str
+    count: int
+    in_stock: int
+    min_price: float
+    max_price: float
+    histogram: List[int]
+
+
+class SeedFacetsResponse(BaseModel):
+    """Categories with counts; `histogram[i]` counts seeds priced from
+    `price_buckets[i]` up to the next bound (the last bucket is open-ended)"""
+    price_buckets: List[float]
+    categories: List[CategoryFacet]
+
+
+class SeedLotResponse(BaseModel):
+    id: int
+    seed_id: int
+    quantity: int
+    remaining: int
+    packed_on: date
+    expires_on: date
+
+
+class ExpiringLotResponse(SeedLotResponse):
+    name: str
+
+
+class SeedPriceResponse(BaseModel):
+    """A price and when it took effect (UTC); None once the seed was deleted"""
+    id: int
+    seed_id: int
+    price: Optional[float] = None
+    effective_from: datetime
+
+
+class RepriceItem(BaseModel):
+    seed_id: int
+    price: float = Field(..., gt=0)
+
+
+class RepriceRequest(BaseModel):
+    items: List[RepriceItem] = Field(..., min_length=1)
+
+
+class RepriceResponse(BaseModel):
+    """Seeds whose price changed, and the requested ids that do not exist"""
+    updated: List[int]
+    missing: List[int]
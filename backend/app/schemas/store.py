@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+
+class StoreStockResponse(BaseModel):
+    store_id: str
+    seed_id: int
+    quantity: int
+
+
+class StoreRestockRequest(BaseModel):
+    quantity: int = Field(..., gt=0)
+
+
+class StockTotalResponse(BaseModel):
+    """A seed's stock summed over all stores (updated by the rollup task)"""
+    seed_id: int
+    quantity: int
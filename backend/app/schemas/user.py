@@ -17,13 +17,24 @@ class UserResponse(BaseModel):
     id: int
     email: str
     role: str
+    store_id: Optional[str] = None
     created_at: datetime
     
     class Config:
         from_attributes = True
 
 
+class StoreMembership(BaseModel):
+    """The store a user belongs to; null removes them from their store"""
+    store_id: Optional[str] = None
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
@@ -0,0 +1,35 @@
+"""Launch the API with one or more worker processes.
+
+    python -m app.serve --workers 4
+
+Each worker is a separate uvicorn process with its own caches. Startup tasks
+are serialized through the startup lock and caches stay coherent through
+the shared state backend, which must be 'sqlite' when running more than one
+worker.
+"""
+import argparse
+import os
+
+import uvicorn
+
+from app.config import settings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Seed Shop API")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    args = parser.parse_args(argv)
+
+    workers = max(1, args.workers)
+    if workers > 1 and settings.SHARED_STATE_BACKEND == "local":
+        # Worker processes read their settings from the environment
+        print("serve: local shared state cannot span workers; using 'sqlite'")
+        os.environ["SHARED_STATE_BACKEND"] = "sqlite"
+
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Audit log of catalog mutations, written in batches off the request path.
+
+The seeds and inventory routers pass the acting user to CatalogService's
+create, update, delete and restock. After the mutation commits, the service
+calls `record` with the row before and after the change. `record` computes
+the field diff and appends it to `AuditLog`'s in-memory buffer. The
+mutation's transaction never waits on an audit INSERT.
+
+A background task inserts buffered entries in one executemany per batch.
+It runs every AUDIT_FLUSH_SECONDS, or sooner once AUDIT_BATCH_SIZE entries
+are waiting. How much can be lost:
+
+- A crash loses at most the entries recorded since the last flush.
+- A clean shutdown flushes everything. Entries that still cannot be
+  inserted are appended to AUDIT_SPILL_PATH, which the next start inserts.
+- A failed flush keeps its batch and retries. While the database stays
+  unavailable the buffer holds up to AUDIT_BUFFER_MAX entries. After that,
+  new entries are dropped and counted in `stats()["dropped"]`.
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.audit import AuditEntry
+
+# Seed columns compared for update diffs
+SEED_AUDIT_FIELDS = ("name", "category", "price", "quantity", "image")
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def seed_state(seed) -> dict:
+    """Audited fields of a Seed, or of a seed row dict"""
+    if isinstance(seed, dict):
+        return {field: _json_value(seed.get(field)) for field in SEED_AUDIT_FIELDS}
+    return {field: _json_value(getattr(seed, field)) for field in SEED_AUDIT_FIELDS}
+
+
+def diff(before: Optional[dict], after: Optional[dict]) -> dict:
+    """{field: [before, after]} for every field that changed"""
+    before, after = before or {}, after or {}
+    return {field: [before.get(field), after.get(field)]
+            for field in sorted(before.keys() | after.keys())
+            if before.get(field) != after.get(field)}
+
+
+def entry_to_dict(entry: AuditEntry) -> dict:
+    return {
+        "id": entry.id,
+        "created_at": entry.created_at,
+        "actor_id": entry.actor_id,
+        "actor_email": entry.actor_email,
+        "action": entry.action,
+        "entity": entry.entity,
+        "entity_id": entry.entity_id,
+        "changes": json.loads(entry.changes),
+    }
+
+
+class AuditLog:
+    def __init__(self, session_factory: sessionmaker = SessionLocal,
+                 flush_seconds: float = None, batch_size: int = None,
+                 buffer_max: int = None, spill_path: str = None):
+        self.session_factory = session_factory
+        self.flush_seconds = (settings.AUDIT_FLUSH_SECONDS
+                              if flush_seconds is None else flush_seconds)
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.buffer_max = buffer_max or settings.AUDIT_BUFFER_MAX
+        self.spill_path = spill_path or settings.AUDIT_SPILL_PATH
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        # One flush at a time, so entries are inserted in recorded order
+        self._flush_lock = threading.Lock()
+        self.recorded = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, actor, action: str, entity: str, entity_id: int,
+               before: Optional[dict], after: Optional[dict]) -> None:
+        """Buffer one entry; never blocks on the database"""
+        changes = diff(before, after)
+        if action == "update" and not changes:
+            return
+        row = {
+            "created_at": datetime.now(timezone.utc),
+            "actor_id": getattr(actor, "id", None),
+            "actor_email": getattr(actor, "email", None),
+            "action": action,
+            "entity": entity,
+            "entity_id": entity_id,
+            "changes": json.dumps(changes),
+        }
+        with self._lock:
+            if len(self._buffer) >= self.buffer_max:
+                self.dropped += 1
+                return
+            self._buffer.append(row)
+            self.recorded += 1
+            waiting = len(self._buffer)
+        if waiting >= self.batch_size and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def flush(self) -> int:
+        """Insert everything buffered; returns the number of entries written.
+
+        A failed batch goes back to the front of the buffer and the error
+        propagates.
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft()
+                             for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return written
+                try:
+                    self._insert(batch)
+                except Exception:
+                    with self._lock:
+                        self._buffer.extendleft(reversed(batch))
+                    self.failed_flushes += 1
+                    raise
+                written += len(batch)
+                self.flushed += len(batch)
+                self.batches += 1
+
+    def _insert(self, rows: List[dict]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditEntry), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def spill(self) -> int:
+        """Append buffered entries to the spill file (shutdown fallback)"""
+        with self._lock:
+            rows, self._buffer = list(self._buffer), deque()
+        if rows:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps({**row, "created_at": row["created_at"].isoformat()})
+                            + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        return len(rows)
+
+    def replay_spill(self) -> int:
+        """Insert entries spilled by an earlier shutdown, then remove the file"""
+        if not os.path.exists(self.spill_path):
+            return 0
+        with open(self.spill_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        for row in rows:
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+        # One transaction, so a failed replay can simply be retried
+        self._insert(rows)
+        os.remove(self.spill_path)
+        return len(rows)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def stats(self) -> dict:
+        return {"pending": self.pending(), "recorded": self.recorded,
+                "flushed": self.flushed, "dropped": self.dropped,
+                "batches": self.batches, "failed_flushes": self.failed_flushes}
+
+    def start(self) -> None:
+        """Start the flush task on the running event loop"""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task, then flush (or spill) whatever is buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            print(f"Audit flush failed on shutdown ({e}); "
+                  f"spilled {self.spill()} entries to {self.spill_path}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:  # keep the entries and retry next time
+                print(f"Audit flush failed: {e}")
+
+
+audit_log: Optional[AuditLog] = None
+
+
+def record(actor, action: str, entity: str, entity_id: int,
+           before: Optional[dict], after: Optional[dict]) -> None:
+    """Buffer an entry when the audit log is running; a no-op otherwise"""
+    if audit_log is not None and actor is not None:
+        audit_log.record(actor, action, entity, entity_id, before, after)
+
+
+def query_entries(db: Session, entity: Optional[str] = None,
+                  entity_id: Optional[int] = None, actor_id: Optional[int] = None,
+                  action: Optional[str] = None, before_id: Optional[int] = None,
+                  limit: int = 50) -> dict:
+    """A page of entries, newest first, and the cursor for the next page"""
+    statement = select(AuditEntry).order_by(AuditEntry.id.desc()).limit(limit + 1)
+    if entity is not None:
+        statement = statement.where(AuditEntry.entity == entity)
+    if entity_id is not None:
+        statement = statement.where(AuditEntry.entity_id == entity_id)
+    if actor_id is not None:
+        statement = statement.where(AuditEntry.actor_id == actor_id)
+    if action is not None:
+        statement = statement.where(AuditEntry.action == action)
+    if before_id is not None:
+        statement = statement.where(AuditEntry.id < before_id)
+    entries = db.execute(statement).scalars().all()
+    page = entries[:limit]
+    return {"items": [entry_to_dict(entry) for entry in page],
+            "next_before_id": page[-1].id if len(entries) > limit else None}
+
+
+async def start_audit_log() -> None:
+    global audit_log
+    if settings.AUDIT_LOG and audit_log is None:
+        audit_log = AuditLog()
+        try:
+            replayed = await asyncio.to_thread(audit_log.replay_spill)
+        except Exception as e:
+            print(f"Could not replay {audit_log.spill_path}: {e}")
+        else:
+            if replayed:
+                print(f"Inserted {replayed} audit entries spilled at the last shutdown")
+        audit_log.start()
+
+
+async def stop_audit_log() -> None:
+    global audit_log
+    if audit_log is not None:
+        await audit_log.stop()
+        audit_log = None
@@ -0,0 +1,314 @@
+"""Online backups of the SQLite database, and restores from them.
+
+    python -m app.services.backups create
+    python -m app.services.backups list
+    python -m app.services.backups restore seed_shop-20240101T000000000000Z.db.gz
+
+Copying seed_shop.db with cp while purchases commit can capture a torn
+file, and locking the database for the copy stalls checkout. Instead,
+`create_backup` uses SQLite's online backup API. It copies
+BACKUP_STEP_PAGES pages per step and pauses BACKUP_STEP_SLEEP_SECONDS
+between steps, so requests keep the disk and the GIL. The source
+connection holds one read transaction for the whole copy. In WAL mode that
+never blocks writers, and the snapshot is of a single point in time.
+Without it, every commit by another connection would restart the copy.
+
+Each copy is checked with PRAGMA quick_check, gzipped, and renamed into
+BACKUP_DIR. Only the newest BACKUP_KEEP snapshots are kept. `restore`
+unpacks and checks the chosen snapshot, snapshots the current database
+(without rotating the chosen one away), then writes the chosen snapshot
+back through the app's writer connection, so requests wait on the writer
+instead of failing. Store shards (STORE_SHARD_DIR) are separate files and
+are not included.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import _sqlite_file
+from app.models.meta import current_sequence, get_meta, set_meta
+from app.services.jobs import job_handler
+
+BACKUP_JOB = "sqlite_backup"
+
+# Last backup's stats, in app_meta
+LAST_BACKUP_META = "backup:last"
+
+SNAPSHOT_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+-\d{8}T\d{6}(\d{6})?Z\.db(\.gz)?$")
+
+COPY_CHUNK = 1024 * 1024
+
+
+class BackupError(Exception):
+    """The database cannot be backed up or restored"""
+
+
+class UnknownSnapshotError(BackupError):
+    """No snapshot by that name in the backup directory"""
+
+
+def _database_path(bind: Engine) -> str:
+    path = _sqlite_file(str(bind.url))
+    if path is None:
+        raise BackupError("Online backups need a file-backed SQLite database")
+    return path
+
+
+def _snapshot_name(path: str, now: datetime) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    suffix = ".db.gz" if settings.BACKUP_COMPRESS_LEVEL > 0 else ".db"
+    return f"{stem}-{now.strftime('%Y%m%dT%H%M%S%fZ')}{suffix}"
+
+
+def _snapshot_path(directory: str, name: str) -> str:
+    # Names come from URLs and the command line: never leave the directory
+    if not SNAPSHOT_PATTERN.match(name):
+        raise UnknownSnapshotError(f"Not a snapshot name: {name!r}")
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        raise UnknownSnapshotError(f"No such snapshot: {name}")
+    return path
+
+
+def _copy_online(source_path: str, target_path: str, pages: int, pause: float) -> dict:
+    """Copy a live database page-range by page-range with the backup API"""
+    steps = 0
+    longest = 0.0
+    last = time.perf_counter()
+
+    def progress(status, remaining, total):
+        nonlocal steps, longest, last
+        now = time.perf_counter()
+        steps += 1
+        longest = max(longest, now - last)
+        if remaining and pause > 0:
+            time.sleep(pause)
+        last = time.perf_counter()
+
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True,
+                             isolation_level=None, check_same_thread=False)
+    target = sqlite3.connect(target_path, isolation_level=None)
+    try:
+        wal = source.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        if wal:
+            # Pin one snapshot for every step; WAL writers carry on meanwhile
+            source.execute("BEGIN")
+            source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        source.backup(target, pages=pages, progress=progress)
+        if wal:
+            source.execute("COMMIT")
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        # A self-contained file: no -wal sidecar needed to open the snapshot
+        target.execute("PRAGMA journal_mode=DELETE")
+        if settings.BACKUP_VERIFY:
+            check = target.execute("PRAGMA quick_check").fetchone()[0]
+            if check != "ok":
+                raise BackupError(f"Backup copy failed quick_check: {check}")
+    finally:
+        target.close()
+        source.close()
+    return {"pages": page_count, "steps": steps,
+            "longest_step_ms": round(longest * 1000, 2)}
+
+
+def _compress(source_path: str, target_path: str, level: int) -> None:
+    with open(source_path, "rb") as source, \
+            gzip.open(target_path, "wb", compresslevel=level) as target:
+        shutil.copyfileobj(source, target, COPY_CHUNK)
+
+
+def _fsync(path: str) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def list_backups(directory: Optional[str] = None) -> List[dict]:
+    """Snapshots in BACKUP_DIR, newest first"""
+    directory = directory or settings.BACKUP_DIR
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in os.listdir(directory):
+        if SNAPSHOT_PATTERN.match(name):
+            stat = os.stat(os.path.join(directory, name))
+            snapshots.append({
+                "name": name,
+                "bytes": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                "compressed": name.endswith(".gz"),
+            })
+    # Names embed the UTC time, so they sort chronologically
+    return sorted(snapshots, key=lambda s: s["name"], reverse=True)
+
+
+def rotate_backups(directory: Optional[str] = None, keep: Optional[int] = None,
+                   protect: Optional[str] = None) -> List[str]:
+    """Delete all but the newest `keep` snapshots, never `protect`; returns
+    the deleted names"""
+    keep = settings.BACKUP_KEEP if keep is None else keep
+    deleted = [s["name"] for s in list_backups(directory)[max(keep, 1):]
+               if s["name"] != protect]
+    for name in deleted:
+        os.remove(os.path.join(directory or settings.BACKUP_DIR, name))
+    return deleted
+
+
+def create_backup(bind: Engine, directory: Optional[str] = None,
+                  protect: Optional[str] = None) -> dict:
+    """Snapshot the database into `directory`, then rotate, sparing the
+    snapshot named `protect`; returns stats"""
+    source_path = _database_path(bind)
+    directory = directory or settings.BACKUP_DIR
+    os.makedirs(directory, exist_ok=True)
+    started = time.perf_counter()
+    name = _snapshot_name(source_path, datetime.now(timezone.utc))
+    fd, copy_path = tempfile.mkstemp(prefix=".backup-", suffix=".db", dir=directory)
+    os.close(fd)
+    try:
+        stats = _copy_online(source_path, copy_path, settings.BACKUP_STEP_PAGES,
+                             settings.BACKUP_STEP_SLEEP_SECONDS)
+        copied = time.perf_counter()
+        database_bytes = os.path.getsize(copy_path)
+        part_path = os.path.join(directory, f".{name}.part")
+        if settings.BACKUP_COMPRESS_LEVEL > 0:
+            _compress(copy_path, part_path, settings.BACKUP_COMPRESS_LEVEL)
+        else:
+            os.replace(copy_path, part_path)
+        _fsync(part_path)
+        # Atomic: a snapshot in the directory is always complete
+        os.replace(part_path, os.path.join(directory, name))
+    finally:
+        for leftover in (copy_path, os.path.join(directory, f".{name}.part")):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    finished = time.perf_counter()
+    copy_seconds = copied - started
+    stats.update({
+        "name": name,
+        "database_bytes": database_bytes,
+        "snapshot_bytes": os.path.getsize(os.path.join(directory, name)),
+        "copy_ms": round(copy_seconds * 1000, 2),
+        "compress_ms": round((finished - copied) * 1000, 2),
+        "duration_ms": round((finished - started) * 1000, 2),
+        "copy_mb_per_s": round(database_bytes / 1e6 / max(copy_seconds, 1e-9), 1),
+        "rotated": rotate_backups(directory, protect=protect),
+    })
+    return stats
+
+
+def restore_backup(bind: Engine, name: str, directory: Optional[str] = None) -> dict:
+    """Replace the database's contents with a snapshot.
+
+    The snapshot is unpacked and checked first, then the current contents
+    are snapshotted; that rotation spares the snapshot being restored. The
+    copy runs in one step on the writer connection, so writers queue
+    behind it. Catalog change numbers continue past the old ones, and
+    delta sync cursors from before the restore must resync.
+    """
+    from app.services.catalog import CATALOG_SEQUENCE, restart_changes
+
+    directory = directory or settings.BACKUP_DIR
+    snapshot_path = _snapshot_path(directory, name)
+    _database_path(bind)
+    started = time.perf_counter()
+
+    fd, plain_path = tempfile.mkstemp(prefix=".restore-", suffix=".db", dir=directory)
+    os.close(fd)
+    try:
+        if name.endswith(".gz"):
+            with gzip.open(snapshot_path, "rb") as source, open(plain_path, "wb") as target:
+                shutil.copyfileobj(source, target, COPY_CHUNK)
+        else:
+            shutil.copyfile(snapshot_path, plain_path)
+        source = sqlite3.connect(plain_path)
+        try:
+            check = source.execute("PRAGMA quick_check").fetchone()[0]
+            if check != "ok":
+                raise BackupError(f"Snapshot {name} failed quick_check: {check}")
+            safety = create_backup(bind, directory, protect=name)
+            # Nothing else writes while the writer connection is ours
+            with bind.connect() as conn, Session(bind=conn) as db:
+                last_seq = current_sequence(db, CATALOG_SEQUENCE)
+                db.commit()
+                source.backup(conn.connection.driver_connection)
+                restart_changes(db, last_seq)
+                db.commit()
+        finally:
+            source.close()
+    finally:
+        os.remove(plain_path)
+    _announce_restore()
+    return {"restored": name, "safety_backup": safety["name"],
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def _announce_restore() -> None:
+    # The catalog went back in time: drop cached list/search responses,
+    # catalog snapshots and price books
+    from app.services.catalog import CATALOG_CHANNEL
+    from app.services.shared_state import get_shared_state
+    get_shared_state().publish(CATALOG_CHANNEL, "restore:0")
+
+
+def last_backup(db: Session) -> Optional[dict]:
+    value = get_meta(db, LAST_BACKUP_META)
+    return json.loads(value) if value else None
+
+
+@job_handler(BACKUP_JOB)
+def backup_job(db: Session, payload: dict) -> dict:
+    stats = create_backup(db.get_bind())
+    set_meta(db, LAST_BACKUP_META, json.dumps(
+        {**stats, "finished_at": datetime.now(timezone.utc).isoformat()}))
+    db.commit()
+    return stats
+
+
+def main(argv=None) -> int:
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default=settings.BACKUP_DIR, help="snapshot directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("create", help="snapshot the database and rotate old snapshots")
+    commands.add_parser("list", help="list snapshots, newest first")
+    restore = commands.add_parser("restore", help="restore a snapshot")
+    restore.add_argument("name")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "create":
+            stats = create_backup(engine, args.dir)
+            print(f"{stats['name']}: {stats['database_bytes']} bytes in "
+                  f"{stats['copy_ms']:.0f} ms ({stats['copy_mb_per_s']} MB/s), "
+                  f"{stats['snapshot_bytes']} bytes compressed")
+            for name in stats["rotated"]:
+                print(f"Deleted old snapshot {name}")
+        elif args.command == "list":
+            for snapshot in list_backups(args.dir):
+                print(f"{snapshot['name']}  {snapshot['bytes']:>12} bytes")
+        else:
+            result = restore_backup(engine, args.name, args.dir)
+            print(f"Restored {result['restored']} (previous contents saved as "
+                  f"{result['safety_backup']})")
+    except BackupError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
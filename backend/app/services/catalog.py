@@ -0,0 +1,678 @@
+"""Catalog service: the single owner of seed queries and mutations.
+
+Routers are thin adapters over `CatalogService`. Statements are built in one
+place so they can be reused for batching and inspected by tooling, and every
+committed mutation is published on the shared state `catalog` channel so
+per-process caches can invalidate themselves.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from fastapi import status
+from sqlalchemy import Select, bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import ReadDB, WriteDB
+from app.models.meta import (
+    committed_sequence, current_sequence, get_meta, reserve_sequence, set_meta, set_sequence)
+from app.models.lot import LOT_HAS_STOCK, SeedLot
+from app.models.recommendation import RelatedSeed
+from app.models.seed import Seed, SeedTombstone, DEFAULT_SEED_IMAGE
+from app.services import audit
+from app.services.facets import FacetChanges, read_facets
+from app.services.forecast import record_sales
+from app.services.lots import LOT_COLUMNS, add_lot, allocate, delete_lots, expiring_statement
+from app.services.orders import MAX_ORDER_LINES, add_order
+from app.services.prices import (
+    history_statement, price_at_statement, prices_at_statement, record_prices)
+from app.services.recommendations import add_order_pairs
+from app.services.shared_state import get_shared_state, subscribe
+from app.services.single_flight import SingleFlight
+from app.utils.serialization import SEED_COLUMNS, dump_seed_row_chunks, seed_rows_to_dicts
+
+# Shared state channel carrying "<action>:<seed_id>" change messages
+CATALOG_CHANNEL = "catalog"
+
+# Counter behind Seed.change_seq and SeedTombstone.change_seq
+CATALOG_SEQUENCE = "catalog"
+
+# Change cursors below this value (in app_meta) predate a restore
+CATALOG_RESYNC_META = "catalog:resync_before"
+
+# Sortable columns for query(); "-name" etc. sorts descending
+SORT_FIELDS = {"id": Seed.id, "name": Seed.name, "price": Seed.price,
+               "quantity": Seed.quantity}
+
+# Batch lookups: ids accepted per request, and ids per IN (...) query.
+# 900 stays under the 999 bound parameters older SQLite builds allow.
+MAX_BATCH_IDS = 2000
+BATCH_CHUNK_SIZE = 900
+
+# Concurrent identical list/search requests share one query and one body
+catalog_flights = SingleFlight()
+
+# Bumped on every catalog change in any worker. Part of the single-flight
+# key, so a request that arrives after a change never joins a query that
+# started before it.
+_generation = 0
+
+
+def _bump_generation(message: str) -> None:
+    global _generation
+    _generation += 1
+
+
+subscribe(CATALOG_CHANNEL, _bump_generation)
+
+
+def _optional_text(value: Optional[str]) -> Optional[str]:
+    # Filters match with ILIKE, so ASCII case does not change the result
+    if not value:
+        return None
+    return value.lower() if value.isascii() else value
+
+
+def _optional_price(value: Optional[float]) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+# List endpoints select plain tuples in SeedResponse field order
+SEED_ROW_COLUMNS = [getattr(Seed, column) for column in SEED_COLUMNS]
+# The same columns for Core UPDATE ... RETURNING
+SEED_TABLE_COLUMNS = [Seed.__table__.c[column] for column in SEED_COLUMNS]
+
+
+class CatalogError(Exception):
+    """Domain error mapped to an HTTP response by the app exception handler"""
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Catalog error"
+
+    def __init__(self, detail: Optional[str] = None):
+        super().__init__(detail or self.detail)
+        if detail:
+            self.detail = detail
+
+
+class SeedNotFoundError(CatalogError):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Seed not found"
+
+
+class OutOfStockError(CatalogError):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Seed is out of stock"
+
+
+class NoPriceError(CatalogError):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Seed had no price at that time"
+
+
+class TooManyIdsError(CatalogError):
+    status_code = 422  # same as request validation errors
+    detail = f"At most {MAX_BATCH_IDS} ids per request"
+
+
+class ResyncRequiredError(CatalogError):
+    status_code = status.HTTP_410_GONE
+    detail = "Change cursor is no longer valid; sync again without `since`"
+
+
+def search_statement(
+    name: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> Select:
+    """Row-tuple query behind GET /api/seeds and /api/seeds/search"""
+    query = select(*SEED_ROW_COLUMNS)
+    if name:
+        query = query.where(Seed.name.ilike(f"%{name}%"))
+    if category:
+        query = query.where(Seed.category.ilike(f"%{category}%"))
+    if min_price is not None:
+        query = query.where(Seed.price >= min_price)
+    if max_price is not None:
+        query = query.where(Seed.price <= max_price)
+    return query
+
+
+def related_statement(seed_id: int, limit: int) -> Select:
+    """Seed rows plus shared order count from a seed's top list, best first"""
+    return (search_statement().add_columns(RelatedSeed.orders)
+            .join(RelatedSeed, RelatedSeed.related_id == Seed.id)
+            .where(RelatedSeed.seed_id == seed_id)
+            .order_by(RelatedSeed.rank).limit(limit))
+
+
+class CatalogService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Reads
+
+    def list_json(self) -> bytes:
+        """All seeds as a JSON array, streamed from the database in chunks"""
+        return dump_seed_row_chunks(self._stream(search_statement()))
+
+    def search_json(self, name=None, category=None, min_price=None,
+                    max_price=None) -> bytes:
+        return dump_seed_row_chunks(self._stream(
+            search_statement(name, category, min_price, max_price)))
+
+    async def shared_list_json(self) -> bytes:
+        """list_json(), shared with identical concurrent requests"""
+        return await catalog_flights.do(
+            ("list", _generation), self._detached(CatalogService.list_json))
+
+    async def shared_search_json(self, name=None, category=None, min_price=None,
+                                 max_price=None) -> bytes:
+        """search_json(), shared with concurrent requests for the same filters"""
+        params = (_optional_text(name), _optional_text(category),
+                  _optional_price(min_price), _optional_price(max_price))
+        return await catalog_flights.do(
+            ("search", params, _generation),
+            self._detached(CatalogService.search_json, *params))
+
+    def _detached(self, method, *args):
+        # The flight outlives whichever request started it, so it runs on
+        # its own session against the same database
+        bind = self.db.get_bind()
+
+        def run():
+            db = Session(bind=bind)
+            try:
+                return method(CatalogService(db), *args)
+            finally:
+                db.close()
+        return run
+
+    def _stream(self, statement: Select) -> Iterator[List[tuple]]:
+        # yield_per uses a server-side cursor on PostgreSQL, so large
+        # catalogs are fetched DB_STREAM_BATCH_SIZE rows per round trip
+        # instead of being buffered whole by the driver
+        result = self.db.execute(
+            statement.execution_options(yield_per=settings.DB_STREAM_BATCH_SIZE))
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
+
+    def changes(self, since: Optional[int], limit: int = 1000) -> dict:
+        """Rows changed and ids deleted after change sequence `since`.
+
+        since=None is the initial sync and returns the whole catalog.
+        Otherwise at most `limit` changes are returned in sequence order;
+        `seq` is the cursor for the next call and `has_more` says whether
+        to call again. A cursor this database never issued, or one from
+        before a restore, raises ResyncRequiredError.
+        """
+        # Everything up to `seq` has committed or rolled back. Later values
+        # may commit out of order on PostgreSQL, so they wait for a later call
+        seq = committed_sequence(self.db, CATALOG_SEQUENCE)
+        if since is not None and (
+                since > seq or since < int(get_meta(self.db, CATALOG_RESYNC_META) or 0)):
+            raise ResyncRequiredError()
+        if since is None:
+            rows = self.db.execute(search_statement()).all()
+            return {"seq": seq, "changed": seed_rows_to_dicts(rows),
+                    "deleted": [], "has_more": False}
+
+        rows = self.db.execute(
+            search_statement().add_columns(Seed.change_seq)
+            .where(Seed.change_seq > since, Seed.change_seq <= seq)
+            .order_by(Seed.change_seq).limit(limit + 1)).all()
+        tombstones = self.db.execute(
+            select(SeedTombstone.change_seq, SeedTombstone.seed_id)
+            .where(SeedTombstone.change_seq > since, SeedTombstone.change_seq <= seq)
+            .order_by(SeedTombstone.change_seq).limit(limit + 1)).all()
+        events = sorted(
+            [(row[-1], "changed", tuple(row)[:-1]) for row in rows] +
+            [(change_seq, "deleted", seed_id) for change_seq, seed_id in tombstones],
+            key=lambda event: event[0])
+        has_more = len(events) > limit
+        events = events[:limit]
+        if has_more:
+            seq = events[-1][0]
+        return {
+            "seq": seq,
+            "changed": seed_rows_to_dicts(e for _, kind, e in events if kind == "changed"),
+            "deleted": [e for _, kind, e in events if kind == "deleted"],
+            "has_more": has_more,
+        }
+
+    def query(self, categories: Optional[List[str]] = None,
+              min_price: Optional[float] = None, max_price: Optional[float] = None,
+              in_stock: bool = False, q: Optional[str] = None, sort: str = "id",
+              limit: int = 50, offset: int = 0) -> dict:
+        """Filter, sort and page the catalog, with per-category facet counts.
+
+        `categories` match exactly (ignoring case); facets count matches for
+        every category under the other filters. `sort` is a SORT_FIELDS key,
+        prefixed with "-" for descending; ties are broken by id. The
+        in-memory CatalogSnapshot answers the same queries without SQL.
+        """
+        filters = []
+        if min_price is not None:
+            filters.append(Seed.price >= min_price)
+        if max_price is not None:
+            filters.append(Seed.price <= max_price)
+        if in_stock:
+            filters.append(Seed.quantity > 0)
+        if q:
+            filters.append(Seed.name.ilike(f"%{q}%"))
+        facets = dict(self.db.execute(
+            select(Seed.category, func.count()).where(*filters)
+            .group_by(Seed.category)).all())
+
+        if categories:
+            filters.append(func.lower(Seed.category).in_([c.lower() for c in categories]))
+        total = self.db.execute(
+            select(func.count()).select_from(Seed).where(*filters)).scalar()
+        column = SORT_FIELDS[sort.lstrip("-")]
+        rows = self.db.execute(
+            search_statement().where(*filters)
+            .order_by(column.desc() if sort.startswith("-") else column, Seed.id)
+            .limit(limit).offset(offset)).all()
+        return {"total": total, "items": seed_rows_to_dicts(rows), "facets": facets}
+
+    def facets(self) -> dict:
+        """Per-category counts, price range and price histogram"""
+        return read_facets(self.db)
+
+    def lots(self, seed_id: int) -> List[dict]:
+        """A seed's lots with stock left, in the order they will be sold"""
+        self.get(seed_id)
+        statement = (select(*LOT_COLUMNS).where(SeedLot.seed_id == seed_id, LOT_HAS_STOCK)
+                     .order_by(SeedLot.expires_on, SeedLot.id))
+        return [row._asdict() for row in self.db.execute(statement)]
+
+    def expiring(self, days: int, limit: int = 500) -> List[dict]:
+        """Lots with stock left that expire within `days` (or already have)"""
+        until = date.today() + timedelta(days=days)
+        return [row._asdict() for row in self.db.execute(expiring_statement(until, limit))]
+
+    def price_history(self, seed_id: int, limit: int = 100) -> List[dict]:
+        """A seed's prices, newest first; kept after the seed is deleted"""
+        rows = [row._asdict() for row in self.db.execute(history_statement(seed_id, limit))]
+        if not rows:
+            self.get(seed_id)
+        return rows
+
+    def price_at(self, seed_id: int, at: datetime) -> dict:
+        """The price a seed had at `at`"""
+        row = self.db.execute(price_at_statement(seed_id, at)).first()
+        if row is None or row.price is None:
+            raise NoPriceError()
+        return row._asdict()
+
+    def prices_at(self, at: datetime) -> List[dict]:
+        """Every seed's price at `at`, for seeds on sale then"""
+        return [row._asdict() for row in self.db.execute(prices_at_statement(at))]
+
+    def related(self, seed_id: int, limit: int = 10) -> List[dict]:
+        """Seeds most often bought with `seed_id`, from its precomputed list"""
+        rows = self.db.execute(related_statement(seed_id, limit)).all()
+        if not rows:
+            self.get(seed_id)
+        return [{**dict(zip(SEED_COLUMNS, row)), "orders": row[-1]} for row in rows]
+
+    def get_many(self, seed_ids: List[int]) -> Tuple[List[tuple], List[int]]:
+        """Rows for `seed_ids` in request order, and the ids not found.
+
+        Duplicates are returned once. Ids are looked up BATCH_CHUNK_SIZE at a
+        time so a long list never exceeds the bound parameter limit.
+        """
+        wanted = list(dict.fromkeys(seed_ids))
+        if len(wanted) > MAX_BATCH_IDS:
+            raise TooManyIdsError()
+        found = {}
+        for start in range(0, len(wanted), BATCH_CHUNK_SIZE):
+            chunk = wanted[start:start + BATCH_CHUNK_SIZE]
+            for row in self.db.execute(search_statement().where(Seed.id.in_(chunk))):
+                found[row[0]] = row
+        return ([found[i] for i in wanted if i in found],
+                [i for i in wanted if i not in found])
+
+    def get(self, seed_id: int) -> Seed:
+        seed = self.db.get(Seed, seed_id)
+        if seed is None:
+            raise SeedNotFoundError()
+        return seed
+
+    # Mutations
+    #
+    # Every mutation runs inside _transaction() and ends with a commit or a
+    # rollback, so the writer connection is released before the method
+    # returns or raises. Server-side columns are loaded before the commit,
+    # while the transaction still holds the connection.
+    #
+    # Each changed row is stamped with a new catalog change sequence. The
+    # counter is locked last, after the seed rows, so writers always take
+    # locks in the same order and hold the counter only until commit.
+    # In between come the seeds' lots (FEFO allocation), then category
+    # facet rows (FacetChanges), then a checkout's order and its seed pair
+    # rows (app/services/recommendations.py). Price changes also append to
+    # the price history (app/services/prices.py), which takes no row locks.
+    #
+    # Given an `actor`, create, update, delete and restock also buffer an
+    # audit entry once committed (app/services/audit.py).
+
+    def create(self, data: dict, actor=None) -> Seed:
+        # Use default image if none provided
+        if not data.get("image"):
+            data = {**data, "image": DEFAULT_SEED_IMAGE}
+        with self._transaction():
+            seed = Seed(**data)
+            self.db.add(seed)
+            self.db.flush()
+            if seed.quantity:
+                add_lot(self.db, seed.id, seed.quantity)
+            record_prices(self.db, [(seed.id, seed.price)])
+            facets = FacetChanges()
+            facets.add(seed.category, seed.price, seed.quantity)
+            facets.apply(self.db)
+            # SQLite may reuse the id of the last deleted row
+            self.db.execute(delete(SeedTombstone).where(SeedTombstone.seed_id == seed.id))
+            seed.change_seq = self._next_seq()
+            self._load(seed)
+        self._publish("create", [seed.id])
+        audit.record(actor, "create", "seed", seed.id, None, audit.seed_state(seed))
+        return seed
+
+    def update(self, seed_id: int, changes: dict, actor=None) -> Seed:
+        with self._transaction():
+            seed = self._get_for_update(seed_id)
+            before = audit.seed_state(seed)
+            facets = FacetChanges()
+            facets.remove(seed.category, seed.price, seed.quantity)
+            quantity_before = seed.quantity
+            for field, value in changes.items():
+                setattr(seed, field, value)
+            self.db.flush()
+            # Setting the quantity directly receives a new lot or writes
+            # off the earliest-expiring stock
+            if seed.quantity > quantity_before:
+                add_lot(self.db, seed_id, seed.quantity - quantity_before)
+            elif seed.quantity < quantity_before:
+                allocate(self.db, seed_id, quantity_before - seed.quantity)
+            if seed.price != before["price"]:
+                record_prices(self.db, [(seed_id, seed.price)])
+            facets.add(seed.category, seed.price, seed.quantity)
+            facets.apply(self.db)
+            seed.change_seq = self._next_seq()
+            self._load(seed)
+        self._publish("update", [seed_id])
+        audit.record(actor, "update", "seed", seed_id, before, audit.seed_state(seed))
+        return seed
+
+    def delete(self, seed_id: int, actor=None) -> None:
+        with self._transaction():
+            seed = self._get_for_update(seed_id)
+            before = audit.seed_state(seed)
+            delete_lots(self.db, seed_id)
+            record_prices(self.db, [(seed_id, None)])
+            self.db.delete(seed)
+            self.db.flush()
+            facets = FacetChanges()
+            facets.remove(seed.category, seed.price, seed.quantity)
+            facets.apply(self.db)
+            self.db.merge(SeedTombstone(seed_id=seed_id, change_seq=self._next_seq()))
+        self._publish("delete", [seed_id])
+        audit.record(actor, "delete", "seed", seed_id, before, None)
+
+    def purchase(self, seed_id: int) -> dict:
+        """Decrease stock by one; returns the updated seed as a dict.
+
+        A single conditional UPDATE ... RETURNING, so concurrent writers
+        (PostgreSQL) can never oversell or lose an update between a read
+        and a write, and the row lock is held for one statement only.
+        """
+        with self._transaction():
+            row = self.db.execute(
+                update(Seed.__table__)
+                .where(Seed.id == seed_id, Seed.quantity > 0)
+                .values(quantity=Seed.quantity - 1)
+                .returning(*SEED_TABLE_COLUMNS)
+            ).first()
+            if row is None:
+                self.get(seed_id)  # raises SeedNotFoundError
+                raise OutOfStockError()
+            allocate(self.db, seed_id, 1)
+            seed = dict(zip(SEED_COLUMNS, row))
+            if seed["quantity"] == 0:
+                facets = FacetChanges()
+                facets.stock(seed["category"], 1, 0)
+                facets.apply(self.db)
+            record_sales(self.db, {seed_id: 1})
+            self._stamp([seed_id])
+        self._publish("purchase", [seed_id])
+        return seed
+
+    def purchase_many(self, seed_ids: List[int]) -> List[Union[tuple, CatalogError]]:
+        """Apply one-unit purchases for every id in a single transaction.
+
+        Requests are served in order, so when stock runs out the earliest
+        requests win. Returns, per request, the updated seed row (in
+        SEED_COLUMNS order) or the CatalogError that request failed with.
+        """
+        wanted = list(dict.fromkeys(seed_ids))
+        outcomes: List[Optional[CatalogError]] = []
+        sold = Counter()
+        rows = {}
+        with self._transaction():
+            # Lock the rows (in id order, so concurrent batches cannot
+            # deadlock) until commit; a no-op on SQLite's single writer
+            locked = self.db.execute(
+                select(Seed.id, Seed.quantity, Seed.category).where(Seed.id.in_(wanted))
+                .order_by(Seed.id).with_for_update()).all()
+            stock = {seed_id: quantity for seed_id, quantity, _ in locked}
+            for seed_id in seed_ids:
+                if seed_id not in stock:
+                    outcomes.append(SeedNotFoundError())
+                elif stock[seed_id] - sold[seed_id] <= 0:
+                    outcomes.append(OutOfStockError())
+                else:
+                    sold[seed_id] += 1
+                    outcomes.append(None)
+
+            if sold:
+                for seed_id in sorted(sold):
+                    allocate(self.db, seed_id, sold[seed_id])
+                facets = FacetChanges()
+                for seed_id, _, category in locked:
+                    facets.stock(category, stock[seed_id], stock[seed_id] - sold[seed_id])
+                facets.apply(self.db)
+                record_sales(self.db, sold)
+                seqs = self._next_seqs(len(sold))
+                self.db.execute(
+                    update(Seed.__table__)
+                    .where(Seed.id == bindparam("seed_id"))
+                    .values(quantity=Seed.quantity - bindparam("units"),
+                            change_seq=bindparam("seq")),
+                    [{"seed_id": seed_id, "units": units, "seq": seq}
+                     for seq, (seed_id, units) in zip(seqs, sold.items())],
+                )
+                rows = {row[0]: row for row in self.db.execute(
+                    search_statement().where(Seed.id.in_(list(sold)))).all()}
+
+        self._publish("purchase", sold)
+        return [outcome or rows[seed_id]
+                for seed_id, outcome in zip(seed_ids, outcomes)]
+
+    def checkout(self, user_id: int, quantities: Dict[int, int], book) -> dict:
+        """Buy {seed_id: units} as one order, all or nothing; returns the order.
+
+        Lines are priced by `book` (a pricing.PriceBook) at their quantity,
+        and the order counts toward frequently-bought-together pairs.
+        """
+        if len(quantities) > MAX_ORDER_LINES:
+            raise TooManyIdsError(f"At most {MAX_ORDER_LINES} seeds per order")
+        wanted = sorted(quantities)
+        with self._transaction():
+            locked = self.db.execute(
+                select(Seed.id, Seed.category, Seed.price, Seed.quantity)
+                .where(Seed.id.in_(wanted)).order_by(Seed.id).with_for_update()).all()
+            rows = {row.id: row for row in locked}
+            for seed_id in wanted:
+                if seed_id not in rows:
+                    raise SeedNotFoundError(f"Seed {seed_id} not found")
+                if rows[seed_id].quantity < quantities[seed_id]:
+                    raise OutOfStockError(
+                        f"Only {rows[seed_id].quantity} of seed {seed_id} in stock")
+            facets = FacetChanges()
+            for row in locked:
+                allocate(self.db, row.id, quantities[row.id])
+                facets.stock(row.category, row.quantity, row.quantity - quantities[row.id])
+            facets.apply(self.db)
+            self.db.execute(
+                update(Seed.__table__)
+                .where(Seed.id == bindparam("seed_id"))
+                .values(quantity=Seed.quantity - bindparam("units")),
+                [{"seed_id": seed_id, "units": quantities[seed_id]} for seed_id in wanted])
+            priced = book.price_many(
+                (seed_id, rows[seed_id].category, rows[seed_id].price, quantity)
+                for seed_id, quantity in quantities.items())
+            order = add_order(self.db, user_id, [
+                {"seed_id": seed_id, "quantity": quantity,
+                 "list_price": rows[seed_id].price, "unit_price": price, "rule_id": rule_id}
+                for (seed_id, quantity), (price, rule_id)
+                in zip(quantities.items(), priced)], book.version)
+            add_order_pairs(self.db, wanted)
+            record_sales(self.db, quantities)
+            self._stamp(wanted)
+        self._publish("purchase", wanted)
+        return order
+
+    def reprice(self, prices: Dict[int, float], actor=None) -> dict:
+        """Set many seeds' prices in one transaction.
+
+        Returns {"updated": ids whose price changed, "missing": ids not
+        found}. Their history rows share one effective_from.
+        """
+        if len(prices) > MAX_BATCH_IDS:
+            raise TooManyIdsError()
+        wanted = sorted(prices)
+        changed = []
+        with self._transaction():
+            locked = []
+            for start in range(0, len(wanted), BATCH_CHUNK_SIZE):
+                chunk = wanted[start:start + BATCH_CHUNK_SIZE]
+                locked += self.db.execute(
+                    select(Seed.id, Seed.category, Seed.price, Seed.quantity)
+                    .where(Seed.id.in_(chunk)).order_by(Seed.id).with_for_update()).all()
+            changed = [row for row in locked if row.price != prices[row.id]]
+            if changed:
+                facets = FacetChanges()
+                for row in changed:
+                    facets.remove(row.category, row.price, row.quantity)
+                    facets.add(row.category, prices[row.id], row.quantity)
+                self.db.execute(
+                    update(Seed.__table__)
+                    .where(Seed.id == bindparam("seed_id"))
+                    .values(price=bindparam("new_price")),
+                    [{"seed_id": row.id, "new_price": prices[row.id]} for row in changed])
+                # After the UPDATE: price ranges are recomputed from seeds
+                facets.apply(self.db)
+                record_prices(self.db, [(row.id, prices[row.id]) for row in changed])
+                self._stamp([row.id for row in changed])
+        self._publish("update", [row.id for row in changed])
+        for row in changed:
+            audit.record(actor, "update", "seed", row.id,
+                         {"price": row.price}, {"price": prices[row.id]})
+        found = {row.id for row in locked}
+        return {"updated": [row.id for row in changed],
+                "missing": [seed_id for seed_id in wanted if seed_id not in found]}
+
+    def restock(self, seed_id: int, quantity: int, packed_on: Optional[date] = None,
+                expires_on: Optional[date] = None, actor=None) -> dict:
+        """Receive a new lot of stock; returns the updated seed as a dict.
+
+        The lot is packed today and expires SEED_LOT_SHELF_LIFE_DAYS after
+        packing unless the dates are given.
+        """
+        with self._transaction():
+            row = self.db.execute(
+                update(Seed.__table__)
+                .where(Seed.id == seed_id)
+                .values(quantity=Seed.quantity + quantity)
+                .returning(*SEED_TABLE_COLUMNS)
+            ).first()
+            if row is None:
+                raise SeedNotFoundError()
+            add_lot(self.db, seed_id, quantity, packed_on, expires_on)
+            seed = dict(zip(SEED_COLUMNS, row))
+            facets = FacetChanges()
+            facets.stock(seed["category"], seed["quantity"] - quantity, seed["quantity"])
+            facets.apply(self.db)
+            self._stamp([seed_id])
+        self._publish("restock", [seed_id])
+        audit.record(actor, "restock", "seed", seed_id,
+                     {"quantity": seed["quantity"] - quantity}, {"quantity": seed["quantity"]})
+        return seed
+
+    @contextmanager
+    def _transaction(self):
+        try:
+            yield
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _get_for_update(self, seed_id: int) -> Seed:
+        # Lock and re-read the row: facet deltas depend on its current values
+        seed = self.db.get(Seed, seed_id, with_for_update=True, populate_existing=True)
+        if seed is None:
+            raise SeedNotFoundError()
+        return seed
+
+    def _next_seqs(self, count: int) -> List[int]:
+        return reserve_sequence(self.db, CATALOG_SEQUENCE, count)
+
+    def _next_seq(self) -> int:
+        return self._next_seqs(1)[0]
+
+    def _stamp(self, seed_ids: List[int]) -> None:
+        """Give rows changed by a Core UPDATE their change sequence"""
+        seqs = self._next_seqs(len(seed_ids))
+        self.db.execute(
+            update(Seed.__table__)
+            .where(Seed.id == bindparam("seed_id"))
+            .values(change_seq=bindparam("seq")),
+            [{"seed_id": seed_id, "seq": seq} for seq, seed_id in zip(seqs, seed_ids)],
+        )
+
+    def _load(self, seed: Seed) -> None:
+        """Flush pending changes and load server-generated columns"""
+        self.db.flush()
+        self.db.refresh(seed)
+
+    def _publish(self, action: str, seed_ids: Iterable[int]) -> None:
+        state = get_shared_state()
+        for seed_id in seed_ids:
+            state.publish(CATALOG_CHANNEL, f"{action}:{seed_id}")
+
+
+def restart_changes(db: Session, last_seq: int) -> None:
+    """Continue change numbers past `last_seq` after a restore (caller commits).
+
+    Clients may have synced up to `last_seq` before the restore undid those
+    changes, so every cursor up to it must resync rather than reuse it.
+    """
+    floor = max(last_seq, current_sequence(db, CATALOG_SEQUENCE)) + 1
+    set_sequence(db, CATALOG_SEQUENCE, floor)
+    set_meta(db, CATALOG_RESYNC_META, floor)
+
+
+def get_catalog_reader(db: Session = ReadDB) -> CatalogService:
+    """CatalogService on a read-only session, for endpoints that only query"""
+    return CatalogService(db)
+
+
+def get_catalog_writer(db: Session = WriteDB) -> CatalogService:
+    """CatalogService on the writer session, for endpoints that mutate"""
+    return CatalogService(db)
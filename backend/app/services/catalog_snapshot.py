@@ -0,0 +1,264 @@
+"""In-memory columnar snapshot of the catalog for interactive filtering.
+
+With CATALOG_SNAPSHOT enabled, GET /api/seeds/query is answered from NumPy
+arrays instead of SQL: price and quantity columns, dictionary-encoded
+category codes and an interned name table. Filters are boolean masks,
+facet counts are one `bincount` over the category codes, and sorting only
+orders the rows that can make the requested page.
+
+The snapshot is loaded on first use and kept current incrementally. Every
+committed change is published on the catalog channel, which bumps the
+catalog generation. The next query then pulls only the rows changed since
+the snapshot's change sequence through delta sync (`CatalogService.changes`).
+Changes made by other workers arrive the same way through shared state.
+A restore is announced on the same channel and drops the snapshot.
+"""
+import threading
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is in requirements.txt
+    np = None
+
+from app.config import settings
+from app.models.meta import committed_sequence
+from app.services import catalog as catalog_module
+from app.services.catalog import (
+    CATALOG_CHANNEL, CATALOG_SEQUENCE, CatalogService, ResyncRequiredError, search_statement)
+from app.services.shared_state import subscribe
+from app.utils.serialization import seed_rows_to_dicts
+
+# Changes pulled per delta sync page while catching up
+REFRESH_PAGE = 5000
+
+
+class CatalogSnapshot:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.seq = 0
+        self._generation = None
+        self._clear(1024)
+
+    def _clear(self, capacity: int) -> None:
+        self.size = 0  # positions used, including deleted ones
+        self.live = 0
+        self.ids = np.zeros(capacity, np.int64)
+        self.price = np.zeros(capacity, np.float64)
+        self.quantity = np.zeros(capacity, np.int64)
+        self.category = np.zeros(capacity, np.int32)
+        self.alive = np.zeros(capacity, bool)
+        self.names: List[str] = []
+        self.lower_names: List[str] = []
+        # (image, created_at, updated_at) per position, only read for output
+        self.extra: List[tuple] = []
+        self.categories: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self._interned: Dict[str, str] = {}
+        self._positions: Dict[int, int] = {}
+        self._name_rank = None
+
+    def reset(self) -> None:
+        """Drop everything; the next query reloads from the database"""
+        with self._lock:
+            self.loaded = False
+            self.seq = 0
+            self._generation = None
+            self._clear(1024)
+
+    # Loading and incremental refresh
+
+    def ensure_current(self, catalog: CatalogService) -> None:
+        with self._lock:
+            generation = catalog_module._generation
+            if not self.loaded:
+                self._load(catalog)
+            elif generation != self._generation:
+                self._refresh(catalog)
+            self._generation = generation
+
+    def _load(self, catalog: CatalogService) -> None:
+        # Read the counter first, so changes racing the load are re-applied
+        seq = committed_sequence(catalog.db, CATALOG_SEQUENCE)
+        self._clear(1024)
+        for chunk in catalog._stream(search_statement()):
+            for row in chunk:
+                self._upsert(row)
+        self.seq = seq
+        self.loaded = True
+
+    def _refresh(self, catalog: CatalogService) -> None:
+        while True:
+            try:
+                page = catalog.changes(self.seq, REFRESH_PAGE)
+            except ResyncRequiredError:
+                # The database was restored from a backup: start over
+                self._load(catalog)
+                return
+            for seed_id in page["deleted"]:
+                self._remove(seed_id)
+            for item in page["changed"]:
+                self._upsert((item["id"], item["name"], item["category"], item["price"],
+                              item["quantity"], item["image"], item["created_at"],
+                              item["updated_at"]))
+            self.seq = page["seq"]
+            if not page["has_more"]:
+                break
+        if self.size > 1024 and self.live < self.size // 2:
+            self._compact()
+
+    def _upsert(self, row: Sequence) -> None:
+        seed_id, name, category, price, quantity, image, created_at, updated_at = row
+        name = self._intern(name)
+        pos = self._positions.get(seed_id)
+        if pos is None:
+            if self.size == len(self.ids):
+                self._grow()
+            pos = self.size
+            self.size += 1
+            self.live += 1
+            self._positions[seed_id] = pos
+            self.names.append(name)
+            self.lower_names.append(name.lower())
+            self.extra.append((image, created_at, updated_at))
+            self._name_rank = None
+        else:
+            if self.names[pos] is not name:
+                self.names[pos] = name
+                self.lower_names[pos] = name.lower()
+                self._name_rank = None
+            self.extra[pos] = (image, created_at, updated_at)
+        self.ids[pos] = seed_id
+        self.price[pos] = price
+        self.quantity[pos] = quantity
+        self.category[pos] = self._category_code(category)
+        self.alive[pos] = True
+
+    def _remove(self, seed_id: int) -> None:
+        pos = self._positions.pop(seed_id, None)
+        if pos is not None:
+            self.alive[pos] = False
+            self.live -= 1
+
+    def _intern(self, value: str) -> str:
+        return self._interned.setdefault(value, value)
+
+    def _category_code(self, category: str) -> int:
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def _grow(self) -> None:
+        for column in ("ids", "price", "quantity", "category", "alive"):
+            array = getattr(self, column)
+            setattr(self, column, np.concatenate([array, np.zeros_like(array)]))
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self.alive[:self.size])
+        for column in ("ids", "price", "quantity", "category", "alive"):
+            array = getattr(self, column)
+            compacted = np.zeros(max(1024, len(keep) * 2), array.dtype)
+            compacted[:len(keep)] = array[keep]
+            setattr(self, column, compacted)
+        self.names = [self.names[p] for p in keep]
+        self.lower_names = [self.lower_names[p] for p in keep]
+        self.extra = [self.extra[p] for p in keep]
+        self._positions = {int(seed_id): pos
+                           for pos, seed_id in enumerate(self.ids[:len(keep)])}
+        self.size = self.live = len(keep)
+        self._name_rank = None
+
+    # Queries
+
+    def query(self, catalog: CatalogService, categories: Optional[List[str]] = None,
+              min_price: Optional[float] = None, max_price: Optional[float] = None,
+              in_stock: bool = False, q: Optional[str] = None, sort: str = "id",
+              limit: int = 50, offset: int = 0) -> dict:
+        """Same contract as CatalogService.query"""
+        with self._lock:
+            self.ensure_current(catalog)
+            n = self.size
+            mask = self.alive[:n].copy()
+            if min_price is not None:
+                mask &= self.price[:n] >= min_price
+            if max_price is not None:
+                mask &= self.price[:n] <= max_price
+            if in_stock:
+                mask &= self.quantity[:n] > 0
+            if q:
+                needle = q.lower()
+                candidates = np.flatnonzero(mask)
+                matches = np.fromiter(
+                    (needle in self.lower_names[p] for p in candidates),
+                    bool, len(candidates))
+                mask[candidates[~matches]] = False
+
+            # Facets count every category under the other filters
+            counts = np.bincount(self.category[:n][mask], minlength=len(self.categories))
+            facets = {self.categories[code]: int(counts[code])
+                      for code in np.flatnonzero(counts)}
+
+            if categories:
+                wanted = {c.lower() for c in categories}
+                codes = [code for code, name in enumerate(self.categories)
+                         if name.lower() in wanted]
+                mask &= np.isin(self.category[:n], codes)
+
+            positions = np.flatnonzero(mask)
+            page = self._page(positions, sort, offset + limit)[offset:]
+            items = [(int(self.ids[p]), self.names[p], self.categories[self.category[p]],
+                      float(self.price[p]), int(self.quantity[p]), *self.extra[p])
+                     for p in page]
+        return {"total": len(positions), "items": seed_rows_to_dicts(items),
+                "facets": facets}
+
+    def _sort_key(self, field: str):
+        if field == "name":
+            if self._name_rank is None:
+                # Equal names share a rank, so _page breaks their ties by id
+                _, rank = np.unique(np.array(self.names, object), return_inverse=True)
+                self._name_rank = rank.astype(np.int64).reshape(-1)
+            return self._name_rank
+        return {"id": self.ids, "price": self.price, "quantity": self.quantity}[field]
+
+    def _page(self, positions, sort: str, k: int):
+        """The first k positions in sort order (ties broken by id)"""
+        descending = sort.startswith("-")
+        key = self._sort_key(sort.lstrip("-"))[positions]
+        if descending:
+            key = -key
+        if k < len(positions):
+            # Only rows at or before the k-th key can be on the page
+            kth = np.partition(key, k - 1)[k - 1]
+            near = key <= kth
+            positions, key = positions[near], key[near]
+        order = np.lexsort((self.ids[positions], key))
+        return positions[order[:k]]
+
+
+catalog_snapshot: Optional[CatalogSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def _after_restore(message: str) -> None:
+    # A restored backup rewinds the catalog under the snapshot's rows
+    if message.startswith("restore:") and catalog_snapshot is not None:
+        catalog_snapshot.reset()
+
+
+subscribe(CATALOG_CHANNEL, _after_restore)
+
+
+def get_catalog_snapshot() -> Optional[CatalogSnapshot]:
+    """FastAPI dependency: the snapshot when enabled, else None (use SQL)"""
+    global catalog_snapshot
+    if not settings.CATALOG_SNAPSHOT or np is None:
+        return None
+    if catalog_snapshot is None:
+        with _snapshot_lock:
+            if catalog_snapshot is None:
+                catalog_snapshot = CatalogSnapshot()
+    return catalog_snapshot
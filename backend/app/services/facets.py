@@ -0,0 +1,201 @@
+"""Category facets maintained incrementally alongside seed changes.
+
+GET /api/seeds/facets lists every category with its seed count, in-stock
+count, price range and a price histogram. Instead of grouping the seeds
+table on every call, CatalogService records how each mutation moves those
+numbers (`FacetChanges`) and writes the deltas to `category_stats` and
+`category_price_buckets` in the same transaction, so the endpoint reads a
+row per category.
+
+Counts are pure deltas. The price range cannot be maintained that way when
+the cheapest or dearest seed leaves a category, so for categories whose
+prices changed it is re-read with MIN/MAX over ix_seeds_category_price,
+two index probes rather than a scan.
+"""
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from typing import Dict, List, Union
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.facets import CategoryPriceBucket, CategoryStats
+from app.models.seed import Seed
+from app.services.jobs import job_handler
+
+# Lower bound of each histogram bucket; the last one is open-ended.
+# Changing these needs rebuild_facets().
+PRICE_BUCKETS = (0, 5, 10, 20, 50, 100)
+
+STATS = CategoryStats.__table__
+BUCKETS = CategoryPriceBucket.__table__
+
+
+def price_bucket(price: float) -> int:
+    return max(bisect_right(PRICE_BUCKETS, price) - 1, 0)
+
+
+def _bucket_expression():
+    # SQL twin of price_bucket() for full rebuilds
+    return case(*((Seed.price >= edge, index)
+                  for index, edge in reversed(list(enumerate(PRICE_BUCKETS)))),
+                else_=0)
+
+
+class FacetChanges:
+    """Net effect of one transaction's seed changes on the facet tables"""
+
+    def __init__(self):
+        self.items: Counter = Counter()
+        self.in_stock: Counter = Counter()
+        self.buckets: Counter = Counter()
+        self.price_changed = set()
+
+    def add(self, category: str, price: float, quantity: int, sign: int = 1) -> None:
+        """A seed entered the catalog (sign=-1: left it)"""
+        self.items[category] += sign
+        if quantity > 0:
+            self.in_stock[category] += sign
+        self.buckets[(category, price_bucket(price))] += sign
+        self.price_changed.add(category)
+
+    def remove(self, category: str, price: float, quantity: int) -> None:
+        self.add(category, price, quantity, -1)
+
+    def stock(self, category: str, before: int, after: int) -> None:
+        """A seed's quantity moved from `before` to `after`"""
+        self.in_stock[category] += (after > 0) - (before > 0)
+
+    def apply(self, db: Session) -> None:
+        """Write the deltas (caller commits).
+
+        Rows are touched in category order, so concurrent writers lock
+        them in the same order.
+        """
+        counted = ({c for c, delta in self.items.items() if delta}
+                   | {c for c, delta in self.in_stock.items() if delta})
+        for category in sorted(counted):
+            add_counts(db, STATS, {"category": category},
+                        {"item_count": self.items[category],
+                         "in_stock_count": self.in_stock[category]})
+        for (category, bucket), delta in sorted(self.buckets.items()):
+            if delta:
+                add_counts(db, BUCKETS, {"category": category, "bucket": bucket},
+                            {"item_count": delta})
+        for category in sorted(self.price_changed):
+            _refresh_price_range(db, category)
+
+
+def add_counts(db: Session, table, keys: Dict, counts: Dict[str, int]) -> None:
+    """Add `counts` to the row at `keys`, creating it when missing"""
+    add_counts_many(db, table, list(keys), [{**keys, **counts}])
+
+
+def add_counts_many(db: Session, table, keys: List[str], rows: List[Dict]) -> None:
+    """add_counts for many rows: each row holds its `keys` columns and the
+    counts to add. SQLite and PostgreSQL upsert them in one executemany."""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(table)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: table.c[column] + statement.excluded[column]
+                  for column in rows[0] if column not in keys}), rows)
+        return
+    for row in rows:
+        where = [table.c[column] == row[column] for column in keys]
+        updated = db.execute(update(table).where(*where).values(
+            {column: table.c[column] + delta for column, delta in row.items()
+             if column not in keys})).rowcount
+        if not updated:
+            db.execute(insert(table).values(**row))
+
+
+def _refresh_price_range(db: Session, category: str) -> None:
+    # Two queries: SQLite only uses the index for a lone MIN() or MAX()
+    in_category = Seed.category == category
+    low = db.execute(select(func.min(Seed.price)).where(in_category)).scalar()
+    if low is None:
+        db.execute(delete(STATS).where(STATS.c.category == category))
+        db.execute(delete(BUCKETS).where(BUCKETS.c.category == category))
+        return
+    high = db.execute(select(func.max(Seed.price)).where(in_category)).scalar()
+    db.execute(update(STATS).where(STATS.c.category == category)
+               .values(min_price=low, max_price=high))
+    db.execute(delete(BUCKETS).where(BUCKETS.c.category == category,
+                                     BUCKETS.c.item_count <= 0))
+
+
+def _facets(stats, buckets) -> dict:
+    histograms = defaultdict(lambda: [0] * len(PRICE_BUCKETS))
+    for category, bucket, count in buckets:
+        histograms[category][bucket] = count
+    return {
+        "price_buckets": list(PRICE_BUCKETS),
+        "categories": [
+            {"category": category, "count": count, "in_stock": in_stock,
+             "min_price": min_price, "max_price": max_price,
+             "histogram": histograms[category]}
+            for category, count, in_stock, min_price, max_price in stats
+        ],
+    }
+
+
+def read_facets(db: Union[Session, Connection]) -> dict:
+    """Facets from the maintained tables"""
+    stats = db.execute(
+        select(STATS.c.category, STATS.c.item_count, STATS.c.in_stock_count,
+               STATS.c.min_price, STATS.c.max_price)
+        .where(STATS.c.item_count > 0).order_by(STATS.c.category)).all()
+    buckets = db.execute(
+        select(BUCKETS.c.category, BUCKETS.c.bucket, BUCKETS.c.item_count)
+        .where(BUCKETS.c.item_count > 0)).all()
+    return _facets(stats, buckets)
+
+
+def scan_facets(db: Union[Session, Connection]) -> dict:
+    """The same facets computed from the seeds table (full scan)"""
+    stats = db.execute(
+        select(Seed.category, func.count(), func.sum(case((Seed.quantity > 0, 1), else_=0)),
+               func.min(Seed.price), func.max(Seed.price))
+        .group_by(Seed.category).order_by(Seed.category)).all()
+    bucket = _bucket_expression()
+    buckets = db.execute(
+        select(Seed.category, bucket, func.count()).group_by(Seed.category, bucket)).all()
+    return _facets(stats, buckets)
+
+
+# Job (POST /api/seeds/facets/rebuild) that runs rebuild_facets
+REBUILD_FACETS_JOB = "rebuild_facets"
+
+
+def rebuild_facets(db: Union[Session, Connection]) -> None:
+    """Recompute the facet tables from seeds (caller commits)"""
+    facets = scan_facets(db)
+    db.execute(delete(STATS))
+    db.execute(delete(BUCKETS))
+    stats_rows, bucket_rows = [], []
+    for facet in facets["categories"]:
+        stats_rows.append({"category": facet["category"], "item_count": facet["count"],
+                           "in_stock_count": facet["in_stock"],
+                           "min_price": facet["min_price"], "max_price": facet["max_price"]})
+        bucket_rows.extend({"category": facet["category"], "bucket": bucket,
+                            "item_count": count}
+                           for bucket, count in enumerate(facet["histogram"]) if count)
+    if stats_rows:
+        db.execute(insert(STATS), stats_rows)
+        db.execute(insert(BUCKETS), bucket_rows)
+
+
+@job_handler(REBUILD_FACETS_JOB)
+def rebuild_facets_job(db: Session, payload: dict) -> dict:
+    rebuild_facets(db)
+    db.commit()
+    return {"categories": len(read_facets(db)["categories"])}
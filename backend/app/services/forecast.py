@@ -0,0 +1,269 @@
+"""Demand forecasts and reorder suggestions for the whole catalog.
+
+Every purchase path adds the units it sold to seed_sales_daily, one row
+per seed and UTC day, in the purchase's transaction. The forecast job reads
+the last FORECAST_HISTORY_DAYS of it as a seeds x days matrix and computes
+every seed at once with NumPy. Nothing loops over seeds in Python:
+
+- Demand rate: an exponentially weighted mean of daily units, with a
+  half-life of FORECAST_HALF_LIFE_DAYS. One matrix-vector product.
+- Variability: the same weighted standard deviation, a second product.
+- Seasonality: units sold over the coming lead time plus cover period a
+  year ago, against the weighted rate just before it. Both are smoothed
+  with SEASONALITY_PRIOR_UNITS, so a handful of sales cannot swing it, and
+  clipped to SEASONALITY_RANGE. It stays 1 with less than a year of history.
+- Reorder point: forecast demand over FORECAST_LEAD_TIME_DAYS plus safety
+  stock of FORECAST_SERVICE_Z standard deviations over the lead time. At or
+  below it, the suggestion tops stock up to cover FORECAST_COVER_DAYS more.
+
+The matrix is built FORECAST_CHUNK_SEEDS seeds at a time, so memory stays
+bounded for any catalog. The maths for 100k seeds x 730 days takes about
+0.2 s (benchmarks/bench_forecast.py); reading the sales rows costs more,
+a few seconds per million. Both happen on a reader; the writer is held
+only while the results replace reorder_suggestions, which
+GET /api/analytics/reorder-suggestions reads, most urgent first.
+"""
+import json
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is in requirements.txt
+    np = None
+
+from sqlalchemy import Select, delete, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.forecast import ReorderSuggestion, SeedDailySales
+from app.models.meta import get_meta, set_meta
+from app.models.order import Order, OrderLine
+from app.models.seed import Seed
+from app.services.facets import add_counts_many
+from app.services.jobs import enqueue_periodic, job_handler, read_session
+from app.services.prices import as_utc
+from app.services.recommendations import int_columns
+
+FORECAST_JOB = "forecast_demand"
+
+# Last run's stats, in app_meta
+LAST_FORECAST_META = "forecast:last"
+
+# Units added to both sides of the seasonality ratio
+SEASONALITY_PRIOR_UNITS = 5.0
+SEASONALITY_RANGE = (0.2, 5.0)
+
+# Rows per executemany when a run writes reorder_suggestions
+INSERT_CHUNK = 10_000
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def epoch_day(at: Optional[datetime] = None) -> int:
+    """UTC day number of `at` (now by default): days since 1970-01-01"""
+    return (as_utc(at) - EPOCH).days
+
+
+def record_sales(db: Session, units: Dict[int, int], at: Optional[datetime] = None) -> None:
+    """Add {seed_id: units} to today's sales (caller commits).
+
+    Rows are written in seed id order, like the seed rows before them.
+    """
+    day = epoch_day(at)
+    add_counts_many(db, SeedDailySales.__table__, ["seed_id", "day"],
+                    [{"seed_id": seed_id, "day": day, "units": units[seed_id]}
+                     for seed_id in sorted(units) if units[seed_id] > 0])
+
+
+def backfill_sales(db: Union[Session, Connection]) -> int:
+    """Fill an empty seed_sales_daily from order lines (migration 13).
+
+    Single-unit purchases made before sales were recorded left no trace,
+    so their history starts empty.
+    """
+    totals: Dict[tuple, int] = {}
+    for seed_id, created_at, quantity in db.execute(
+            select(OrderLine.seed_id, Order.created_at, OrderLine.quantity)
+            .join(Order, Order.id == OrderLine.order_id)):
+        key = (seed_id, epoch_day(created_at))
+        totals[key] = totals.get(key, 0) + quantity
+    rows = [{"seed_id": seed_id, "day": day, "units": units}
+            for (seed_id, day), units in sorted(totals.items())]
+    if rows:
+        db.execute(insert(SeedDailySales), rows)
+    return len(rows)
+
+
+def forecast(sales, on_hand, half_life: float, lead_days: int, cover_days: int,
+             z: float) -> Dict[str, "np.ndarray"]:
+    """Forecast every row of a seeds x days sales matrix.
+
+    `sales` holds units per day, oldest column first, ending yesterday.
+    `on_hand` is each seed's stock. Returns arrays keyed by
+    ReorderSuggestion column; days_of_cover is NaN where nothing sells.
+    """
+    sales = np.asarray(sales, np.float32)
+    on_hand = np.asarray(on_hand, np.float64)
+    days = sales.shape[1]
+    # weights[t] halves every half_life days back from the newest column
+    age = np.arange(days - 1, -1, -1, dtype=np.float64)
+    weights = np.exp2(-age / half_life).astype(np.float32)
+    norm = float(weights.sum()) or 1.0
+    rate = (sales @ weights).astype(np.float64) / norm
+    variance = (np.square(sales) @ weights).astype(np.float64) / norm - rate * rate
+    sigma = np.sqrt(np.maximum(variance, 0.0))
+
+    horizon = lead_days + cover_days
+    seasonality = np.ones(len(sales))
+    if days >= 365 + horizon:
+        # The same weighting, ending the day before a year ago today
+        before = weights[365:]
+        base = (sales[:, :days - 365] @ before).astype(np.float64) / float(before.sum())
+        ahead = sales[:, days - 365:days - 365 + horizon].sum(axis=1, dtype=np.float64)
+        seasonality = np.clip((ahead + SEASONALITY_PRIOR_UNITS)
+                              / (base * horizon + SEASONALITY_PRIOR_UNITS),
+                              *SEASONALITY_RANGE)
+
+    daily = rate * seasonality
+    safety = z * sigma * math.sqrt(lead_days)
+    reorder_point = daily * lead_days + safety
+    target = daily * horizon + safety
+    due = (on_hand <= reorder_point) & (daily > 0)
+    # Less a thousandth, so float32 noise on a whole number does not round up
+    suggested = np.where(due, np.ceil(np.maximum(target - on_hand - 1e-3, 0.0)), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(daily > 0, on_hand / daily, np.nan)
+    return {"on_hand": on_hand.astype(np.int64), "daily_rate": rate,
+            "seasonality": seasonality, "forecast_daily": daily,
+            "safety_stock": safety, "reorder_point": reorder_point,
+            "suggested_quantity": suggested.astype(np.int64), "days_of_cover": cover}
+
+
+def _sales_matrix(db: Session, seed_ids, first_day: int, days: int):
+    # seed_sales_daily rows for one chunk of seeds, spread into a dense block
+    matrix = np.zeros((len(seed_ids), days), np.float32)
+    rows = int_columns(db.execute(
+        select(SeedDailySales.seed_id, SeedDailySales.day, SeedDailySales.units)
+        .where(SeedDailySales.seed_id.between(int(seed_ids[0]), int(seed_ids[-1])),
+               SeedDailySales.day >= first_day,
+               SeedDailySales.day < first_day + days)), 3)
+    position = np.searchsorted(seed_ids, rows[:, 0])
+    # Sales of deleted seeds fall inside the id range but match no row
+    known = seed_ids[np.minimum(position, len(seed_ids) - 1)] == rows[:, 0]
+    matrix[position[known], rows[known, 1] - first_day] = rows[known, 2]
+    return matrix
+
+
+def run_forecast(db: Session, at: Optional[datetime] = None) -> dict:
+    """Recompute reorder_suggestions for every seed (commits).
+
+    Seeds and sales are loaded on a reader and computed off any
+    connection. The writer is held only to replace the suggestions and
+    record the run's stats.
+    """
+    started = time.perf_counter()
+    days = settings.FORECAST_HISTORY_DAYS
+    first_day = epoch_day(at) - days
+    computed_at = datetime.now(timezone.utc)
+    load = compute = 0.0
+    rows = []
+    chunk = max(settings.FORECAST_CHUNK_SEEDS, 1)
+    suggested = 0
+    with read_session(db) as reader:
+        seeds = int_columns(reader.execute(
+            select(Seed.id, Seed.quantity).order_by(Seed.id)), 2)
+        for start in range(0, len(seeds), chunk):
+            block = seeds[start:start + chunk]
+            step = time.perf_counter()
+            sales = _sales_matrix(reader, block[:, 0], first_day, days)
+            loaded = time.perf_counter()
+            result = forecast(sales, block[:, 1], settings.FORECAST_HALF_LIFE_DAYS,
+                              settings.FORECAST_LEAD_TIME_DAYS, settings.FORECAST_COVER_DAYS,
+                              settings.FORECAST_SERVICE_Z)
+            computed = time.perf_counter()
+            suggested += int(np.count_nonzero(result["suggested_quantity"]))
+            names = ["seed_id", *result]
+            columns = [block[:, 0].tolist()] + [
+                [None if value != value else value for value in values.tolist()]
+                for values in result.values()]
+            rows += [{**dict(zip(names, row)), "computed_at": computed_at}
+                     for row in zip(*columns)]
+            load += loaded - step
+            compute += computed - loaded
+    stats = {
+        "seeds": len(seeds),
+        "days": days,
+        "suggested": suggested,
+        "computed_at": computed_at.isoformat(),
+        "load_ms": round(load * 1000, 2),
+        "compute_ms": round(compute * 1000, 2),
+    }
+    # One short write transaction on the writer's single pooled connection;
+    # requests that write wait for it, so it holds nothing but the swap
+    written = time.perf_counter()
+    try:
+        db.execute(delete(ReorderSuggestion))
+        for offset in range(0, len(rows), INSERT_CHUNK):
+            db.execute(insert(ReorderSuggestion), rows[offset:offset + INSERT_CHUNK])
+        finished = time.perf_counter()
+        stats["write_ms"] = round((finished - written) * 1000, 2)
+        stats["duration_ms"] = round((finished - started) * 1000, 2)
+        set_meta(db, LAST_FORECAST_META, json.dumps(stats))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return stats
+
+
+def last_forecast(db: Session) -> Optional[dict]:
+    value = get_meta(db, LAST_FORECAST_META)
+    return json.loads(value) if value else None
+
+
+def suggestions_statement(limit: int, include_all: bool = False) -> Select:
+    """Suggestions with their seed's name and category, least cover first.
+
+    Only seeds due a reorder unless `include_all`. Those always sell, so
+    their days_of_cover is set and the walk follows its index; seeds that
+    do not sell (NULL cover) are listed last.
+    """
+    statement = (select(ReorderSuggestion, Seed.name, Seed.category)
+                 .join(Seed, Seed.id == ReorderSuggestion.seed_id)
+                 .limit(limit))
+    if include_all:
+        return statement.order_by(ReorderSuggestion.days_of_cover.is_(None),
+                                  ReorderSuggestion.days_of_cover, ReorderSuggestion.seed_id)
+    return (statement.where(ReorderSuggestion.suggested_quantity > 0)
+            .order_by(ReorderSuggestion.days_of_cover, ReorderSuggestion.seed_id))
+
+
+def reorder_suggestions(db: Session, limit: int, include_all: bool = False) -> dict:
+    """A page of the last run's suggestions and the run's stats"""
+    items = []
+    for suggestion, name, category in db.execute(suggestions_statement(limit, include_all)):
+        item = {column.name: getattr(suggestion, column.name)
+                for column in ReorderSuggestion.__table__.columns}
+        items.append({**item, "name": name, "category": category})
+    total = db.execute(select(func.count()).select_from(ReorderSuggestion)
+                       .where(ReorderSuggestion.suggested_quantity > 0)).scalar()
+    return {"last_run": last_forecast(db), "suggested": total, "items": items}
+
+
+def schedule_forecasts(db: Session):
+    """Queue the next periodic forecast, unless disabled; returns the job"""
+    hours = settings.FORECAST_REBUILD_HOURS
+    if hours > 0 and np is not None:
+        return enqueue_periodic(db, FORECAST_JOB, hours * 3600, {"periodic": True})
+    return None
+
+
+@job_handler(FORECAST_JOB)
+def forecast_job(db: Session, payload: dict) -> dict:
+    if payload.get("periodic"):
+        schedule_forecasts(db)  # the next slot, even if this run fails
+    return run_forecast(db)
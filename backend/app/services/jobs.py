@@ -0,0 +1,392 @@
+"""Durable background jobs without an external broker.
+
+Slow work is enqueued as a row in the `jobs` table and the request returns
+at once (202 with the job id). Each app process runs a `JobRunner` with
+JOB_WORKERS threads. A worker claims the next due job with one conditional
+UPDATE, so any number of threads and app worker processes can share the
+queue without running a job twice. It then calls the job's registered
+handler with a fresh writer session, from which read_session() opens a
+reader for the handler's long reads.
+
+A failed job is retried with exponential backoff until max_attempts, then
+marked failed with its error. A job left `running` by a crashed process is
+requeued once its lease (JOB_LEASE_SECONDS) expires. On shutdown the runner
+stops claiming and waits up to JOB_DRAIN_SECONDS for running jobs.
+Queued jobs stay in the table for the next start.
+
+Handlers are registered with `@job_handler("kind")` in the modules listed in
+JOB_MODULES, which are imported when the runner starts rather than at boot.
+"""
+import asyncio
+import importlib
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import ReadSessionLocal, SessionLocal
+from app.models.job import Job
+
+# Modules that register job handlers
+JOB_MODULES = ("app.seed_data", "app.services.facets", "app.services.maintenance",
+               "app.services.backups", "app.services.recommendations",
+               "app.services.forecast")
+
+JOB_COLUMNS = ("id", "kind", "status", "attempts", "max_attempts", "run_after",
+               "created_by", "last_error", "created_at", "finished_at")
+
+_handlers: Dict[str, Callable[[Session, dict], Optional[dict]]] = {}
+
+
+def job_handler(kind: str):
+    """Register `fn(db, payload) -> result` for jobs of `kind`.
+
+    The handler commits its own work. It may be retried, so it must be
+    safe to run again after a failure. `db` is a writer session: on SQLite,
+    the one connection every request writes through. Hold it only for
+    short write transactions, and load or compute on read_session(db).
+    """
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def load_handlers() -> None:
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before retry number `attempts`"""
+    return min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+               settings.JOB_RETRY_MAX_SECONDS)
+
+
+def job_to_dict(job: Job) -> dict:
+    data = {column: getattr(job, column) for column in JOB_COLUMNS}
+    data["payload"] = json.loads(job.payload)
+    data["result"] = json.loads(job.result) if job.result else None
+    return data
+
+
+def enqueue(db: Session, kind: str, payload: Optional[dict] = None, *, delay: float = 0,
+            max_attempts: Optional[int] = None, dedupe_key: Optional[str] = None,
+            created_by: Optional[int] = None) -> Job:
+    """Queue a job and commit. With `dedupe_key`, an existing job with the
+    same key is returned instead."""
+    if dedupe_key is not None:
+        existing = find_job(db, dedupe_key)
+        if existing is not None:
+            return existing
+    job = Job(kind=kind, payload=json.dumps(payload or {}), status="queued",
+              attempts=0, max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+              run_after=_utcnow() + timedelta(seconds=delay),
+              dedupe_key=dedupe_key, created_by=created_by)
+    db.add(job)
+    db.commit()
+    if job_runner is not None:
+        job_runner.wake()
+    return job
+
+
+def enqueue_periodic(db: Session, kind: str, interval_seconds: float,
+                     payload: Optional[dict] = None) -> Job:
+    """Queue the next run of a job that repeats every `interval_seconds`.
+
+    Runs fall on multiples of the interval since the epoch and the slot is
+    the dedupe key, so every worker, and the job itself, can call this and
+    each slot still runs once.
+    """
+    now = _utcnow().timestamp()
+    slot = int(now // interval_seconds) + 1
+    return enqueue(db, kind, payload, delay=slot * interval_seconds - now,
+                   dedupe_key=f"{kind}@{slot}")
+
+
+def find_job(db: Session, dedupe_key: str) -> Optional[Job]:
+    """The job enqueued with `dedupe_key`, if any"""
+    return db.execute(select(Job).where(Job.dedupe_key == dedupe_key)).scalar_one_or_none()
+
+
+def retry_failed(db: Session, job: Job) -> Job:
+    """Queue a failed job again with a fresh set of attempts, and commit"""
+    if job.status == "failed":
+        job.status = "queued"
+        job.attempts = 0
+        job.run_after = _utcnow()
+        job.finished_at = None
+        db.commit()
+        if job_runner is not None:
+            job_runner.wake()
+    return job
+
+
+def claim(db: Session, worker: str) -> Optional[tuple]:
+    """Mark the next due job running and return (id, kind, payload), or None"""
+    now = _utcnow()
+    # SKIP LOCKED lets PostgreSQL workers pass over each other's candidate;
+    # SQLite ignores it and serializes claims on its write lock
+    candidate = (select(Job.id)
+                 .where(Job.status == "queued", Job.run_after <= now)
+                 .order_by(Job.run_after, Job.id)
+                 .limit(1)
+                 .with_for_update(skip_locked=True)
+                 .scalar_subquery())
+    try:
+        row = db.execute(
+            update(Job)
+            .where(Job.id == candidate, Job.status == "queued")
+            .values(status="running", attempts=Job.attempts + 1,
+                    locked_by=worker, locked_at=now)
+            .returning(Job.id, Job.kind, Job.payload)
+        ).first()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return tuple(row) if row else None
+
+
+def _finish(db: Session, job_id: int, **values) -> None:
+    db.execute(update(Job).where(Job.id == job_id).values(
+        locked_by=None, locked_at=None, **values))
+    db.commit()
+
+
+def _record(db: Session, job_id: int, kind: str, outcome: Callable[[], dict]) -> bool:
+    """Store a finished job's outcome, trying twice; never raises.
+
+    A job whose outcome cannot be stored stays `running` until its lease
+    (JOB_LEASE_SECONDS) expires and requeue_stale queues it again.
+    """
+    for _ in range(2):
+        try:
+            _finish(db, job_id, **outcome())
+            return True
+        except Exception as e:  # e.g. the database is briefly locked
+            db.rollback()
+            error = e
+    print(f"Job {job_id} ({kind}): could not record its outcome ({error}); "
+          f"it is requeued once its lease expires")
+    return False
+
+
+def execute(session_factory: sessionmaker, job_id: int, kind: str, payload: str,
+            read_session_factory: Optional[sessionmaker] = None) -> bool:
+    """Run a claimed job and record the outcome; returns True on success.
+
+    The handler's session can open readers with read_session(), on
+    `read_session_factory` (default: `session_factory`).
+    """
+    db = session_factory()
+    db.info["read_session_factory"] = read_session_factory or session_factory
+    try:
+        handler = _handlers.get(kind)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {kind!r}")
+            result = handler(db, json.loads(payload))
+        except Exception as e:
+            db.rollback()
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+
+            def retry_or_fail() -> dict:
+                attempts, max_attempts = db.execute(
+                    select(Job.attempts, Job.max_attempts).where(Job.id == job_id)).one()
+                print(f"Job {job_id} ({kind}) failed on attempt {attempts}: {error}")
+                if handler is not None and attempts < max_attempts:
+                    return {"status": "queued", "last_error": error,
+                            "run_after": _utcnow() + timedelta(seconds=retry_delay(attempts))}
+                return {"status": "failed", "last_error": error, "finished_at": _utcnow()}
+
+            _record(db, job_id, kind, retry_or_fail)
+            return False
+        return _record(db, job_id, kind, lambda: {
+            "status": "succeeded", "finished_at": _utcnow(),
+            "result": json.dumps(result) if result is not None else None})
+    finally:
+        db.close()
+
+
+@contextmanager
+def read_session(db: Session) -> Iterator[Session]:
+    """A session for a job handler's long reads, given its writer session.
+
+    On SQLite the writer is one pooled connection shared with every
+    request, so handlers load and compute on a reader and use `db` only
+    for short write transactions at the end.
+    """
+    factory = db.info.get("read_session_factory")
+    if factory is None:  # called directly, not by execute(): share `db`
+        yield db
+        return
+    reader = factory()
+    try:
+        yield reader
+    finally:
+        reader.close()
+
+
+def requeue_stale(db: Session) -> int:
+    """Requeue running jobs whose lease expired (their worker died)"""
+    cutoff = _utcnow() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    count = db.execute(
+        update(Job)
+        .where(Job.status == "running", Job.locked_at < cutoff)
+        .values(status="queued", locked_by=None, locked_at=None, run_after=_utcnow())
+    ).rowcount
+    db.commit()
+    return count
+
+
+def run_pending(session_factory: sessionmaker = SessionLocal, worker: str = "inline",
+                read_session_factory: Optional[sessionmaker] = None) -> int:
+    """Run due jobs in the calling thread until none are left; returns jobs run"""
+    load_handlers()
+    ran = 0
+    while True:
+        db = session_factory()
+        try:
+            job = claim(db, worker)
+        finally:
+            db.close()
+        if job is None:
+            return ran
+        execute(session_factory, *job, read_session_factory=read_session_factory)
+        ran += 1
+
+
+def job_counts(db: Session) -> Dict[str, int]:
+    return dict(db.execute(select(Job.status, func.count()).group_by(Job.status)).all())
+
+
+class JobRunner:
+    """Worker threads that claim and run jobs until stopped"""
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal,
+                 workers: int = None, poll_seconds: float = None,
+                 read_session_factory: Optional[sessionmaker] = None):
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self.workers = settings.JOB_WORKERS if workers is None else workers
+        self.poll_seconds = (settings.JOB_POLL_SECONDS
+                             if poll_seconds is None else poll_seconds)
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.succeeded = 0
+        self.failed = 0
+        self._running = 0
+        self._counter_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._wake = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._last_recovery = 0.0
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        load_handlers()
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(f"{self.name}:{index}",),
+                                      name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self) -> None:
+        """A job was enqueued in this process: stop waiting for the next poll"""
+        with self._wake:
+            self._wake.notify()
+
+    def stop(self, timeout: float = None) -> bool:
+        """Stop claiming, wait for running jobs; True if all finished in time"""
+        self._stopping.set()
+        with self._wake:
+            self._wake.notify_all()
+        deadline = time.monotonic() + (settings.JOB_DRAIN_SECONDS
+                                       if timeout is None else timeout)
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        drained = not any(thread.is_alive() for thread in self._threads)
+        self._threads = []
+        return drained
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "running": self._running,
+                "succeeded": self.succeeded, "failed": self.failed}
+
+    def _work(self, worker: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._recover()
+                db = self.session_factory()
+                try:
+                    job = claim(db, worker)
+                finally:
+                    db.close()
+            except Exception as e:  # e.g. the database is briefly locked
+                print(f"Job worker {worker}: {e}")
+                job = None
+            if job is None:
+                with self._wake:
+                    self._wake.wait(self.poll_seconds)
+                continue
+            with self._counter_lock:
+                self._running += 1
+            succeeded = False
+            try:
+                succeeded = execute(self.session_factory, *job,
+                                    read_session_factory=self.read_session_factory)
+            except Exception as e:  # execute() reports failures itself; never lose the worker
+                print(f"Job worker {worker}: job {job[0]}: {e}")
+            finally:
+                with self._counter_lock:
+                    self._running -= 1
+                    if succeeded:
+                        self.succeeded += 1
+                    else:
+                        self.failed += 1
+
+    def _recover(self) -> None:
+        # One stale-lease sweep a minute per process is plenty
+        now = time.monotonic()
+        if now - self._last_recovery < 60:
+            return
+        self._last_recovery = now
+        db = self.session_factory()
+        try:
+            requeue_stale(db)
+        finally:
+            db.close()
+
+
+job_runner: Optional[JobRunner] = None
+
+
+async def start_job_runner() -> None:
+    global job_runner
+    if settings.JOB_RUNNER and job_runner is None:
+        job_runner = JobRunner(read_session_factory=ReadSessionLocal)
+        job_runner.start()
+
+
+async def stop_job_runner() -> None:
+    global job_runner
+    if job_runner is not None:
+        runner, job_runner = job_runner, None
+        if not await asyncio.to_thread(runner.stop):
+            print("Job runner: jobs still running at shutdown; "
+                  "they are requeued when their lease expires")
@@ -0,0 +1,88 @@
+"""Cross-process file lock used to elect a leader for one-off tasks.
+
+Every worker runs the startup tasks inside `file_lock`, so they execute one
+process at a time: the first worker does the real work (schema, seeding) and
+the others find it already done. `database_lock` extends this to workers on
+other hosts when they share a PostgreSQL database.
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# pg_advisory_lock key held while running startup tasks
+STARTUP_LOCK_KEY = 0x5EED_5409
+
+
+def _lock(fd: int, blocking: bool) -> bool:
+    try:
+        if fcntl is not None:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            fcntl.flock(fd, flags)
+        else:
+            mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, mode, 1)
+    except OSError:
+        if blocking:
+            raise
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive lock on `path` for the duration of the block.
+
+    Yields True when the lock is held. With `blocking=False` it yields False
+    immediately if another process holds the lock.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    acquired = False
+    try:
+        acquired = _lock(fd, blocking)
+        yield acquired
+    finally:
+        if acquired:
+            _unlock(fd)
+        os.close(fd)
+
+
+@contextmanager
+def database_lock(engine: Engine, key: int = STARTUP_LOCK_KEY) -> Iterator[None]:
+    """Hold a PostgreSQL advisory lock for the block; a no-op elsewhere.
+
+    A file lock only reaches processes on one host. SQLite never spans
+    hosts, but several app servers can share one PostgreSQL database.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        # Wait as long as the current holder needs, not statement_timeout
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+        conn.commit()  # the lock is session-level and outlives the transaction
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+            conn.commit()
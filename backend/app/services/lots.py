@@ -0,0 +1,112 @@
+"""Seed lots: stock tracked per restock, sold first-expiring-first-out.
+
+Every restock adds a lot with a packed and an expiry date. A purchase takes
+its units from the seed's earliest-expiring lots, found through the partial
+index ix_seed_lots_fefo (seed_id, expires_on, id) over lots with stock
+left, so allocating is an index seek plus one UPDATE per lot touched no
+matter how many lots a seed has accumulated. Seed.quantity remains the
+total and is adjusted in the same statements as before, so catalog reads
+do not change.
+
+Stock written outside CatalogService (e.g. direct inserts) may have no lot;
+once a seed's lots are used up, purchases simply take such untracked units.
+backfill_lots() turns it into lots.
+"""
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import Select, bindparam, delete, exists, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.lot import LOT_HAS_STOCK, SeedLot
+from app.models.seed import Seed
+
+LOT_COLUMNS = [SeedLot.id, SeedLot.seed_id, SeedLot.quantity, SeedLot.remaining,
+               SeedLot.packed_on, SeedLot.expires_on]
+
+
+def default_expiry(packed_on: date) -> date:
+    return packed_on + timedelta(days=settings.SEED_LOT_SHELF_LIFE_DAYS)
+
+
+def fefo_statement(seed_id: int, units: int) -> Select:
+    """The lots that `units` one-unit sales of a seed would draw from"""
+    return (select(SeedLot.id, SeedLot.remaining)
+            .where(SeedLot.seed_id == seed_id, LOT_HAS_STOCK)
+            .order_by(SeedLot.expires_on, SeedLot.id)
+            .limit(units))
+
+
+def expiring_statement(until: date, limit: int) -> Select:
+    """Lots with stock left expiring on or before `until`, soonest first"""
+    return (select(*LOT_COLUMNS, Seed.name)
+            .join(Seed, Seed.id == SeedLot.seed_id)
+            .where(LOT_HAS_STOCK, SeedLot.expires_on <= until)
+            .order_by(SeedLot.expires_on, SeedLot.id)
+            .limit(limit))
+
+
+def add_lot(db: Session, seed_id: int, quantity: int, packed_on: Optional[date] = None,
+            expires_on: Optional[date] = None) -> None:
+    """Record `quantity` new units of a seed (caller commits)"""
+    packed_on = packed_on or date.today()
+    db.execute(insert(SeedLot).values(
+        seed_id=seed_id, quantity=quantity, remaining=quantity, packed_on=packed_on,
+        expires_on=expires_on or default_expiry(packed_on)))
+
+
+def allocate(db: Session, seed_id: int, units: int) -> List[Tuple[int, int]]:
+    """Take `units` from a seed's lots, earliest expiry first (caller commits).
+
+    Returns (lot_id, units taken) pairs; fewer units than asked means the
+    rest came from untracked stock. Lots are locked after the seed row.
+    """
+    taken = []
+    needed = units
+    for lot_id, remaining in db.execute(
+            fefo_statement(seed_id, units).with_for_update()).all():
+        take = min(remaining, needed)
+        taken.append((lot_id, take))
+        needed -= take
+        if not needed:
+            break
+    if taken:
+        db.execute(
+            update(SeedLot.__table__)
+            .where(SeedLot.id == bindparam("lot_id"))
+            .values(remaining=SeedLot.remaining - bindparam("take")),
+            [{"lot_id": lot_id, "take": take} for lot_id, take in taken])
+    return taken
+
+
+def delete_lots(db: Session, seed_id: int) -> None:
+    # Explicit: SQLite does not enforce ON DELETE CASCADE by default
+    db.execute(delete(SeedLot).where(SeedLot.seed_id == seed_id))
+
+
+def _packed_on(created_at) -> date:
+    # Raw connections may hand SQLite timestamps back as text
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return created_at.date() if created_at else date.today()
+
+
+def backfill_lots(db: Union[Session, Connection]) -> int:
+    """Give every seed with stock but no lots one lot holding that stock.
+
+    The lot counts as packed on the seed's creation date. Used by
+    migration 6 and after loading the default seeds (caller commits).
+    """
+    has_lot = exists().where(SeedLot.seed_id == Seed.id)
+    rows = []
+    for seed_id, quantity, created_at in db.execute(
+            select(Seed.id, Seed.quantity, Seed.created_at)
+            .where(Seed.quantity > 0, ~has_lot)):
+        packed_on = _packed_on(created_at)
+        rows.append({"seed_id": seed_id, "quantity": quantity, "remaining": quantity,
+                     "packed_on": packed_on, "expires_on": default_expiry(packed_on)})
+    if rows:
+        db.execute(insert(SeedLot), rows)
+    return len(rows)
@@ -0,0 +1,273 @@
+"""Scheduled SQLite maintenance: statistics, WAL checkpoints, vacuuming.
+
+Left alone, a busy SQLite database plans queries on stale statistics, and
+the database file and its WAL grow without bound. `MaintenanceScheduler`
+runs these tasks from the app lifespan:
+
+- analyze (daily): ANALYZE, sampling MAINTENANCE_ANALYSIS_LIMIT rows per index.
+- optimize (hourly): PRAGMA optimize, which re-analyzes only the tables
+  whose statistics look stale.
+- checkpoint (every few minutes): a PASSIVE WAL checkpoint. When the app is
+  idle it is a TRUNCATE checkpoint, which also shrinks the -wal file.
+- vacuum (hourly): PRAGMA incremental_vacuum, returning at most
+  MAINTENANCE_VACUUM_PAGES free pages to the OS per run. Each step is short,
+  unlike a full VACUUM, which rewrites the whole file. Databases created
+  before auto_vacuum=INCREMENTAL was set need the one-off
+  enable_incremental_vacuum task first. Run it as a job when convenient.
+
+A task that is due waits for a tick with little traffic, measured by
+`ActivityMeter`, unless it is overdue by twice its interval. With several
+workers, only the process holding MAINTENANCE_LOCK_PATH runs the schedule.
+Each task's last run is stored in app_meta, so every worker reports the
+same stats and restarts keep the schedule.
+"""
+import asyncio
+import json
+import os
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import SessionLocal, _sqlite_file
+from app.models.meta import AppMeta, set_meta
+from app.services.jobs import job_handler
+from app.services.leader import file_lock
+
+# Job that runs one maintenance task (POST /api/admin/maintenance/{task})
+MAINTENANCE_JOB = "sqlite_maintenance"
+
+META_PREFIX = "maintenance:"
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+def _pragma(conn: Connection, name: str):
+    return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def _analyze(conn: Connection, idle: bool) -> dict:
+    conn.exec_driver_sql(f"PRAGMA analysis_limit={settings.MAINTENANCE_ANALYSIS_LIMIT}")
+    conn.exec_driver_sql("ANALYZE")
+    return {}
+
+
+def _optimize(conn: Connection, idle: bool) -> dict:
+    conn.exec_driver_sql(f"PRAGMA analysis_limit={settings.MAINTENANCE_ANALYSIS_LIMIT}")
+    conn.exec_driver_sql("PRAGMA optimize")
+    return {}
+
+
+def _checkpoint(conn: Connection, idle: bool) -> dict:
+    mode = "TRUNCATE" if idle else "PASSIVE"
+    busy, log, checkpointed = conn.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})").one()
+    return {"mode": mode, "busy": bool(busy), "wal_pages": log,
+            "checkpointed_pages": checkpointed}
+
+
+def _vacuum(conn: Connection, idle: bool) -> dict:
+    if _pragma(conn, "auto_vacuum") != 2:
+        return {"skipped": "auto_vacuum is not incremental; "
+                           "run enable_incremental_vacuum once"}
+    before = _pragma(conn, "freelist_count")
+    conn.exec_driver_sql(f"PRAGMA incremental_vacuum({settings.MAINTENANCE_VACUUM_PAGES})")
+    return {"pages_freed": before - _pragma(conn, "freelist_count")}
+
+
+def _enable_incremental_vacuum(conn: Connection, idle: bool) -> dict:
+    # A full VACUUM rewrites the file, so this is never scheduled
+    if _pragma(conn, "auto_vacuum") == 2:
+        return {"skipped": "already incremental"}
+    conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.exec_driver_sql("VACUUM")
+    return {"auto_vacuum": AUTO_VACUUM_MODES[_pragma(conn, "auto_vacuum")]}
+
+
+TASKS: Dict[str, Callable[[Connection, bool], dict]] = {
+    "analyze": _analyze,
+    "optimize": _optimize,
+    "checkpoint": _checkpoint,
+    "vacuum": _vacuum,
+    "enable_incremental_vacuum": _enable_incremental_vacuum,
+}
+
+
+def task_intervals() -> Dict[str, float]:
+    """Seconds between scheduled runs of each scheduled task"""
+    return {
+        "analyze": settings.MAINTENANCE_ANALYZE_HOURS * 3600,
+        "optimize": settings.MAINTENANCE_OPTIMIZE_HOURS * 3600,
+        "checkpoint": settings.MAINTENANCE_CHECKPOINT_SECONDS,
+        "vacuum": settings.MAINTENANCE_VACUUM_HOURS * 3600,
+    }
+
+
+def run_task(db: Session, name: str, idle: bool = False) -> dict:
+    """Run one task on the session's engine and record the outcome. Commits."""
+    started = time.perf_counter()
+    record = {"last_run": datetime.now(timezone.utc).isoformat()}
+    try:
+        # Autocommit: VACUUM and checkpoints cannot run inside a transaction
+        with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            record["result"] = TASKS[name](conn, idle)
+        record["error"] = None
+    except Exception as e:
+        record["result"], record["error"] = None, str(e)
+    record["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    set_meta(db, META_PREFIX + name, json.dumps(record))
+    db.commit()
+    return record
+
+
+def last_runs(db: Session) -> Dict[str, dict]:
+    rows = db.execute(select(AppMeta.key, AppMeta.value)
+                      .where(AppMeta.key.startswith(META_PREFIX))).all()
+    return {key[len(META_PREFIX):]: json.loads(value) for key, value in rows}
+
+
+def database_stats(bind: Engine) -> dict:
+    """File, WAL and free-page sizes of a SQLite database"""
+    path = _sqlite_file(str(bind.url))
+    if path is None:
+        return {"supported": False}
+    wal = f"{path}-wal"
+    with bind.connect() as conn:
+        page_size = _pragma(conn, "page_size")
+        page_count = _pragma(conn, "page_count")
+        freelist = _pragma(conn, "freelist_count")
+        auto_vacuum = _pragma(conn, "auto_vacuum")
+    return {
+        "supported": True,
+        "path": path,
+        "file_bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+        "wal_bytes": os.path.getsize(wal) if os.path.exists(wal) else 0,
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_pages": freelist,
+        "freelist_bytes": freelist * page_size,
+        "auto_vacuum": AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum)),
+    }
+
+
+class ActivityMeter:
+    """ASGI middleware counting HTTP requests, so maintenance can wait for a lull"""
+
+    requests = 0
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            ActivityMeter.requests += 1
+        await self.app(scope, receive, send)
+
+
+class MaintenanceScheduler:
+    def __init__(self, session_factory: sessionmaker = SessionLocal,
+                 tick_seconds: float = None):
+        self.session_factory = session_factory
+        self.tick_seconds = (settings.MAINTENANCE_TICK_SECONDS
+                             if tick_seconds is None else tick_seconds)
+        self.leader = False
+        self._leadership = ExitStack()
+        self._last_requests = ActivityMeter.requests
+        self._last_tick = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._leadership.close()
+        self.leader = False
+
+    def _take_leadership(self) -> bool:
+        if not self.leader:
+            lock = file_lock(settings.MAINTENANCE_LOCK_PATH, blocking=False)
+            if self._leadership.enter_context(lock):
+                self.leader = True
+            else:
+                self._leadership.close()
+        return self.leader
+
+    def request_rate(self) -> float:
+        now = time.monotonic()
+        requests = ActivityMeter.requests
+        rate = (requests - self._last_requests) / max(now - self._last_tick, 1e-6)
+        self._last_requests, self._last_tick = requests, now
+        return rate
+
+    def due_tasks(self, idle: bool, now: datetime = None) -> list:
+        """Scheduled tasks to run now, given whether traffic is low"""
+        now = now or datetime.now(timezone.utc)
+        db = self.session_factory()
+        try:
+            runs = last_runs(db)
+        finally:
+            db.close()
+        due = []
+        for name, interval in task_intervals().items():
+            last = runs.get(name, {}).get("last_run")
+            age = ((now - datetime.fromisoformat(last)).total_seconds()
+                   if last else float("inf"))
+            if age >= interval and (idle or age >= 2 * interval):
+                due.append(name)
+        return due
+
+    def tick(self) -> Dict[str, dict]:
+        """Run whatever is due; returns the records of the tasks run"""
+        idle = self.request_rate() <= settings.MAINTENANCE_IDLE_RPS
+        db = self.session_factory()
+        try:
+            return {name: run_task(db, name, idle) for name in self.due_tasks(idle)}
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            try:
+                if self._take_leadership():
+                    await asyncio.to_thread(self.tick)
+            except Exception as e:  # keep the schedule going
+                print(f"Maintenance tick failed: {e}")
+
+
+maintenance_scheduler: Optional[MaintenanceScheduler] = None
+
+
+async def start_maintenance() -> None:
+    global maintenance_scheduler
+    if (settings.MAINTENANCE_ENABLED and maintenance_scheduler is None
+            and _sqlite_file(settings.DATABASE_URL)):
+        maintenance_scheduler = MaintenanceScheduler()
+        maintenance_scheduler.start()
+
+
+async def stop_maintenance() -> None:
+    global maintenance_scheduler
+    if maintenance_scheduler is not None:
+        await maintenance_scheduler.stop()
+        maintenance_scheduler = None
+
+
+@job_handler(MAINTENANCE_JOB)
+def maintenance_job(db: Session, payload: dict) -> dict:
+    record = run_task(db, payload["task"], idle=True)
+    if record["error"]:
+        raise RuntimeError(record["error"])
+    return record
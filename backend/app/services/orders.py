@@ -0,0 +1,74 @@
+"""Orders placed through checkout (CatalogService.checkout).
+
+An order stores each line's list price and the price actually charged
+after pricing rules, so it stays correct when prices or rules change.
+"""
+from typing import List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.order import Order, OrderLine
+
+# Distinct seeds per order; checkout's pair updates grow with its square
+MAX_ORDER_LINES = 100
+
+LINE_COLUMNS = [OrderLine.seed_id, OrderLine.quantity, OrderLine.list_price,
+                OrderLine.unit_price, OrderLine.rule_id]
+
+
+def add_order(db: Session, user_id: int, lines: List[dict], pricing_version: int) -> dict:
+    """Insert an order and its lines (caller commits); returns it as a dict.
+
+    Each line has seed_id, quantity, list_price, unit_price and rule_id.
+    """
+    total = round(sum(line["unit_price"] * line["quantity"] for line in lines), 2)
+    order = Order(user_id=user_id, total=total, pricing_version=pricing_version)
+    db.add(order)
+    db.flush()
+    db.execute(insert(OrderLine), [{**line, "order_id": order.id} for line in lines])
+    db.refresh(order)
+    return order_to_dict(order, lines)
+
+
+def order_to_dict(order: Order, lines: List[dict]) -> dict:
+    return {
+        "id": order.id,
+        "user_id": order.user_id,
+        "total": order.total,
+        "pricing_version": order.pricing_version,
+        "created_at": order.created_at,
+        "lines": [{**line, "line_total": round(line["unit_price"] * line["quantity"], 2)}
+                  for line in lines],
+    }
+
+
+def _lines(db: Session, order_ids: List[int]) -> dict:
+    lines = {order_id: [] for order_id in order_ids}
+    for row in db.execute(
+            select(OrderLine.order_id, *LINE_COLUMNS)
+            .where(OrderLine.order_id.in_(order_ids)).order_by(OrderLine.id)):
+        lines[row.order_id].append({column.key: getattr(row, column.key)
+                                    for column in LINE_COLUMNS})
+    return lines
+
+
+def get_order(db: Session, order_id: int) -> Optional[dict]:
+    order = db.get(Order, order_id)
+    if order is None:
+        return None
+    return order_to_dict(order, _lines(db, [order_id])[order_id])
+
+
+def list_orders(db: Session, user_id: int, before_id: Optional[int] = None,
+                limit: int = 20) -> dict:
+    """A page of the user's orders, newest first, and the cursor for the next page"""
+    statement = (select(Order).where(Order.user_id == user_id)
+                 .order_by(Order.id.desc()).limit(limit + 1))
+    if before_id is not None:
+        statement = statement.where(Order.id < before_id)
+    orders = db.execute(statement).scalars().all()
+    page = orders[:limit]
+    lines = _lines(db, [order.id for order in page])
+    return {"items": [order_to_dict(order, lines[order.id]) for order in page],
+            "next_before_id": page[-1].id if len(orders) > limit else None}
@@ -0,0 +1,109 @@
+"""Price history: what every seed cost at any point in time.
+
+Seed.price is only the current price. Each change (create, update, bulk
+reprice, delete) also appends a SeedPrice row in the same transaction, so
+the history can never disagree with what was committed.
+
+Both as-of questions are answered with seeks on ix_seed_prices_asof
+(seed_id, effective_from). The cost does not grow with the number of past
+changes:
+
+- Price of one seed at T: seek to the seed's last row at or before T.
+- All prices at T: a recursive CTE walks the distinct seed ids in the
+  index (one seek per seed instead of a scan of every row), then does the
+  per-seed seek above for each.
+
+Seeds created outside CatalogService have no history until
+backfill_prices() gives them a row (migration 10 does this once).
+"""
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple, Union
+
+from sqlalchemy import Select, exists, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, aliased
+
+from app.models.price import SeedPrice
+from app.models.seed import Seed
+
+PRICE_COLUMNS = [SeedPrice.id, SeedPrice.seed_id, SeedPrice.price, SeedPrice.effective_from]
+
+
+def as_utc(moment: Optional[datetime]) -> datetime:
+    """Naive UTC, the form effective_from is stored and compared in.
+
+    SQLite stores timestamps as text without an offset, so every value must
+    be in one zone for comparisons to hold. Naive input is taken as UTC.
+    """
+    if moment is None:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def record_prices(db: Session, prices: Iterable[Tuple[int, Optional[float]]],
+                  at: Optional[datetime] = None) -> None:
+    """Append (seed_id, price) rows effective from `at` (caller commits)"""
+    at = as_utc(at)
+    rows = [{"seed_id": seed_id, "price": price, "effective_from": at}
+            for seed_id, price in prices]
+    if rows:
+        db.execute(insert(SeedPrice), rows)
+
+
+def history_statement(seed_id: int, limit: int) -> Select:
+    """A seed's prices, newest first"""
+    return (select(*PRICE_COLUMNS)
+            .where(SeedPrice.seed_id == seed_id)
+            .order_by(SeedPrice.effective_from.desc(), SeedPrice.id.desc())
+            .limit(limit))
+
+
+def _row_at(seed_id, at: datetime):
+    # Id of the seed's row in effect at `at`: one seek, then one step back
+    return (select(SeedPrice.id)
+            .where(SeedPrice.seed_id == seed_id, SeedPrice.effective_from <= at)
+            .order_by(SeedPrice.effective_from.desc(), SeedPrice.id.desc())
+            .limit(1))
+
+
+def price_at_statement(seed_id: int, at: datetime) -> Select:
+    """The row in effect for one seed at `at` (none before its first price)"""
+    return select(*PRICE_COLUMNS).where(
+        SeedPrice.id == _row_at(seed_id, as_utc(at)).scalar_subquery())
+
+
+def prices_at_statement(at: datetime) -> Select:
+    """The row in effect at `at` for every seed that had a price then"""
+    at = as_utc(at)
+    # Loose index scan: each step seeks the next seed id above the last
+    later = aliased(SeedPrice)
+    ids = select(select(SeedPrice.seed_id).order_by(SeedPrice.seed_id).limit(1)
+                 .scalar_subquery().label("seed_id")).cte("price_seed_ids", recursive=True)
+    ids = ids.union_all(
+        select(select(later.seed_id).where(later.seed_id > ids.c.seed_id)
+               .order_by(later.seed_id).limit(1).scalar_subquery())
+        .where(ids.c.seed_id.is_not(None)))
+    in_effect = (select(_row_at(ids.c.seed_id, at).scalar_subquery().label("price_id"))
+                 .where(ids.c.seed_id.is_not(None))
+                 .subquery())
+    return (select(*PRICE_COLUMNS)
+            .join(in_effect, SeedPrice.id == in_effect.c.price_id)
+            .where(SeedPrice.price.is_not(None))
+            .order_by(SeedPrice.seed_id))
+
+
+def backfill_prices(db: Union[Session, Connection]) -> int:
+    """Give every seed without price history a row holding its current price.
+
+    The row counts from the seed's creation; changes made before history
+    was recorded are unknown. Used by migration 10 (caller commits).
+    """
+    missing = ~exists().where(SeedPrice.seed_id == Seed.id)
+    return db.execute(
+        insert(SeedPrice).from_select(
+            ["seed_id", "price", "effective_from"],
+            select(Seed.id, Seed.price,
+                   func.coalesce(Seed.created_at, func.current_timestamp()))
+            .where(missing))).rowcount
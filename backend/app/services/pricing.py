@@ -0,0 +1,319 @@
+"""Pricing rules compiled into an in-memory price book.
+
+Seed.price is the list price. Pricing rules (pricing_rules) discount it by
+a percentage or by an amount per unit. A rule targets one seed, one
+category or every seed. It can apply only from a minimum quantity
+(quantity breaks) and only within a time window (scheduled promotions).
+When several rules apply, the lowest resulting price wins; rules do not
+stack.
+
+Requests never evaluate rules from the database. Each worker compiles the
+enabled rules into a PriceBook: rule lists keyed by seed id and by
+category, each sorted by min_quantity. Pricing an item is two dict lookups
+plus a walk over the few rules on that seed and category, so a catalog
+page or a cart is priced in one linear pass.
+
+Every rule change bumps the "pricing" counter in the same transaction and
+is published on the pricing channel. A worker reads the counter again only
+after such a message, and recompiles only when the counter moved. Time
+windows need no recompile: the book keeps the instants where a window
+opens or closes, and re-selects the active rules in memory once one passes.
+"""
+import bisect
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from fastapi import status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.meta import current_sequence, next_sequence
+from app.models.pricing import PricingRule
+from app.services import audit
+from app.services.catalog import CATALOG_CHANNEL, CatalogError, CatalogService
+from app.services.prices import as_utc
+from app.services.shared_state import get_shared_state, subscribe
+
+# Shared state channel carrying "<action>:<rule_id>" change messages
+PRICING_CHANNEL = "pricing"
+
+# Counter bumped by every rule change; the compiled book's version
+PRICING_SEQUENCE = "pricing"
+
+RULE_FIELDS = ("name", "seed_id", "category", "percent_off", "amount_off",
+               "min_quantity", "starts_at", "ends_at", "active")
+
+
+class RuleNotFoundError(CatalogError):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Pricing rule not found"
+
+
+class InvalidRuleError(CatalogError):
+    status_code = 422  # same as request validation errors
+    detail = "Invalid pricing rule"
+
+
+# Bumped on every rule change in any worker (see PricingEngine.current)
+_generation = 0
+
+
+def _bump_generation(message: str) -> None:
+    global _generation
+    _generation += 1
+
+
+def _after_restore(message: str) -> None:
+    # A restored backup can rewind the rules and their counter
+    if message.startswith("restore:"):
+        pricing_engine.reset()
+        _bump_generation(message)
+
+
+subscribe(PRICING_CHANNEL, _bump_generation)
+subscribe(CATALOG_CHANNEL, _after_restore)
+
+
+class CompiledRule(NamedTuple):
+    id: int
+    min_quantity: int
+    percent_off: float
+    amount_off: float
+    starts_at: Optional[datetime]
+    ends_at: Optional[datetime]
+
+    def applies_at(self, now: datetime) -> bool:
+        return ((self.starts_at is None or self.starts_at <= now)
+                and (self.ends_at is None or now < self.ends_at))
+
+    def price(self, list_price: float) -> float:
+        return max(0.0, round(list_price * (100 - self.percent_off) / 100
+                              - self.amount_off, 2))
+
+
+class PriceBook:
+    """Enabled rules as of one counter value, indexed for lookups"""
+
+    def __init__(self, rules: Iterable[PricingRule], version: int):
+        self.version = version
+        # (seed_id, lower-cased category, rule), by min_quantity
+        self._rules = sorted(
+            ((rule.seed_id, rule.category.lower() if rule.category else None,
+              CompiledRule(rule.id, rule.min_quantity, rule.percent_off or 0.0,
+                           rule.amount_off or 0.0, _naive(rule.starts_at),
+                           _naive(rule.ends_at)))
+             for rule in rules),
+            key=lambda entry: (entry[2].min_quantity, entry[2].id))
+        # Instants where some rule's window opens or closes
+        self._boundaries = sorted({moment for _, _, rule in self._rules
+                                   for moment in (rule.starts_at, rule.ends_at)
+                                   if moment is not None})
+        self._window = None
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def _index(self, now: datetime):
+        # (from, until, by_seed, by_category, everywhere): the rules active
+        # between two consecutive boundaries, replaced once `now` leaves it
+        window = self._window
+        if window is None or not window[0] <= now < window[1]:
+            position = bisect.bisect_right(self._boundaries, now)
+            by_seed: Dict[int, List[CompiledRule]] = defaultdict(list)
+            by_category: Dict[str, List[CompiledRule]] = defaultdict(list)
+            everywhere: List[CompiledRule] = []
+            for seed_id, category, rule in self._rules:
+                if not rule.applies_at(now):
+                    continue
+                if seed_id is not None:
+                    by_seed[seed_id].append(rule)
+                elif category is not None:
+                    by_category[category].append(rule)
+                else:
+                    everywhere.append(rule)
+            window = (self._boundaries[position - 1] if position else datetime.min,
+                      self._boundaries[position] if position < len(self._boundaries)
+                      else datetime.max,
+                      dict(by_seed), dict(by_category), everywhere)
+            self._window = window
+        return window
+
+    def price_many(self, items: Iterable[Tuple[int, str, float, int]],
+                   at: Optional[datetime] = None) -> List[Tuple[float, Optional[int]]]:
+        """(unit price, rule id or None) per (seed_id, category, list price,
+        quantity), all priced at the same moment"""
+        _, _, by_seed, by_category, everywhere = self._index(as_utc(at))
+        priced = []
+        for seed_id, category, list_price, quantity in items:
+            best, best_rule = list_price, None
+            for rules in (by_seed.get(seed_id, ()),
+                          by_category.get(category.lower(), ()), everywhere):
+                for rule in rules:
+                    if rule.min_quantity > quantity:
+                        break
+                    price = rule.price(list_price)
+                    if price < best:
+                        best, best_rule = price, rule.id
+            priced.append((best, best_rule))
+        return priced
+
+
+def _naive(moment: Optional[datetime]) -> Optional[datetime]:
+    return None if moment is None else as_utc(moment)
+
+
+def compile_rules(db: Session, version: int) -> PriceBook:
+    rules = db.execute(select(PricingRule).where(PricingRule.active.is_(True))).scalars()
+    return PriceBook(rules, version)
+
+
+class PricingEngine:
+    """This worker's current PriceBook"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.book: Optional[PriceBook] = None
+        self._generation = None
+        self.compiles = 0
+
+    def reset(self) -> None:
+        """Drop the book; the next lookup compiles from the database"""
+        with self._lock:
+            self.book = None
+            self._generation = None
+
+    def current(self, db: Session) -> PriceBook:
+        # Read before the counter, so a change racing the check is seen next time
+        generation = _generation
+        book = self.book
+        if book is not None and generation == self._generation:
+            return book
+        with self._lock:
+            if self.book is None or generation != self._generation:
+                version = current_sequence(db, PRICING_SEQUENCE)
+                if self.book is None or self.book.version != version:
+                    self.book = compile_rules(db, version)
+                    self.compiles += 1
+                self._generation = generation
+            return self.book
+
+
+pricing_engine = PricingEngine()
+
+
+def price_seed_dicts(db: Session, items: List[dict], at: Optional[datetime] = None) -> List[dict]:
+    """Add `effective_price` and `rule_id` (quantity 1) to seed dicts in place"""
+    priced = pricing_engine.current(db).price_many(
+        ((item["id"], item["category"], item["price"], 1) for item in items), at)
+    for item, (price, rule_id) in zip(items, priced):
+        item["effective_price"] = price
+        item["rule_id"] = rule_id
+    return items
+
+
+def quote(db: Session, items: Iterable[Tuple[int, int]], at: Optional[datetime] = None) -> dict:
+    """Price (seed_id, quantity) pairs; repeated seeds are added together.
+
+    Quantity breaks apply to a seed's total quantity. `version` identifies
+    the rules used, so a checkout can tell whether they changed since.
+    """
+    quantities: Dict[int, int] = {}
+    for seed_id, quantity in items:
+        quantities[seed_id] = quantities.get(seed_id, 0) + quantity
+    rows, missing = CatalogService(db).get_many(list(quantities))
+    book = pricing_engine.current(db)
+    at = as_utc(at)
+    priced = book.price_many(
+        ((row[0], row[2], row[3], quantities[row[0]]) for row in rows), at)
+    lines = [{"seed_id": row[0], "name": row[1], "quantity": quantities[row[0]],
+              "list_price": row[3], "unit_price": price, "rule_id": rule_id,
+              "line_total": round(price * quantities[row[0]], 2)}
+             for row, (price, rule_id) in zip(rows, priced)]
+    return {"version": book.version, "priced_at": at, "items": lines, "missing": missing,
+            "total": round(sum(line["line_total"] for line in lines), 2)}
+
+
+# Rule changes. Each bumps the pricing counter in its transaction, after
+# the rule row, and publishes once committed.
+
+def list_rules(db: Session) -> List[PricingRule]:
+    return db.execute(select(PricingRule).order_by(PricingRule.id)).scalars().all()
+
+
+def _rule_state(rule: PricingRule) -> dict:
+    state = {field: getattr(rule, field) for field in RULE_FIELDS}
+    for field in ("starts_at", "ends_at"):
+        if state[field] is not None:
+            state[field] = state[field].isoformat()
+    return state
+
+
+def _validate(rule: PricingRule) -> None:
+    if (rule.percent_off is None) == (rule.amount_off is None):
+        raise InvalidRuleError("Set exactly one of percent_off and amount_off")
+    if rule.seed_id is not None and rule.category is not None:
+        raise InvalidRuleError("A rule targets a seed or a category, not both")
+    if rule.starts_at and rule.ends_at and rule.ends_at <= rule.starts_at:
+        raise InvalidRuleError("ends_at must be after starts_at")
+
+
+def _times_to_utc(data: dict) -> dict:
+    return {field: _naive(value) if field in ("starts_at", "ends_at") else value
+            for field, value in data.items()}
+
+
+def _commit(db: Session, action: str, rule_id: int) -> None:
+    next_sequence(db, PRICING_SEQUENCE)
+    db.commit()
+    get_shared_state().publish(PRICING_CHANNEL, f"{action}:{rule_id}")
+
+
+def create_rule(db: Session, data: dict, actor=None) -> PricingRule:
+    rule = PricingRule(**_times_to_utc(data))
+    try:
+        _validate(rule)
+        db.add(rule)
+        db.flush()
+        db.refresh(rule)
+        _commit(db, "create", rule.id)
+    except Exception:
+        db.rollback()
+        raise
+    audit.record(actor, "create", "pricing_rule", rule.id, None, _rule_state(rule))
+    return rule
+
+
+def update_rule(db: Session, rule_id: int, changes: dict, actor=None) -> PricingRule:
+    try:
+        rule = db.get(PricingRule, rule_id, with_for_update=True, populate_existing=True)
+        if rule is None:
+            raise RuleNotFoundError()
+        before = _rule_state(rule)
+        for field, value in _times_to_utc(changes).items():
+            setattr(rule, field, value)
+        _validate(rule)
+        db.flush()
+        db.refresh(rule)
+        _commit(db, "update", rule_id)
+    except Exception:
+        db.rollback()
+        raise
+    audit.record(actor, "update", "pricing_rule", rule_id, before, _rule_state(rule))
+    return rule
+
+
+def delete_rule(db: Session, rule_id: int, actor=None) -> None:
+    try:
+        rule = db.get(PricingRule, rule_id, with_for_update=True)
+        if rule is None:
+            raise RuleNotFoundError()
+        before = _rule_state(rule)
+        db.delete(rule)
+        db.flush()
+        _commit(db, "delete", rule_id)
+    except Exception:
+        db.rollback()
+        raise
+    audit.record(actor, "delete", "pricing_rule", rule_id, before, None)
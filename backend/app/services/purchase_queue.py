@@ -0,0 +1,131 @@
+"""Group-commit purchase queue.
+
+With PURCHASE_BATCHING enabled, purchase requests are queued to a single
+writer task. The writer takes everything that arrives within
+PURCHASE_BATCH_WINDOW_MS of the first request (up to PURCHASE_BATCH_MAX),
+applies it with `CatalogService.purchase_many` in one transaction, and
+resolves each caller's future with its own row or error. One fsync then
+covers the whole batch instead of one per purchase.
+"""
+import asyncio
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.catalog import CatalogError, CatalogService
+from app.utils.serialization import SEED_COLUMNS
+
+
+class PurchaseBatcher:
+    def __init__(self, session_factory: sessionmaker = SessionLocal,
+                 window_ms: float = None, max_batch: int = None):
+        self.session_factory = session_factory
+        self.window = (settings.PURCHASE_BATCH_WINDOW_MS
+                       if window_ms is None else window_ms) / 1000
+        self.max_batch = max_batch or settings.PURCHASE_BATCH_MAX
+        self.batches = 0
+        self.purchases = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.purchases / self.batches if self.batches else 0.0
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Finish queued purchases, then stop the writer task"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, seed_id: int) -> dict:
+        """Queue a one-unit purchase; returns the updated seed as a dict"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((seed_id, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                try:
+                    if remaining > 0:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[int, asyncio.Future]]) -> None:
+        seed_ids = [seed_id for seed_id, _ in batch]
+        try:
+            outcomes = await asyncio.to_thread(self._apply, seed_ids)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.purchases += len(batch)
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, CatalogError):
+                future.set_exception(outcome)
+            else:
+                future.set_result(dict(zip(SEED_COLUMNS, outcome)))
+
+    def _apply(self, seed_ids: List[int]):
+        db = self.session_factory()
+        try:
+            return CatalogService(db).purchase_many(seed_ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+purchase_batcher: Optional[PurchaseBatcher] = None
+
+
+def get_purchase_batcher() -> Optional[PurchaseBatcher]:
+    """FastAPI dependency: the running batcher, or None when batching is off"""
+    return purchase_batcher
+
+
+async def start_purchase_batching() -> None:
+    global purchase_batcher
+    if settings.PURCHASE_BATCHING and purchase_batcher is None:
+        purchase_batcher = PurchaseBatcher()
+        purchase_batcher.start()
+
+
+async def stop_purchase_batching() -> None:
+    global purchase_batcher
+    if purchase_batcher is not None:
+        await purchase_batcher.stop()
+        purchase_batcher = None
@@ -0,0 +1,223 @@
+"""Frequently bought together: seeds that appear in the same orders.
+
+seed_pairs is a sparse item-item co-occurrence matrix: for each pair of
+seeds, how many orders contained both. seed_related holds each seed's top
+RECOMMENDATIONS_TOP_K related seeds, ranked by that count (ties by id), so
+GET /api/seeds/{id}/related reads K rows by primary key. No request ever
+aggregates over orders.
+
+Both tables are kept current two ways:
+
+- Incrementally at checkout, in the order's transaction. Each pair of seeds
+  in the order gets one more count (n*(n-1) upserts for n seeds). Counts
+  only grow, so a seed's new top list is the best K of its old list and
+  the pairs this order touched. That costs O(n*(n+K)), however many orders
+  or neighbours a seed already has.
+- By the rebuild job, every RECOMMENDATIONS_REBUILD_HOURS. It recomputes
+  both tables from order_lines with NumPy, one array operation per chunk
+  of orders rather than a Python loop per pair. This corrects any drift,
+  e.g. after order lines are deleted. Loading and counting run on a
+  reader; checkouts only wait for the final swap of both tables.
+"""
+import time
+from itertools import chain
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is in requirements.txt
+    np = None
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.order import Order, OrderLine
+from app.models.recommendation import RelatedSeed, SeedPair
+from app.services.facets import add_counts_many
+from app.services.jobs import enqueue_periodic, job_handler, read_session
+
+# Job that recomputes seed_pairs and seed_related from every order
+REBUILD_RECOMMENDATIONS_JOB = "rebuild_recommendations"
+
+# Pairs expanded per NumPy step of the rebuild, which bounds its memory
+PAIR_CHUNK = 2_000_000
+
+# Rows per executemany when the rebuild writes the tables
+INSERT_CHUNK = 10_000
+
+
+def add_order_pairs(db: Session, seed_ids: Iterable[int]) -> None:
+    """Count one order containing `seed_ids` and refresh their top lists.
+
+    Rows are written in (seed_id, related_id) order, so concurrent
+    checkouts lock them in the same order (caller commits).
+    """
+    ids = sorted(set(seed_ids))
+    if len(ids) < 2:
+        return
+    add_counts_many(db, SeedPair.__table__, ["seed_id", "related_id"],
+                    [{"seed_id": a, "related_id": b, "orders": 1}
+                     for a in ids for b in ids if a != b])
+    touched: Dict[int, Dict[int, int]] = {seed_id: {} for seed_id in ids}
+    for seed_id, related_id, orders in db.execute(
+            select(SeedPair.seed_id, SeedPair.related_id, SeedPair.orders)
+            .where(SeedPair.seed_id.in_(ids), SeedPair.related_id.in_(ids))):
+        touched[seed_id][related_id] = orders
+    for seed_id, related_id, orders in db.execute(
+            select(RelatedSeed.seed_id, RelatedSeed.related_id, RelatedSeed.orders)
+            .where(RelatedSeed.seed_id.in_(ids))):
+        touched[seed_id].setdefault(related_id, orders)
+
+    k = settings.RECOMMENDATIONS_TOP_K
+    rows = []
+    for seed_id in ids:
+        best = sorted(touched[seed_id].items(), key=lambda item: (-item[1], item[0]))[:k]
+        rows += [{"seed_id": seed_id, "rank": rank, "related_id": related_id,
+                  "orders": orders}
+                 for rank, (related_id, orders) in enumerate(best)]
+    db.execute(delete(RelatedSeed).where(RelatedSeed.seed_id.in_(ids)))
+    db.execute(insert(RelatedSeed), rows)
+
+
+def int_columns(result, width: int) -> "np.ndarray":
+    """An (n, width) int64 array of integer result rows.
+
+    Flattened through fromiter: np.array() over Row objects inspects each
+    one as a sequence and is several times slower than the query itself.
+    """
+    return np.fromiter(chain.from_iterable(result), np.int64).reshape(-1, width)
+
+
+def cooccurrence(order_ids, seed_ids) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """(seed_id, related_id, orders) arrays for every ordered pair of
+    different seeds bought together.
+
+    Takes one entry per distinct (order, seed), grouped by order. Each
+    order of n seeds is expanded to its n*n (left, right) positions with
+    repeat/arange arithmetic, and pairs are counted with np.unique over
+    seed_id * width + related_id keys.
+    """
+    order_ids = np.asarray(order_ids, np.int64)
+    seed_ids = np.asarray(seed_ids, np.int64)
+    empty = np.zeros(0, np.int64)
+    if len(seed_ids) == 0:
+        return empty, empty, empty
+    width = int(seed_ids.max()) + 1
+    starts = np.flatnonzero(np.r_[True, order_ids[1:] != order_ids[:-1]])
+    sizes = np.diff(np.r_[starts, len(seed_ids)])
+    # Orders per chunk, so a chunk expands to about PAIR_CHUNK positions
+    cumulative = np.cumsum(sizes * sizes)
+    keys, counts = [], []
+    first = 0
+    while first < len(starts):
+        limit = (cumulative[first - 1] if first else 0) + PAIR_CHUNK
+        last = max(first + 1, int(np.searchsorted(cumulative, limit, side="right")))
+        n = sizes[first:last]
+        lines = np.arange(starts[first], starts[first] + n.sum())
+        per_line = np.repeat(n, n)  # each line's order size
+        left = np.repeat(lines, per_line)
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(per_line) - per_line, per_line)
+        right = np.repeat(np.repeat(starts[first:last], n), per_line) + offsets
+        a, b = seed_ids[left], seed_ids[right]
+        different = a != b
+        chunk_keys, chunk_counts = np.unique(a[different] * width + b[different],
+                                             return_counts=True)
+        keys.append(chunk_keys)
+        counts.append(chunk_counts)
+        first = last
+    unique_keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    totals = np.bincount(inverse, weights=np.concatenate(counts)).astype(np.int64)
+    return unique_keys // width, unique_keys % width, totals
+
+
+def top_related(seed_ids, related_ids, orders, k: int):
+    """Rank each seed's pairs by orders (ties by related id) and keep k.
+
+    Returns (seed_id, rank, related_id, orders) arrays.
+    """
+    order = np.lexsort((related_ids, -orders, seed_ids))
+    seed_ids, related_ids, orders = seed_ids[order], related_ids[order], orders[order]
+    starts = np.flatnonzero(np.r_[True, seed_ids[1:] != seed_ids[:-1]]) if len(order) \
+        else np.zeros(0, np.int64)
+    sizes = np.diff(np.r_[starts, len(order)])
+    rank = np.arange(len(order)) - np.repeat(starts, sizes)
+    keep = rank < k
+    return seed_ids[keep], rank[keep], related_ids[keep], orders[keep]
+
+
+def _insert_columns(db: Session, model, columns: Dict[str, "np.ndarray"]) -> None:
+    names = list(columns)
+    values = [columns[name].tolist() for name in names]
+    total = len(values[0]) if values else 0
+    for start in range(0, total, INSERT_CHUNK):
+        db.execute(insert(model), [dict(zip(names, row)) for row in
+                                   zip(*(column[start:start + INSERT_CHUNK]
+                                         for column in values))])
+
+
+def rebuild_recommendations(db: Session) -> dict:
+    """Recompute seed_pairs and seed_related from order_lines (commits).
+
+    Orders are loaded and counted on a reader, up to the newest order at
+    the time. The writer is then held only to swap both tables and to add
+    the orders committed in the meantime, as checkout would have.
+    """
+    started = time.perf_counter()
+    with read_session(db) as reader:
+        cursor = reader.execute(select(func.max(Order.id))).scalar() or 0
+        lines = int_columns(reader.execute(
+            select(OrderLine.order_id, OrderLine.seed_id).distinct()
+            .where(OrderLine.order_id <= cursor)
+            .order_by(OrderLine.order_id, OrderLine.seed_id)), 2)
+    loaded = time.perf_counter()
+    seed_ids, related_ids, orders = cooccurrence(lines[:, 0], lines[:, 1])
+    top = top_related(seed_ids, related_ids, orders, settings.RECOMMENDATIONS_TOP_K)
+    computed = time.perf_counter()
+    try:
+        # Delete first: on SQLite this takes the write lock, so checkouts
+        # that commit from here on wait and are caught by the query below
+        db.execute(delete(SeedPair))
+        db.execute(delete(RelatedSeed))
+        _insert_columns(db, SeedPair, {"seed_id": seed_ids, "related_id": related_ids,
+                                       "orders": orders})
+        _insert_columns(db, RelatedSeed, dict(zip(("seed_id", "rank", "related_id",
+                                                   "orders"), top)))
+        later: Dict[int, List[int]] = {}
+        for order_id, seed_id in db.execute(
+                select(OrderLine.order_id, OrderLine.seed_id)
+                .where(OrderLine.order_id > cursor).order_by(OrderLine.order_id)):
+            later.setdefault(order_id, []).append(seed_id)
+        for seed_list in later.values():
+            add_order_pairs(db, seed_list)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finished = time.perf_counter()
+    return {
+        "order_lines": len(lines),
+        "orders": len(np.unique(lines[:, 0])),
+        "orders_after_load": len(later),
+        "pairs": len(seed_ids),
+        "related_rows": len(top[0]),
+        "load_ms": round((loaded - started) * 1000, 2),
+        "compute_ms": round((computed - loaded) * 1000, 2),
+        "write_ms": round((finished - computed) * 1000, 2),
+    }
+
+
+def schedule_rebuilds(db: Session):
+    """Queue the next periodic rebuild, unless disabled; returns the job"""
+    hours = settings.RECOMMENDATIONS_REBUILD_HOURS
+    if hours > 0 and np is not None:
+        return enqueue_periodic(db, REBUILD_RECOMMENDATIONS_JOB, hours * 3600,
+                                {"periodic": True})
+    return None
+
+
+@job_handler(REBUILD_RECOMMENDATIONS_JOB)
+def rebuild_recommendations_job(db: Session, payload: dict) -> dict:
+    if payload.get("periodic"):
+        schedule_rebuilds(db)  # the next slot, even if this run fails
+    return rebuild_recommendations(db)
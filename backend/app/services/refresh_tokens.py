@@ -0,0 +1,125 @@
+"""Refresh tokens: opaque random strings exchanged for new access tokens.
+
+Only the SHA-256 digest of a token is stored, so a refresh is one indexed
+lookup and one conditional UPDATE; bcrypt runs only when a password is
+actually typed in. Every refresh rotates the token. Presenting a token that
+was already rotated means it leaked (or a client replayed it), so the whole
+family descended from the same login is revoked.
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+class InvalidRefreshToken(Exception):
+    """The refresh token is unknown, expired, revoked or was reused"""
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands timestamps back without tzinfo; they are stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def issue_refresh_token(db: Session, user_id: int,
+                        family_id: Optional[str] = None) -> Tuple[str, RefreshToken]:
+    """Create a refresh token for `user_id` (caller commits)"""
+    now = _utcnow()
+    # Drop this user's expired tokens while we are writing anyway
+    db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.expires_at < now)
+        .execution_options(synchronize_session=False))
+    token = secrets.token_urlsafe(32)
+    row = RefreshToken(
+        token_hash=hash_token(token),
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=now + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(row)
+    return token, row
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[User, str]:
+    """Revoke `token` and issue its successor; returns (user, new token).
+
+    Commits on success. Raises InvalidRefreshToken otherwise, after revoking
+    the token's family when a rotated token is presented again.
+    """
+    row = db.execute(select(RefreshToken).where(
+        RefreshToken.token_hash == hash_token(token))).scalar_one_or_none()
+    if row is None:
+        raise InvalidRefreshToken("Invalid refresh token")
+    now = _utcnow()
+    if _aware(row.expires_at) <= now:
+        raise InvalidRefreshToken("Refresh token expired")
+
+    # Conditional so two concurrent refreshes cannot both rotate one token
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    ).rowcount
+    if not claimed:
+        revoke_family(db, row.family_id)
+        db.commit()
+        raise InvalidRefreshToken("Refresh token reuse detected")
+
+    user = db.get(User, row.user_id)
+    if user is None:
+        db.rollback()
+        raise InvalidRefreshToken("User not found")
+    new_token, new_row = issue_refresh_token(db, user.id, row.family_id)
+    db.flush()
+    db.execute(update(RefreshToken).where(RefreshToken.id == row.id)
+               .values(replaced_by_id=new_row.id))
+    db.commit()
+    return user, new_token
+
+
+def revoke_family(db: Session, family_id: str) -> int:
+    """Revoke every live token in a family (caller commits)"""
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_utcnow())
+    ).rowcount
+
+
+def revoke_token(db: Session, token: str) -> bool:
+    """Log out: revoke the family `token` belongs to. Commits."""
+    family_id = db.execute(select(RefreshToken.family_id).where(
+        RefreshToken.token_hash == hash_token(token))).scalar()
+    if family_id is None:
+        return False
+    revoke_family(db, family_id)
+    db.commit()
+    return True
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> int:
+    """Log out everywhere: revoke all of a user's live tokens. Commits."""
+    count = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_utcnow())
+    ).rowcount
+    db.commit()
+    return count
@@ -0,0 +1,281 @@
+"""State shared between worker processes.
+
+Per-process caches register a callback for a channel and publish
+invalidations whenever they change something other workers may have cached.
+The local backend only reaches the current process; the SQLite backend
+stores keys and an invalidation log in a small WAL-mode database file that
+every worker on the host opens.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import settings
+
+Callback = Callable[[str], None]
+
+# Invalidation events older than this are pruned from the shared log
+EVENT_RETENTION_SECONDS = 300
+
+
+class SharedStateBackend(ABC):
+    """Key/value store plus invalidation broadcast shared by all workers"""
+
+    def __init__(self, subscribers: Optional[Dict[str, List[Callback]]] = None):
+        self._subscribers = subscribers if subscribers is not None else defaultdict(list)
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """The value at `key`, or None when missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, expiring after `ttl` seconds"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove `key` if present"""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Atomically add `amount` to an integer key; returns the new value"""
+
+    def subscribe(self, channel: str, callback: Callback) -> None:
+        """Call `callback(message)` for every invalidation on `channel`"""
+        self._subscribers[channel].append(callback)
+
+    @abstractmethod
+    def publish(self, channel: str, message: str = "") -> None:
+        """Broadcast an invalidation to every worker, including this one"""
+
+    def poll(self) -> int:
+        """Deliver invalidations published by other workers; returns count"""
+        return 0
+
+    def start(self) -> None:
+        """Start background delivery of remote invalidations"""
+
+    def close(self) -> None:
+        """Stop background delivery and release resources"""
+
+    def _dispatch(self, channel: str, message: str) -> None:
+        for callback in list(self._subscribers.get(channel, ())):
+            try:
+                callback(message)
+            except Exception as e:
+                print(f"shared_state: subscriber for '{channel}' failed - {e}")
+
+
+class LocalStateBackend(SharedStateBackend):
+    """In-process backend, correct only when serving with a single worker"""
+
+    def __init__(self, subscribers=None):
+        super().__init__(subscribers)
+        self._lock = threading.Lock()
+        self._values: Dict[str, tuple] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._values[key] = (value, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            value, expires_at = self._values.get(key, (0, None))
+            value = int(value) + amount
+            self._values[key] = (value, expires_at)
+            return value
+
+    def publish(self, channel: str, message: str = "") -> None:
+        self._dispatch(channel, message)
+
+
+class SQLiteStateBackend(SharedStateBackend):
+    """Backend stored in a SQLite file opened by every worker on the host"""
+
+    def __init__(self, path: str, poll_interval: float = 0.5, subscribers=None):
+        super().__init__(subscribers)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS kv (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                message TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        row = self._conn.execute("SELECT MAX(id) FROM events").fetchone()
+        # Only invalidations published after we joined are relevant
+        self._last_event_id = row[0] or 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM kv WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                "expires_at = excluded.expires_at",
+                (key, json.dumps(value), expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "INSERT INTO kv (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "value = CAST(kv.value AS INTEGER) + excluded.value "
+                "RETURNING value",
+                (key, amount),
+            ).fetchone()
+        return int(row[0])
+
+    def publish(self, channel: str, message: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO events (channel, message, origin, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (channel, message, self.origin, now),
+            )
+            self._conn.execute(
+                "DELETE FROM events WHERE created_at < ?",
+                (now - EVENT_RETENTION_SECONDS,),
+            )
+        self._dispatch(channel, message)
+
+    def poll(self) -> int:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, channel, message, origin FROM events "
+                "WHERE id > ? ORDER BY id",
+                (self._last_event_id,),
+            ).fetchall()
+            if rows:
+                self._last_event_id = rows[-1][0]
+        delivered = 0
+        for _, channel, message, origin in rows:
+            if origin == self.origin:
+                continue
+            self._dispatch(channel, message)
+            delivered += 1
+        return delivered
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="shared-state-poll", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except sqlite3.Error as e:
+                print(f"shared_state: poll failed - {e}")
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            self._conn.close()
+
+
+_backend: Optional[SharedStateBackend] = None
+_backend_lock = threading.Lock()
+# Subscriptions outlive a backend, which is rebuilt after close_shared_state
+_process_subscribers: Dict[str, List[Callback]] = defaultdict(list)
+
+
+def create_shared_state(kind: Optional[str] = None) -> SharedStateBackend:
+    """Build the backend named by `kind` (defaults to SHARED_STATE_BACKEND)"""
+    kind = (kind or settings.SHARED_STATE_BACKEND).lower()
+    if kind == "local":
+        return LocalStateBackend(_process_subscribers)
+    if kind == "sqlite":
+        return SQLiteStateBackend(
+            settings.SHARED_STATE_PATH, settings.SHARED_STATE_POLL_SECONDS,
+            _process_subscribers)
+    raise ValueError(f"Unknown shared state backend: {kind}")
+
+
+def get_shared_state() -> SharedStateBackend:
+    """Return the process-wide shared state backend"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_shared_state()
+    return _backend
+
+
+def subscribe(channel: str, callback: Callback) -> None:
+    """Subscribe on whichever backend is (or will be) active in this process"""
+    _process_subscribers[channel].append(callback)
+
+
+def close_shared_state() -> None:
+    """Close the process-wide backend; the next access builds a new one"""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
@@ -0,0 +1,44 @@
+"""Single-flight: concurrent identical calls share one execution.
+
+The first caller for a key (the leader) runs the function in a worker
+thread; callers arriving with the same key while it runs await the same
+result instead of repeating the work. Nothing is cached: once the flight
+lands, the next caller starts a new one.
+"""
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.flights = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return fn() for `key`, sharing an in-flight call when there is one"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(asyncio.to_thread(fn))
+            self._flights[key] = flight
+            self.flights += 1
+            flight.add_done_callback(lambda _: self._land(key, flight))
+        else:
+            self.coalesced += 1
+        # Shielded: a cancelled caller must not cancel the others' result
+        return await asyncio.shield(flight)
+
+    def _land(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            flight.exception()  # retrieved: no "never retrieved" warning
+
+    def stats(self) -> dict:
+        total = self.flights + self.coalesced
+        return {
+            "flights": self.flights,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0,
+        }
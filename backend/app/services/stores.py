@@ -0,0 +1,248 @@
+"""Per-store inventory on sharded SQLite databases.
+
+Each store's stock lives in its own shard (database.ShardRouter), so
+purchases in different stores commit to different files and never queue
+behind one write lock. The product catalog stays in the main database.
+
+Every stock change also appends to the shard's outbox in the same
+transaction. `drain_outbox` later folds outbox entries into cross-store
+totals in the main database: it sums them per seed, adds the sums to
+store_stock_totals and advances the store's cursor in one main-database
+transaction, then deletes the applied entries from the shard. Totals are
+therefore maintained incrementally and are never recomputed by scanning
+every shard. A crash between the two commits only leaves entries the next
+drain skips by cursor.
+"""
+import asyncio
+from collections import Counter
+from typing import List, Optional
+
+from fastapi import Depends, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import database
+from app.config import settings
+from app.database import SessionLocal, ShardRouter
+from app.middleware.auth import get_store_access
+from app.models.store import StockOutbox, StoreRollupCursor, StoreStock, StoreStockTotal
+from app.services.catalog import CatalogError, OutOfStockError
+from app.services.facets import add_counts
+
+# Outbox entries folded into the totals per main-database transaction
+ROLLUP_BATCH = 5000
+
+
+class UnknownStoreError(CatalogError):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Store not found"
+
+
+class NotStockedError(CatalogError):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Seed is not stocked in this store"
+
+
+def get_shard_router() -> ShardRouter:
+    return database.shard_router
+
+
+class StoreInventory:
+    """Stock operations for one store, on a session bound to its shard"""
+
+    def __init__(self, store_id: str, db: Session):
+        self.store_id = store_id
+        self.db = db
+
+    def stock(self) -> List[dict]:
+        rows = self.db.execute(
+            select(StoreStock.seed_id, StoreStock.quantity).order_by(StoreStock.seed_id))
+        return [{"store_id": self.store_id, "seed_id": seed_id, "quantity": quantity}
+                for seed_id, quantity in rows]
+
+    def purchase(self, seed_id: int) -> dict:
+        """Decrease the store's stock by one (conditional UPDATE, like CatalogService)"""
+        try:
+            quantity = self.db.execute(
+                update(StoreStock)
+                .where(StoreStock.seed_id == seed_id, StoreStock.quantity > 0)
+                .values(quantity=StoreStock.quantity - 1)
+                .returning(StoreStock.quantity)
+            ).scalar()
+            if quantity is None:
+                if self.db.get(StoreStock, seed_id) is None:
+                    raise NotStockedError()
+                raise OutOfStockError()
+            self.db.execute(insert(StockOutbox).values(seed_id=seed_id, delta=-1))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return {"store_id": self.store_id, "seed_id": seed_id, "quantity": quantity}
+
+    def restock(self, seed_id: int, quantity: int) -> dict:
+        """Add stock, creating the store's row for the seed if needed.
+
+        The caller checks that the seed exists in the catalog.
+        """
+        try:
+            add_counts(self.db, StoreStock.__table__, {"seed_id": seed_id},
+                       {"quantity": quantity})
+            self.db.execute(insert(StockOutbox).values(seed_id=seed_id, delta=quantity))
+            total = self.db.execute(
+                select(StoreStock.quantity).where(StoreStock.seed_id == seed_id)).scalar()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return {"store_id": self.store_id, "seed_id": seed_id, "quantity": total}
+
+
+def drain_outbox(router: ShardRouter, store_id: str,
+                 session_factory: sessionmaker = SessionLocal,
+                 batch: int = ROLLUP_BATCH) -> int:
+    """Fold one batch of a store's outbox into the totals; returns entries applied"""
+    shard = router.session(store_id)
+    main = session_factory()
+    try:
+        last = main.execute(select(StoreRollupCursor.last_outbox_id).where(
+            StoreRollupCursor.store_id == store_id)).scalar()
+        if last is None:
+            add_counts(main, StoreRollupCursor.__table__, {"store_id": store_id},
+                       {"last_outbox_id": 0})
+            main.commit()
+            last = 0
+        # Entries applied before a crash, not yet deleted
+        shard.execute(delete(StockOutbox).where(StockOutbox.id <= last))
+        shard.commit()
+
+        entries = shard.execute(
+            select(StockOutbox.id, StockOutbox.seed_id, StockOutbox.delta)
+            .where(StockOutbox.id > last).order_by(StockOutbox.id).limit(batch)).all()
+        shard.rollback()  # release the shard read snapshot
+        if not entries:
+            return 0
+        new_last = entries[-1][0]
+
+        # Claim the range first: a concurrent drain (another worker) of the
+        # same store finds the cursor moved and applies nothing
+        claimed = main.execute(
+            update(StoreRollupCursor)
+            .where(StoreRollupCursor.store_id == store_id,
+                   StoreRollupCursor.last_outbox_id == last)
+            .values(last_outbox_id=new_last)).rowcount
+        if not claimed:
+            main.rollback()
+            return 0
+        deltas = Counter()
+        for _, seed_id, delta in entries:
+            deltas[seed_id] += delta
+        for seed_id in sorted(deltas):
+            if deltas[seed_id]:
+                add_counts(main, StoreStockTotal.__table__, {"seed_id": seed_id},
+                           {"quantity": deltas[seed_id]})
+        main.commit()
+
+        shard.execute(delete(StockOutbox).where(StockOutbox.id <= new_last))
+        shard.commit()
+        return len(entries)
+    except Exception:
+        main.rollback()
+        shard.rollback()
+        raise
+    finally:
+        main.close()
+        shard.close()
+
+
+def drain_all(router: ShardRouter, session_factory: sessionmaker = SessionLocal) -> int:
+    """Drain every store's outbox completely; returns entries applied"""
+    applied = 0
+    for store_id in router.stores:
+        while True:
+            count = drain_outbox(router, store_id, session_factory)
+            applied += count
+            if count < ROLLUP_BATCH:
+                break
+    return applied
+
+
+def stock_totals(db: Session, seed_ids: Optional[List[int]] = None) -> List[dict]:
+    statement = select(StoreStockTotal.seed_id, StoreStockTotal.quantity)
+    if seed_ids:
+        statement = statement.where(StoreStockTotal.seed_id.in_(seed_ids))
+    return [{"seed_id": seed_id, "quantity": quantity}
+            for seed_id, quantity in db.execute(statement.order_by(StoreStockTotal.seed_id))]
+
+
+class StoreRollup:
+    """Background task draining every store's outbox on an interval"""
+
+    def __init__(self, router: ShardRouter, interval: float = None):
+        self.router = router
+        self.interval = (settings.STORE_ROLLUP_INTERVAL_SECONDS
+                         if interval is None else interval)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Leave nothing behind for the next start
+        await asyncio.to_thread(drain_all, self.router)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(drain_all, self.router)
+            except Exception as e:  # keep rolling up after a transient error
+                print(f"Store rollup failed: {e}")
+
+
+store_rollup: Optional[StoreRollup] = None
+
+
+async def start_store_rollup() -> None:
+    global store_rollup
+    router = get_shard_router()
+    if router.stores and store_rollup is None:
+        store_rollup = StoreRollup(router)
+        store_rollup.start()
+
+
+async def stop_store_rollup() -> None:
+    global store_rollup
+    if store_rollup is not None:
+        await store_rollup.stop()
+        store_rollup = None
+
+
+def _store_inventory(store_id: str, write: bool):
+    try:
+        db = get_shard_router().session(store_id, write=write)
+    except KeyError:
+        raise UnknownStoreError()
+    try:
+        yield StoreInventory(store_id, db)
+    finally:
+        db.close()
+
+
+def get_store_reader(store_id: str = Depends(get_store_access)):
+    """FastAPI dependency: the path's store on its shard's read-only session"""
+    yield from _store_inventory(store_id, write=False)
+
+
+def get_store_writer(store_id: str = Depends(get_store_access)):
+    """FastAPI dependency: the path's store on its shard's writer session"""
+    yield from _store_inventory(store_id, write=True)
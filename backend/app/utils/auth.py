@@ -1,8 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 import bcrypt
 from app.config import settings
+from app.utils.token_cache import (
+    HMAC_ALGORITHMS, REJECTED, InvalidToken, TokenCache, decode_hmac)
+
+# Decoded payloads of recently verified (and rejected) access tokens
+token_cache = TokenCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    negative_ttl=settings.TOKEN_CACHE_NEGATIVE_TTL_SECONDS,
+    expiry_margin=settings.TOKEN_CACHE_EXPIRY_MARGIN_SECONDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -28,6 +36,8 @@ def get_password_hash(password: str) -> str:
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
+    # jose pulls in cryptography; import on first use to keep boot fast
+    from jose import jwt
     to_encode = data.copy()
 
     if expires_delta:
@@ -45,19 +55,41 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def verify_token(token: str) -> Optional[dict]:
-    """Verify and decode a JWT token"""
+    """Verify and decode a JWT token.
+
+    Results are cached by token digest, so a token seen before costs a
+    dictionary lookup. The returned payload is shared; do not modify it.
+    """
+    if not token:
+        print("verify_token: No token provided")
+        return None
+    key = token_cache.key(token)
+    cached = token_cache.lookup(key)
+    if cached is not None:
+        return None if cached is REJECTED else cached
+    payload = _decode_token(token)
+    token_cache.store(key, payload)
+    return payload
+
+
+def _decode_token(token: str) -> Optional[dict]:
     try:
-        if not token:
-            print("verify_token: No token provided")
-            return None
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY,
-                             algorithms=[settings.JWT_ALGORITHM])
-        print(
-            f"verify_token: Token verified successfully for user {payload.get('sub')}")
+        if (settings.JWT_BACKEND == "hmac"
+                and settings.JWT_ALGORITHM in HMAC_ALGORITHMS):
+            payload = decode_hmac(
+                token, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+        else:
+            from jose import jwt
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY,
+                                 algorithms=[settings.JWT_ALGORITHM])
         return payload
-    except JWTError as e:
+    except InvalidToken as e:
         print(f"verify_token: JWT Error - {e}")
         return None
     except Exception as e:
-        print(f"verify_token: Unexpected error - {e}")
+        from jose import JWTError
+        if isinstance(e, JWTError):
+            print(f"verify_token: JWT Error - {e}")
+        else:
+            print(f"verify_token: Unexpected error - {e}")
         return None
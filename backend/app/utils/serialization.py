@@ -0,0 +1,75 @@
+"""Fast JSON serialization for seed lists.
+
+List endpoints select plain column tuples and dump them straight to JSON,
+skipping ORM object construction and the response_model validate/dump cycle.
+The output matches `SeedResponse` field for field.
+"""
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Column order of the tuples passed to dump_seed_rows (see SeedResponse)
+SEED_COLUMNS = (
+    "id", "name", "category", "price", "quantity", "image",
+    "created_at", "updated_at",
+)
+
+
+class SeedRow(TypedDict):
+    id: int
+    name: str
+    category: str
+    price: float
+    quantity: int
+    image: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+
+# Serializes TypedDicts in pydantic-core without building models
+seed_rows_adapter = TypeAdapter(List[SeedRow])
+
+
+def seed_rows_to_dicts(rows: Iterable[Sequence]) -> List[dict]:
+    return [dict(zip(SEED_COLUMNS, row)) for row in rows]
+
+
+def dump_seed_rows(rows: Iterable[Sequence]) -> bytes:
+    """Serialize (id, name, ..., updated_at) tuples to a JSON array"""
+    records = seed_rows_to_dicts(rows)
+    if orjson is not None:
+        # UTC as "Z", as pydantic writes it (aware datetimes on PostgreSQL)
+        return orjson.dumps(records, option=orjson.OPT_UTC_Z)
+    return seed_rows_adapter.dump_json(records)
+
+
+def dump_seed_row_chunks(chunks: Iterable[Iterable[Sequence]]) -> bytes:
+    """Serialize rows arriving in chunks (e.g. from a server-side cursor).
+
+    Each chunk is encoded as soon as it arrives, so only one chunk of rows
+    is held in memory alongside the encoded output.
+    """
+    parts = []
+    for chunk in chunks:
+        encoded = dump_seed_rows(chunk)
+        if len(encoded) > 2:  # skip empty chunks ("[]")
+            parts.append(encoded[1:-1])
+    return b"[" + b",".join(parts) + b"]"
+
+
+class SeedListResponse(Response):
+    """JSON response built from seed row tuples or pre-serialized bytes"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_seed_rows(content)
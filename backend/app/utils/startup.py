@@ -0,0 +1,63 @@
+"""Startup profiler: where boot time goes and how long until the first request.
+
+Times are measured from the moment the `app` package was first imported.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import app as _app_package
+
+
+class StartupProfiler:
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.phases: List[Dict] = []
+        self.ready_ms: Optional[float] = None
+        self.first_request_ms: Optional[float] = None
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started_at) * 1000, 2)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record how long the enclosed block takes"""
+        phase_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                "name": name,
+                "ms": round((time.perf_counter() - phase_started) * 1000, 2),
+            })
+
+    def mark_ready(self) -> None:
+        self.ready_ms = self._elapsed_ms()
+
+    def mark_first_request(self) -> None:
+        if self.first_request_ms is None:
+            self.first_request_ms = self._elapsed_ms()
+
+    def report(self) -> Dict:
+        return {
+            "phases": list(self.phases),
+            "ready_ms": self.ready_ms,
+            "first_request_ms": self.first_request_ms,
+        }
+
+
+profiler = StartupProfiler(_app_package.IMPORT_STARTED)
+
+
+class FirstRequestTimer:
+    """ASGI middleware that records when the first HTTP request arrives"""
+
+    def __init__(self, app):
+        self.app = app
+        self.seen = False
+
+    async def __call__(self, scope, receive, send):
+        if not self.seen and scope["type"] == "http":
+            self.seen = True
+            profiler.mark_first_request()
+        await self.app(scope, receive, send)
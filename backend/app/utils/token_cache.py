@@ -0,0 +1,156 @@
+"""Verified-token cache and a fast HS256 verifier.
+
+The same access tokens arrive on request after request, and each one used to
+pay for a full `jose.jwt.decode`. `TokenCache` remembers the decoded payload
+of a verified token until shortly before its `exp`, and remembers rejected
+tokens for a short while, both keyed by the token's SHA-256 digest so raw
+tokens are never kept in memory. A repeat token then costs one hash and one
+dictionary lookup.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Sentinel stored for rejected tokens
+REJECTED = object()
+
+HMAC_ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+class TokenCache:
+    """Bounded LRU of token digest -> payload (or rejection)"""
+
+    def __init__(self, maxsize: int = 4096, negative_ttl: float = 30,
+                 expiry_margin: float = 5):
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self.expiry_margin = expiry_margin
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def lookup(self, key: bytes):
+        """Return the cached payload, REJECTED, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, valid_until = entry
+            if valid_until <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if value is REJECTED:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return value
+
+    def store(self, key: bytes, payload: Optional[dict]) -> None:
+        """Cache a verified payload, or a rejection when payload is None"""
+        now = time.time()
+        if payload is None:
+            value, valid_until = REJECTED, now + self.negative_ttl
+        else:
+            exp = payload.get("exp")
+            if not isinstance(exp, (int, float)):
+                return  # never expires: always verify it in full
+            value, valid_until = payload, exp - self.expiry_margin
+        if valid_until <= now or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, valid_until)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4)
+            if lookups else 0.0,
+        }
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def decode_hmac(token: str, secret: str, algorithm: str) -> dict:
+    """Verify an HS256/384/512 JWT with the standard library.
+
+    Checks the header algorithm, the signature (constant-time) and the exp
+    and nbf claims, which is everything jose checks for the tokens this app
+    issues, without jose's generic key and claim handling.
+    """
+    digest = HMAC_ALGORITHMS.get(algorithm)
+    if digest is None:
+        raise InvalidToken(f"Unsupported algorithm for the hmac backend: {algorithm}")
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        signature = _b64decode(signature_b64)
+        payload_bytes = _b64decode(payload_b64)
+    except (ValueError, TypeError) as e:
+        raise InvalidToken(f"Malformed token - {e}")
+    if not isinstance(header, dict) or header.get("alg") != algorithm:
+        raise InvalidToken("The specified alg value is not allowed")
+    expected = hmac.new(
+        secret.encode(), f"{header_b64}.{payload_b64}".encode(), digest).digest()
+    if not hmac.compare_digest(expected, signature):
+        raise InvalidToken("Signature verification failed")
+    try:
+        payload = orjson.loads(payload_bytes) if orjson else json.loads(payload_bytes)
+    except ValueError as e:
+        raise InvalidToken(f"Invalid payload - {e}")
+    if not isinstance(payload, dict):
+        raise InvalidToken("Invalid payload")
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None and (not isinstance(exp, (int, float)) or exp <= now):
+        raise InvalidToken("Signature has expired")
+    nbf = payload.get("nbf")
+    if nbf is not None and (not isinstance(nbf, (int, float)) or nbf > now):
+        raise InvalidToken("The token is not yet valid (nbf)")
+    return payload
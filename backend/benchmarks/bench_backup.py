@@ -0,0 +1,151 @@
+"""Request latency while an online backup runs, and backup throughput.
+
+    python benchmarks/bench_backup.py [--rows 500000] [--seconds 10] [--clients 4]
+
+Fills a WAL database with `--rows` seeds, then runs `--clients` threads
+that each loop over a mixed workload: 4 lookups on the reader engine per
+purchase on the writer engine, as the seeds routers would issue. It reports
+p50/p99/max latency and ops/s for three phases: no backup, back-to-back
+stepped backups (the BACKUP_* defaults), and back-to-back single-step
+backups that copy the whole file in one call. It also reports backup
+throughput for the stepped and single-step phases.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import Base, create_engines  # noqa: E402
+from app.models.seed import Seed  # noqa: E402
+from app.services.backups import create_backup  # noqa: E402
+from app.services.catalog import CatalogError, CatalogService  # noqa: E402
+from app.services.facets import rebuild_facets  # noqa: E402
+from app.services.lots import backfill_lots  # noqa: E402
+
+CATEGORIES = ["Flower", "Herb", "Vegetable", "Fruit", "Tree", "Spice"]
+
+
+def prepare(writer, rows):
+    Base.metadata.create_all(bind=writer)
+    rng = random.Random(1)
+    with writer.begin() as conn:
+        for start in range(0, rows, 50000):
+            conn.execute(Seed.__table__.insert(), [
+                {"name": f"Seed {i} " + "x" * rng.randrange(20, 80),
+                 "category": rng.choice(CATEGORIES),
+                 "price": round(rng.uniform(1, 100), 2), "quantity": 10**6}
+                for i in range(start, min(start + 50000, rows))])
+        backfill_lots(conn)
+    Session = sessionmaker(bind=writer, expire_on_commit=False)
+    db = Session()
+    rebuild_facets(db)
+    db.commit()
+    db.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_phase(Session, ReadSession, rows, seconds, clients, backups=None):
+    latencies = []
+    stop = threading.Event()
+    backup_stats = []
+
+    def client(n):
+        rng = random.Random(n)
+        read_db, write_db = ReadSession(), Session()
+        reader, writer = CatalogService(read_db), CatalogService(write_db)
+        mine = []
+        while not stop.is_set():
+            seed_id = rng.randrange(1, rows + 1)
+            started = time.perf_counter()
+            if rng.random() < 0.2:
+                try:
+                    writer.purchase(seed_id)
+                except CatalogError:
+                    pass
+            else:
+                reader.get(seed_id)
+                read_db.rollback()
+            mine.append(time.perf_counter() - started)
+        read_db.close()
+        write_db.close()
+        latencies.extend(mine)
+
+    def backup_loop():
+        while not stop.is_set():
+            backup_stats.append(backups())
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    if backups:
+        threads.append(threading.Thread(target=backup_loop))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, backup_stats
+
+
+def report(label, latencies, seconds, backup_stats):
+    ms = [value * 1000 for value in latencies]
+    line = (f"{label:<20} {len(ms) / seconds:8.0f} ops/s  p50 {percentile(ms, 0.5):6.2f} ms"
+            f"  p99 {percentile(ms, 0.99):7.2f} ms  max {max(ms):8.2f} ms")
+    if backup_stats:
+        rate = sum(s["copy_mb_per_s"] for s in backup_stats) / len(backup_stats)
+        longest = max(s["longest_step_ms"] for s in backup_stats)
+        line += (f"  | {len(backup_stats)} backups, {rate:.0f} MB/s copy,"
+                 f" longest step {longest:.1f} ms")
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        writer, reader = create_engines(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        prepare(writer, args.rows)
+        size = os.path.getsize(os.path.join(workdir, "bench.db"))
+        print(f"database: {args.rows} seeds, {size / 1e6:.0f} MB")
+        Session = sessionmaker(bind=writer, expire_on_commit=False)
+        ReadSession = sessionmaker(bind=reader)
+        backup_dir = os.path.join(workdir, "backups")
+
+        def stepped():
+            return create_backup(writer, backup_dir)
+
+        def single_step():
+            pages, pause = settings.BACKUP_STEP_PAGES, settings.BACKUP_STEP_SLEEP_SECONDS
+            settings.BACKUP_STEP_PAGES, settings.BACKUP_STEP_SLEEP_SECONDS = -1, 0
+            try:
+                return create_backup(writer, backup_dir)
+            finally:
+                settings.BACKUP_STEP_PAGES, settings.BACKUP_STEP_SLEEP_SECONDS = pages, pause
+
+        for label, backups in (("no backup", None), ("stepped backup", stepped),
+                               ("single-step backup", single_step)):
+            latencies, stats = run_phase(Session, ReadSession, args.rows, args.seconds,
+                                         args.clients, backups)
+            report(label, latencies, args.seconds, stats)
+        writer.dispose()
+        reader.dispose()
+
+
+if __name__ == "__main__":
+    main()
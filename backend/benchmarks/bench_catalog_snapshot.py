@@ -0,0 +1,89 @@
+"""Interactive catalog queries: SQL vs the in-memory columnar snapshot.
+
+    python benchmarks/bench_catalog_snapshot.py [--seeds 1000000] [--repeat 5]
+
+Builds a catalog in a temporary SQLite file, then times the same
+filter/sort/facet queries through `CatalogService.query` and through
+`CatalogSnapshot.query`, and checks both return the same page and facets.
+The snapshot's first load is reported separately.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, create_engines  # noqa: E402
+from app.models.seed import Seed  # noqa: E402
+from app.services.catalog import CatalogService  # noqa: E402
+from app.services.catalog_snapshot import CatalogSnapshot  # noqa: E402
+
+CATEGORIES = ["Flower", "Herb", "Vegetable", "Fruit", "Tree", "Grass", "Succulent", "Shrub"]
+
+QUERIES = {
+    "unfiltered, by id": {},
+    "category, by -price": {"categories": ["Herb", "Fruit"], "sort": "-price"},
+    "price range, by price": {"min_price": 10, "max_price": 20, "sort": "price"},
+    "in stock, by -quantity": {"in_stock": True, "sort": "-quantity"},
+    "category + stock, by name": {"categories": ["Tree"], "in_stock": True, "sort": "name"},
+    "name contains, page 3": {"q": "seed 12", "offset": 100},
+}
+
+
+def prepare(engine, seeds):
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, seeds, 50000):
+            conn.execute(insert(Seed), [
+                {"name": f"Seed {i}", "category": rng.choice(CATEGORIES),
+                 "price": round(rng.uniform(1, 50), 2), "quantity": rng.randint(0, 40),
+                 "created_at": now, "updated_at": now}
+                for i in range(start, min(start + 50000, seeds))])
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seeds", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine, _ = create_engines(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        prepare(engine, args.seeds)
+        db = sessionmaker(bind=engine)()
+        catalog = CatalogService(db)
+        snapshot = CatalogSnapshot()
+
+        load_ms, _ = timed(lambda: snapshot.ensure_current(catalog), 1)
+        print(f"{args.seeds} seeds, snapshot load {load_ms:.0f} ms")
+        for label, params in QUERIES.items():
+            sql_ms, expected = timed(lambda: catalog.query(**params), args.repeat)
+            snap_ms, actual = timed(lambda: snapshot.query(catalog, **params), args.repeat)
+            assert actual == expected, label
+            print(f"{label:<26}: sql {sql_ms:8.1f} ms   snapshot {snap_ms:7.1f} ms"
+                  f"   ({sql_ms / snap_ms:5.1f}x)")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
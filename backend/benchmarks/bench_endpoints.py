@@ -0,0 +1,82 @@
+"""Requests/s through the full stack for the main catalog endpoints.
+
+    python benchmarks/bench_endpoints.py [--requests 500] [--seeds 200]
+
+Runs the app in-process with TestClient against a throwaway SQLite file, so
+numbers include routing, auth, the database and serialization.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+WORKDIR = tempfile.mkdtemp(prefix="seed-bench-")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ["STARTUP_LOCK_PATH"] = f"{WORKDIR}/startup.lock"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.seed import Seed  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+
+
+def setup_data(seed_count):
+    db = SessionLocal()
+    try:
+        admin = User(email="bench@example.com", password_hash="x", role="admin")
+        db.add(admin)
+        db.add_all(
+            Seed(name=f"Bench Seed {i}", category=f"Category {i % 10}",
+                 price=1 + i % 40, quantity=1_000_000)
+            for i in range(seed_count)
+        )
+        db.commit()
+        seed_id = db.query(Seed.id).filter(Seed.name == "Bench Seed 0").scalar()
+        return create_access_token({"sub": admin.id, "role": "admin"}), seed_id
+    finally:
+        db.close()
+
+
+def measure(label, count, fn):
+    started = time.perf_counter()
+    for i in range(count):
+        response = fn(i)
+        assert response.status_code < 300, response.text
+    seconds = time.perf_counter() - started
+    print(f"{label:<28} {count / seconds:9.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--seeds", type=int, default=200)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        token, seed_id = setup_data(args.seeds)
+        headers = {"Authorization": f"Bearer {token}"}
+        n = args.requests
+        measure("GET /api/seeds", n,
+                lambda i: client.get("/api/seeds", headers=headers))
+        measure("GET /api/seeds/search", n,
+                lambda i: client.get("/api/seeds/search?category=Category 3",
+                                     headers=headers))
+        measure("GET /api/seeds/{id}", n,
+                lambda i: client.get(f"/api/seeds/{seed_id}", headers=headers))
+        measure("PUT /api/seeds/{id}", n,
+                lambda i: client.put(f"/api/seeds/{seed_id}",
+                                     json={"price": 1 + i % 7}, headers=headers))
+        measure("POST /{id}/purchase", n,
+                lambda i: client.post(f"/api/seeds/{seed_id}/purchase",
+                                      headers=headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Demand forecast over a whole catalog: vectorized against a per-seed loop.
+
+    python benchmarks/bench_forecast.py [--seeds 100000] [--days 730] [--loop-seeds 2000]
+
+Builds a synthetic seeds x days sales matrix (Poisson demand with a yearly
+cycle and a share of seeds that never sell). It times `forecast` over the
+whole matrix in FORECAST_CHUNK_SEEDS blocks, as the forecast job runs it. It
+also times the same maths for `--loop-seeds` seeds one at a time, as a
+Python loop over seeds would do it, and extrapolates to the full catalog.
+Database load and write times are reported by the job itself
+(GET /api/analytics/reorder-suggestions, last_run).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+
+from app.config import settings  # noqa: E402
+from app.services.forecast import forecast  # noqa: E402
+
+
+def synthetic_sales(seeds, days, rng):
+    base = rng.gamma(0.6, 2.0, seeds).astype(np.float32)
+    base[rng.random(seeds) < 0.2] = 0  # never sold
+    cycle = 1 + 0.5 * np.sin(np.arange(days, dtype=np.float32) * (2 * np.pi / 365))
+    return rng.poisson(np.outer(base, cycle)).astype(np.float32)
+
+
+def run(sales, on_hand, chunk):
+    results = []
+    for start in range(0, len(sales), chunk):
+        results.append(forecast(sales[start:start + chunk], on_hand[start:start + chunk],
+                                settings.FORECAST_HALF_LIFE_DAYS,
+                                settings.FORECAST_LEAD_TIME_DAYS,
+                                settings.FORECAST_COVER_DAYS, settings.FORECAST_SERVICE_Z))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seeds", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--loop-seeds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    started = time.perf_counter()
+    sales = synthetic_sales(args.seeds, args.days, rng)
+    on_hand = rng.integers(0, 200, args.seeds)
+    print(f"{args.seeds} seeds x {args.days} days ({sales.nbytes / 1e6:.0f} MB float32), "
+          f"generated in {time.perf_counter() - started:.1f} s")
+
+    started = time.perf_counter()
+    results = run(sales, on_hand, settings.FORECAST_CHUNK_SEEDS)
+    vectorized = time.perf_counter() - started
+    suggested = sum(int(np.count_nonzero(r["suggested_quantity"])) for r in results)
+    print(f"vectorized : {vectorized * 1000:8.0f} ms   "
+          f"({suggested} seeds due a reorder)")
+
+    count = min(args.loop_seeds, args.seeds)
+    started = time.perf_counter()
+    looped = run(sales[:count], on_hand[:count], 1)
+    per_seed = (time.perf_counter() - started) / count
+    expected = run(sales[:count], on_hand[:count], count)[0]
+    assert all(np.allclose(np.concatenate([r[key] for r in looped]), expected[key],
+                           equal_nan=True) for key in expected)
+    print(f"per-seed   : {per_seed * args.seeds * 1000:8.0f} ms   "
+          f"(extrapolated from {count} seeds, {per_seed * args.seeds / vectorized:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
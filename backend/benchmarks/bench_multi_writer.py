@@ -0,0 +1,90 @@
+"""Purchase throughput with many concurrent writers, SQLite vs PostgreSQL.
+
+    python benchmarks/bench_multi_writer.py [--purchases 4000]
+        [--postgres-url postgresql+psycopg://postgres@localhost/seed_shop_bench]
+
+Each writer thread opens its own session and commits one purchase at a time
+through CatalogService, the way concurrent requests do. SQLite goes through
+the app's single-writer engine, so every purchase queues behind the one
+connection. PostgreSQL uses the tuned pool, and writers only wait on each
+other when they buy the same SKU. The PostgreSQL run is skipped without
+--postgres-url; its tables are dropped afterwards.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, create_engines  # noqa: E402
+from app.models.seed import Seed  # noqa: E402
+from app.services.catalog import CatalogService  # noqa: E402
+
+SKUS = 200
+WRITERS = (1, 4, 16, 32)
+
+
+def prepare(engine):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    db = Session()
+    db.add_all(Seed(name=f"Seed {i}", category="Bench", price=1.0, quantity=10**9)
+               for i in range(SKUS))
+    db.commit()
+    ids = [row[0] for row in db.query(Seed.id).all()]
+    db.close()
+    return Session, ids
+
+
+def run(Session, ids, purchases, writers):
+    def writer(n):
+        db = Session()
+        catalog = CatalogService(db)
+        try:
+            for i in range(n, purchases, writers):
+                catalog.purchase(ids[i % len(ids)])
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(writer, range(writers)))
+    return purchases / (time.perf_counter() - started)
+
+
+def bench(label, url, purchases):
+    engine, _ = create_engines(url)
+    try:
+        Session, ids = prepare(engine)
+        for writers in WRITERS:
+            rate = run(Session, ids, purchases, writers)
+            print(f"{label:<10} writers={writers:<3}: {rate:9.0f} purchases/s")
+        if engine.dialect.name == "postgresql":
+            Base.metadata.drop_all(bind=engine)
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--purchases", type=int, default=4000)
+    parser.add_argument("--postgres-url", default=os.environ.get("BENCH_POSTGRES_URL"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bench("sqlite", f"sqlite:///{os.path.join(workdir, 'bench.db')}", args.purchases)
+    if args.postgres_url:
+        bench("postgresql", args.postgres_url, args.purchases)
+    else:
+        print("postgresql: skipped (pass --postgres-url)")
+
+
+if __name__ == "__main__":
+    main()
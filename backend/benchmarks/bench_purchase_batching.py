@@ -0,0 +1,85 @@
+"""Purchase write throughput with and without group commit.
+
+    python benchmarks/bench_purchase_batching.py [--purchases 2000]
+
+Uses a file-backed SQLite database with synchronous=FULL so every commit is
+a real fsync. "unbatched" commits each purchase on its own, like the
+default purchase endpoint. The batched runs push the same purchases through
+PurchaseBatcher with increasing maximum batch sizes, all issued concurrently
+as they would be by many cashiers at once.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models.seed import Seed  # noqa: E402
+from app.services.catalog import CatalogService  # noqa: E402
+from app.services.purchase_queue import PurchaseBatcher  # noqa: E402
+
+SKUS = 50
+
+
+def make_session_factory(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _full_sync(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA synchronous=FULL")
+
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add_all(Seed(name=f"Seed {i}", category="Bench", price=1.0, quantity=10**9)
+               for i in range(SKUS))
+    db.commit()
+    ids = [row[0] for row in db.query(Seed.id).all()]
+    db.close()
+    return Session, ids
+
+
+def unbatched(Session, ids, purchases):
+    db = Session()
+    started = time.perf_counter()
+    catalog = CatalogService(db)
+    for i in range(purchases):
+        catalog.purchase(ids[i % len(ids)])
+    seconds = time.perf_counter() - started
+    db.close()
+    return purchases / seconds
+
+
+async def batched(Session, ids, purchases, max_batch):
+    batcher = PurchaseBatcher(Session, window_ms=2, max_batch=max_batch)
+    started = time.perf_counter()
+    await asyncio.gather(*(batcher.submit(ids[i % len(ids)]) for i in range(purchases)))
+    seconds = time.perf_counter() - started
+    await batcher.stop()
+    return purchases / seconds, batcher.average_batch_size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--purchases", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        Session, ids = make_session_factory(os.path.join(workdir, "bench.db"))
+        rate = unbatched(Session, ids, args.purchases)
+        print(f"unbatched              : {rate:9.0f} purchases/s")
+        for max_batch in (1, 8, 32, 128, 512):
+            rate, avg = asyncio.run(batched(Session, ids, args.purchases, max_batch))
+            print(f"batched max={max_batch:<4} avg={avg:6.1f}: {rate:9.0f} purchases/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Rows/s serialized by the seed list endpoints, before and after the fast path.
+
+    python benchmarks/bench_serialization.py [--rows 20000]
+
+"before" is what FastAPI did for response_model=List[SeedResponse]: load ORM
+objects, validate them into SeedResponse models and dump to JSON. "after" is
+the SeedListResponse path: select column tuples and dump them directly.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models.seed import Seed  # noqa: E402
+from app.services.catalog import SEED_ROW_COLUMNS  # noqa: E402
+from app.schemas.seed import SeedResponse  # noqa: E402
+from app.utils.serialization import dump_seed_rows  # noqa: E402
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add_all(
+        Seed(name=f"Seed {i}", category=f"Category {i % 20}", price=1 + i % 50,
+             quantity=i % 100, image="data:image/svg+xml,placeholder")
+        for i in range(args.rows)
+    )
+    db.commit()
+
+    response_adapter = TypeAdapter(List[SeedResponse])
+
+    def before():
+        db.expunge_all()
+        seeds = db.query(Seed).all()
+        models = response_adapter.validate_python(seeds, from_attributes=True)
+        return response_adapter.dump_json(models)
+
+    def after():
+        rows = db.execute(select(*SEED_ROW_COLUMNS)).all()
+        return dump_seed_rows(rows)
+
+    for label, fn in (("before (ORM + response_model)", before),
+                      ("after  (tuples + SeedListResponse)", after)):
+        seconds = best_of(fn, args.repeat)
+        print(f"{label}: {args.rows / seconds:12,.0f} rows/s "
+              f"({seconds * 1000:.1f} ms for {args.rows} rows)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Store-opening burst: many clients load the same catalog at once.
+
+    python benchmarks/bench_single_flight.py [--clients 100] [--bursts 10] [--seeds 2000]
+
+Fires bursts of concurrent identical GET /api/seeds and category searches
+through the ASGI app, with single-flight coalescing and with every request
+running its own query, and reports requests/s and how many requests
+shared another's query.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+WORKDIR = tempfile.mkdtemp(prefix="seed-bench-")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ["STARTUP_LOCK_PATH"] = f"{WORKDIR}/startup.lock"
+
+import httpx  # noqa: E402
+
+from app.database import SessionLocal  # noqa: E402
+from app.main import app, lifespan  # noqa: E402
+from app.models.seed import Seed  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import catalog as catalog_module  # noqa: E402
+from app.services.single_flight import SingleFlight  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+
+
+class NoCoalescing(SingleFlight):
+    """Same threading, no sharing: every request runs its own query"""
+
+    async def do(self, key, fn):
+        self.flights += 1
+        return await asyncio.to_thread(fn)
+
+
+def setup_data(seed_count):
+    db = SessionLocal()
+    try:
+        user = User(email="bench@example.com", password_hash="x", role="user")
+        db.add(user)
+        db.add_all(
+            Seed(name=f"Bench Seed {i}", category=f"Category {i % 10}",
+                 price=1 + i % 40, quantity=1_000)
+            for i in range(seed_count)
+        )
+        db.commit()
+        return create_access_token({"sub": user.id, "role": "user"})
+    finally:
+        db.close()
+
+
+async def burst_rate(client, headers, clients, bursts):
+    paths = ["/api/seeds", "/api/seeds/search?category=Category 3"]
+    started = time.perf_counter()
+    for _ in range(bursts):
+        responses = await asyncio.gather(*(
+            client.get(paths[i % 2], headers=headers) for i in range(clients)))
+        assert all(r.status_code == 200 for r in responses)
+    return clients * bursts / (time.perf_counter() - started)
+
+
+async def main(args):
+    async with lifespan(app):
+        headers = {"Authorization": f"Bearer {setup_data(args.seeds)}"}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for label, flights in (("per-request queries", NoCoalescing()),
+                                   ("single-flight", SingleFlight())):
+                catalog_module.catalog_flights = flights
+                with contextlib.redirect_stdout(io.StringIO()):  # auth logging
+                    rate = await burst_rate(client, headers, args.clients, args.bursts)
+                stats = flights.stats()
+                print(f"{label:<20}: {rate:8.1f} req/s, {stats['flights']:5d} queries, "
+                      f"{stats['coalesced']:5d} coalesced")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--bursts", type=int, default=10)
+    parser.add_argument("--seeds", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,62 @@
+"""Measure cold start: process launch to the first served request.
+
+    python benchmarks/bench_startup.py [--runs 10]
+
+Every run is a fresh interpreter that imports the app, runs the lifespan
+startup and serves GET /health. The first run boots against an empty
+database; the remaining runs are restarts against the populated one, which
+is the case autoscaling and redeploys hit.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import time
+started = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+with TestClient(app) as client:
+    assert client.get("/health").status_code == 200
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def run_once(env):
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    in_process_ms = float(out.stdout.strip().splitlines()[-1])
+    return wall_ms, in_process_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ)
+        env.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+        env["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+        env["STARTUP_LOCK_PATH"] = f"{workdir}/startup.lock"
+
+        first_wall, first_app = run_once(env)
+        restarts = [run_once(env) for _ in range(args.runs)]
+
+    print(f"first boot : {first_wall:7.1f} ms wall, {first_app:7.1f} ms import+startup+request")
+    print(f"restart p50: {statistics.median(w for w, _ in restarts):7.1f} ms wall, "
+          f"{statistics.median(a for _, a in restarts):7.1f} ms import+startup+request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Purchase throughput as stores are added: one shared file vs a shard per store.
+
+    python benchmarks/bench_store_shards.py [--purchases 2000] [--writers 2]
+
+For 1, 2, 4 and 8 stores, starts `--writers` processes per store (the way
+app workers serve a store's requests), each committing one-unit purchases
+through StoreInventory. "shared" routes every store to one SQLite file, as
+a single global inventory table would; "sharded" gives each store its own
+file through ShardRouter. Throughput only scales while the machine has
+cores to spare for the extra writers.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+
+from app.database import ShardRouter  # noqa: E402
+from app.services.stores import StoreInventory  # noqa: E402
+
+SKUS = 200
+STORE_COUNTS = (1, 2, 4, 8)
+
+
+def prepare(router, shard_ids):
+    for shard_id in shard_ids:
+        inventory = StoreInventory(shard_id, router.session(shard_id))
+        for seed_id in range(1, SKUS + 1):
+            inventory.restock(seed_id, 10**9)
+        inventory.db.close()
+
+
+def writer(shard_dir, shard_id, purchases, start):
+    router = ShardRouter([shard_id], shard_dir)
+    inventory = StoreInventory(shard_id, router.session(shard_id))
+    rng = random.Random(os.getpid())
+    start.wait()
+    for _ in range(purchases):
+        inventory.purchase(rng.randint(1, SKUS))
+    inventory.db.close()
+    router.dispose()
+
+
+def run(stores, writers, purchases, sharded):
+    with tempfile.TemporaryDirectory() as shard_dir:
+        shard_ids = [f"s{i}" for i in range(stores)] if sharded else ["shared"]
+        router = ShardRouter(shard_ids, shard_dir)
+        prepare(router, shard_ids)
+        router.dispose()
+
+        start = multiprocessing.Event()
+        processes = [
+            multiprocessing.Process(target=writer, args=(
+                shard_dir, shard_ids[store % len(shard_ids)], purchases, start))
+            for store in range(stores) for _ in range(writers)]
+        for process in processes:
+            process.start()
+        time.sleep(0.5)  # let every writer open its shard
+        started = time.perf_counter()
+        start.set()
+        for process in processes:
+            process.join()
+        return stores * writers * purchases / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--purchases", type=int, default=2000,
+                        help="purchases per writer process")
+    parser.add_argument("--writers", type=int, default=2, help="writer processes per store")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.writers} writers per store")
+    for stores in STORE_COUNTS:
+        shared = run(stores, args.writers, args.purchases, sharded=False)
+        sharded = run(stores, args.writers, args.purchases, sharded=True)
+        print(f"stores={stores:<2}: shared file {shared:8.0f} purchases/s"
+              f"   sharded {sharded:8.0f} purchases/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Per-request cost of access token verification.
+
+    python benchmarks/bench_token_verify.py [--tokens 2000] [--rounds 5]
+
+Verifies the same set of tokens repeatedly, as a steady stream of returning
+users would present them: with jose and the stdlib hmac backend uncached,
+then through verify_token, once cold (every lookup misses) and again warm
+(every lookup is served from the token cache).
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key")
+
+from jose import jwt  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.utils.auth import create_access_token, token_cache, verify_token  # noqa: E402
+from app.utils.token_cache import decode_hmac  # noqa: E402
+
+
+def per_call(fn, tokens, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            fn(token)
+    return (time.perf_counter() - started) / (rounds * len(tokens)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    tokens = [create_access_token({"sub": str(i), "role": "user"})
+              for i in range(args.tokens)]
+    key, alg = settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM
+
+    jose_us = per_call(lambda t: jwt.decode(t, key, algorithms=[alg]), tokens, args.rounds)
+    hmac_us = per_call(lambda t: decode_hmac(t, key, alg), tokens, args.rounds)
+    token_cache.clear()
+    with contextlib.redirect_stdout(io.StringIO()):  # verify_token logs misses
+        miss_us = per_call(verify_token, tokens, 1)
+        cached_us = per_call(verify_token, tokens, args.rounds)
+
+    print(f"jose.jwt.decode       : {jose_us:7.2f} us/token")
+    print(f"hmac backend          : {hmac_us:7.2f} us/token")
+    print(f"verify_token (miss)   : {miss_us:7.2f} us/token")
+    print(f"verify_token (hit)    : {cached_us:7.2f} us/token")
+
+
+if __name__ == "__main__":
+    main()
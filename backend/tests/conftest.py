@@ -1,27 +1,43 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from app.database import Base, get_read_db, get_write_db
 from app.main import app
 from app.models.user import User
 from app.models.seed import Seed
+from app.services import audit
+from app.services.pricing import pricing_engine
 from app.utils.auth import get_password_hash, create_access_token
 from datetime import timedelta
 from app.config import settings
 
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={
-                       "check_same_thread": False})
+# Create test database. Set TEST_DATABASE_URL to run the suite against
+# another server, e.g. postgresql+psycopg://postgres@localhost/seed_shop_test
+SQLALCHEMY_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False}
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {})
 TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine)
 
 
+requires_postgres = pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="set TEST_DATABASE_URL to a PostgreSQL database")
+
+requires_sqlite = pytest.mark.skipif(
+    engine.dialect.name != "sqlite", reason="SQLite-specific behaviour")
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test"""
     Base.metadata.create_all(bind=engine)
+    # Compiled for the previous test's rules, at counter values that repeat
+    pricing_engine.reset()
     db = TestingSessionLocal()
     try:
         yield db
@@ -39,8 +55,12 @@ def client(db_session):
         finally:
             pass
 
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_write_db] = override_get_db
     with TestClient(app) as test_client:
+        if audit.audit_log is not None:
+            # Flush audit entries into the test database
+            audit.audit_log.session_factory = TestingSessionLocal
         yield test_client
     app.dependency_overrides.clear()
 
@@ -0,0 +1,120 @@
+import json
+import pytest
+from fastapi import status
+from app.models.audit import AuditEntry
+from app.models.seed import Seed
+from app.services import audit
+from app.services.audit import AuditLog, diff
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def log(client, tmp_path, monkeypatch):
+    """An audit log that only flushes when told to"""
+    log = AuditLog(TestingSessionLocal, flush_seconds=3600, batch_size=2,
+                   spill_path=str(tmp_path / "spill.jsonl"))
+    monkeypatch.setattr(audit, "audit_log", log)
+    return log
+
+
+@pytest.fixture
+def seed(db_session):
+    seed = Seed(name="Basil", category="Herb", price=2.5, quantity=10)
+    db_session.add(seed)
+    db_session.commit()
+    return seed
+
+
+def test_diff_keeps_changed_fields_only():
+    """Test the {field: [before, after]} diff"""
+    assert diff({"price": 1.0, "name": "A"}, {"price": 2.0, "name": "A"}) == {
+        "price": [1.0, 2.0]}
+    assert diff(None, {"name": "A"}) == {"name": [None, "A"]}
+
+
+def test_mutations_are_buffered_then_flushed(client, log, seed, db_session,
+                                             test_user, user_token, admin_token):
+    """Test that routers record diffs and the actor without inserting inline"""
+    user = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    client.put(f"/api/seeds/{seed.id}", json={"price": 3.0}, headers=user)
+    client.put(f"/api/seeds/{seed.id}", json={"price": 3.0}, headers=user)  # no-op
+    client.post(f"/api/seeds/{seed.id}/restock", json={"quantity": 5}, headers=admin)
+    created = client.post("/api/seeds", json={"name": "Dill", "category": "Herb",
+                                               "price": 1.0, "quantity": 0},
+                          headers=admin).json()
+    client.delete(f"/api/seeds/{created['id']}", headers=admin)
+
+    assert log.pending() == 4
+    assert db_session.query(AuditEntry).count() == 0
+    assert log.flush() == 4
+    assert log.stats()["batches"] == 2
+
+    entries = db_session.query(AuditEntry).order_by(AuditEntry.id).all()
+    assert [e.action for e in entries] == ["update", "restock", "create", "delete"]
+    assert (entries[0].actor_id, entries[0].actor_email) == (test_user.id, test_user.email)
+    assert json.loads(entries[0].changes) == {"price": [2.5, 3.0]}
+    assert json.loads(entries[1].changes) == {"quantity": [10, 15]}
+    assert json.loads(entries[3].changes)["name"] == ["Dill", None]
+
+
+def test_failed_flush_keeps_entries_and_spills_on_shutdown(log, seed, monkeypatch):
+    """Test that entries survive a failed flush and are replayed from the spill file"""
+    log.record(None, "restock", "seed", seed.id, {"quantity": 1}, {"quantity": 2})
+    log.record(None, "restock", "seed", seed.id, {"quantity": 2}, {"quantity": 3})
+
+    def unavailable(rows):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(log, "_insert", unavailable)
+    with pytest.raises(RuntimeError):
+        log.flush()
+    assert log.pending() == 2
+    assert log.spill() == 2
+
+    monkeypatch.undo()
+    replay = AuditLog(TestingSessionLocal, spill_path=log.spill_path)
+    assert replay.replay_spill() == 2
+    assert replay.replay_spill() == 0
+    db = TestingSessionLocal()
+    changes = [json.loads(e.changes)["quantity"]
+               for e in db.query(AuditEntry).order_by(AuditEntry.id)]
+    db.close()
+    assert changes == [[1, 2], [2, 3]]
+
+
+def test_full_buffer_drops_and_counts(log, seed):
+    """Test that a full buffer sheds new entries instead of growing"""
+    log.buffer_max = 1
+    for quantity in range(3):
+        log.record(None, "restock", "seed", seed.id, {"quantity": quantity},
+                   {"quantity": quantity + 1})
+    assert log.stats()["pending"] == 1
+    assert log.stats()["dropped"] == 2
+
+
+def test_audit_endpoint_pages_newest_first(client, log, seed, test_user, user_token,
+                                           admin_token):
+    """Test the filtered, keyset-paginated query endpoint"""
+    for price in (3.0, 4.0, 5.0):
+        log.record(test_user, "update", "seed", seed.id, {"price": price - 1},
+                   {"price": price})
+    log.record(test_user, "update", "seed", seed.id + 1, {"price": 1.0}, {"price": 2.0})
+    log.flush()
+    admin = {"Authorization": f"Bearer {admin_token}"}
+
+    response = client.get("/api/audit", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    first = client.get(f"/api/audit?seed_id={seed.id}&limit=2", headers=admin).json()
+    assert [e["changes"]["price"][1] for e in first["items"]] == [5.0, 4.0]
+    rest = client.get(f"/api/audit?seed_id={seed.id}&limit=2"
+                      f"&before_id={first['next_before_id']}", headers=admin).json()
+    assert [e["changes"]["price"][1] for e in rest["items"]] == [3.0]
+    assert rest["next_before_id"] is None
+
+    everything = client.get(f"/api/audit?actor_id={test_user.id}", headers=admin).json()
+    assert len(everything["items"]) == 4
+
+    stats = client.get("/api/audit/stats", headers=admin).json()
+    assert stats["buffer"]["flushed"] == 4
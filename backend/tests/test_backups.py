@@ -0,0 +1,178 @@
+import gzip
+import sqlite3
+import threading
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base, create_engines
+from app.models.seed import Seed
+from app.services.backups import (
+    UnknownSnapshotError, create_backup, list_backups, restore_backup, rotate_backups)
+from app.services.catalog import CatalogService, ResyncRequiredError
+from app.services.jobs import run_pending
+from tests.conftest import TestingSessionLocal, requires_sqlite
+
+
+@pytest.fixture
+def live_db(tmp_path, monkeypatch):
+    """A WAL database like the app's, with a small backup step"""
+    monkeypatch.setattr(settings, "BACKUP_STEP_PAGES", 8)
+    monkeypatch.setattr(settings, "BACKUP_STEP_SLEEP_SECONDS", 0)
+    writer, reader = create_engines(f"sqlite:///{tmp_path / 'shop.db'}")
+    Base.metadata.create_all(bind=writer)
+    Session = sessionmaker(bind=writer, expire_on_commit=False)
+    db = Session()
+    db.add_all(Seed(name=f"Seed {i}", category="Bulk", price=1.0, quantity=i)
+               for i in range(2000))
+    db.commit()
+    db.close()
+    yield writer, Session, tmp_path / "backups"
+    writer.dispose()
+    reader.dispose()
+
+
+def snapshot_count(path) -> int:
+    plain = path.parent / "check.db"
+    with gzip.open(path) as source:
+        plain.write_bytes(source.read())
+    conn = sqlite3.connect(plain)
+    try:
+        assert conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+        return conn.execute("SELECT count(*) FROM seeds").fetchone()[0]
+    finally:
+        conn.close()
+        plain.unlink()
+
+
+def test_backup_completes_while_writes_commit(live_db):
+    """Test that steps pin one snapshot instead of restarting on every commit"""
+    writer, Session, directory = live_db
+    stop = threading.Event()
+    written = []
+
+    def write():
+        db = Session()
+        while not stop.is_set():
+            db.add(Seed(name="New", category="Bulk", price=1.0, quantity=1))
+            db.commit()
+            written.append(1)
+        db.close()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        stats = create_backup(writer, str(directory))
+    finally:
+        stop.set()
+        thread.join()
+    assert stats["steps"] > 1
+    assert stats["snapshot_bytes"] < stats["database_bytes"]
+    count = snapshot_count(directory / stats["name"])
+    assert 2000 <= count <= 2000 + len(written)
+
+
+def test_rotation_keeps_newest(live_db, monkeypatch):
+    """Test that only BACKUP_KEEP snapshots survive a backup"""
+    writer, _, directory = live_db
+    monkeypatch.setattr(settings, "BACKUP_KEEP", 2)
+    names = [create_backup(writer, str(directory))["name"] for _ in range(3)]
+    assert [s["name"] for s in list_backups(str(directory))] == names[:0:-1]
+    assert rotate_backups(str(directory), keep=1) == [names[1]]
+
+
+def test_restore_rewinds_and_keeps_a_safety_copy(live_db):
+    """Test restoring a snapshot through the writer connection"""
+    writer, Session, directory = live_db
+    name = create_backup(writer, str(directory))["name"]
+    db = Session()
+    db.query(Seed).delete()
+    db.commit()
+
+    result = restore_backup(writer, name, str(directory))
+    assert result["restored"] == name
+    assert snapshot_count(directory / result["safety_backup"]) == 0
+    assert db.query(Seed).count() == 2000
+    db.rollback()
+    # Still a WAL database the app can write to
+    with writer.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    db.add(Seed(name="After", category="Bulk", price=1.0, quantity=1))
+    db.commit()
+    db.close()
+
+
+def test_restore_oldest_snapshot_at_keep_limit(live_db, monkeypatch):
+    """Test that the safety copy's rotation spares the snapshot being restored"""
+    writer, Session, directory = live_db
+    monkeypatch.setattr(settings, "BACKUP_KEEP", 2)
+    oldest = create_backup(writer, str(directory))["name"]
+    db = Session()
+    db.query(Seed).delete()
+    db.commit()
+    newer = create_backup(writer, str(directory))["name"]
+
+    result = restore_backup(writer, oldest, str(directory))
+    assert db.query(Seed).count() == 2000
+    db.close()
+    # One over the limit until the next backup rotates the restored one out
+    assert [s["name"] for s in list_backups(str(directory))] == [
+        result["safety_backup"], newer, oldest]
+    assert snapshot_count(directory / oldest) == 2000
+    assert create_backup(writer, str(directory))["rotated"] == [newer, oldest]
+
+
+def test_restore_makes_older_change_cursors_resync(live_db):
+    """Test that delta sync clients cannot keep changes a restore undid"""
+    writer, Session, directory = live_db
+    name = create_backup(writer, str(directory))["name"]
+    db = Session()
+    catalog = CatalogService(db)
+    first, second = [seed.id for seed in db.query(Seed).order_by(Seed.id).limit(2)]
+    catalog.update(first, {"price": 2.0})
+    cursor = catalog.changes(None)["seq"]
+    db.close()
+
+    restore_backup(writer, name, str(directory))
+    with pytest.raises(ResyncRequiredError):
+        catalog.changes(cursor)
+    seq = catalog.changes(None)["seq"]
+    assert seq > cursor
+    # Changes after the restore are numbered past every old cursor
+    catalog.update(second, {"price": 3.0})
+    assert [s["id"] for s in catalog.changes(seq)["changed"]] == [second]
+    db.close()
+
+
+def test_restore_rejects_unknown_names(live_db):
+    """Test that restore only opens snapshot files inside the backup directory"""
+    writer, _, directory = live_db
+    create_backup(writer, str(directory))
+    for name in ("../shop.db", "seed_shop-20240101T000000Z.db.gz", "shop.db"):
+        with pytest.raises(UnknownSnapshotError):
+            restore_backup(writer, name, str(directory))
+
+
+@requires_sqlite
+def test_backup_endpoints(client, db_session, test_user, user_token, admin_token,
+                          tmp_path, monkeypatch):
+    """Test listing, queueing a backup job and restoring a missing snapshot"""
+    monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path))
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    response = client.post("/api/admin/backups",
+                           headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    response = client.post("/api/admin/backups", headers=admin)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert run_pending(TestingSessionLocal) == 1
+
+    response = client.get("/api/admin/backups", headers=admin)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data["backups"]) == 1
+    assert data["last_backup"]["name"] == data["backups"][0]["name"]
+    assert data["last_backup"]["copy_mb_per_s"] > 0
+
+    response = client.post("/api/admin/backups/nope.db/restore", headers=admin)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
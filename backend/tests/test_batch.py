@@ -0,0 +1,77 @@
+import pytest
+from fastapi import status
+from app.models.seed import Seed
+from app.services import catalog as catalog_module
+from app.services.catalog import CatalogService
+
+
+@pytest.fixture
+def seeds(db_session):
+    rows = [Seed(name=f"Batch {i}", category="Batch", price=1.0 + i, quantity=i)
+            for i in range(5)]
+    db_session.add_all(rows)
+    db_session.commit()
+    return [row.id for row in rows]
+
+
+def test_get_batch_returns_items_in_request_order(client, user_token, seeds):
+    """Test GET /batch with comma-separated ids and a missing id"""
+    wanted = [seeds[3], 9999, seeds[0], seeds[3]]
+    response = client.get(
+        "/api/seeds/batch",
+        params={"ids": ",".join(map(str, wanted))},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [seeds[3], seeds[0]]
+    assert data["items"][0]["quantity"] == 3
+    assert data["missing"] == [9999]
+
+
+def test_get_batch_accepts_repeated_ids(client, user_token, seeds):
+    """Test GET /batch?ids=1&ids=2"""
+    response = client.get(
+        f"/api/seeds/batch?ids={seeds[1]}&ids={seeds[2]}",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert [item["id"] for item in response.json()["items"]] == seeds[1:3]
+
+
+def test_get_batch_rejects_bad_ids(client, user_token):
+    """Test that non-integer ids are a validation error"""
+    response = client.get(
+        "/api/seeds/batch?ids=1,abc",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert response.status_code == 422
+
+
+def test_post_batch(client, user_token, seeds):
+    """Test the POST form used for long id lists"""
+    response = client.post(
+        "/api/seeds/batch",
+        json={"ids": seeds + [9998]},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["items"]] == seeds
+    assert response.json()["missing"] == [9998]
+
+
+def test_batch_requires_auth(client, seeds):
+    """Test that batch lookups need a token"""
+    response = client.get(f"/api/seeds/batch?ids={seeds[0]}")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_get_many_chunks_long_id_lists(db_session, seeds, monkeypatch):
+    """Test that ids are looked up in chunks and the limit is enforced"""
+    monkeypatch.setattr(catalog_module, "BATCH_CHUNK_SIZE", 2)
+    rows, missing = CatalogService(db_session).get_many(seeds + [9999])
+    assert [row[0] for row in rows] == seeds
+    assert missing == [9999]
+
+    monkeypatch.setattr(catalog_module, "MAX_BATCH_IDS", 3)
+    with pytest.raises(catalog_module.TooManyIdsError):
+        CatalogService(db_session).get_many(seeds)
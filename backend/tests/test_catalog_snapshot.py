@@ -0,0 +1,131 @@
+import random
+import pytest
+from fastapi import status
+from app.config import settings
+from sqlalchemy import update
+from app.models.meta import SequenceCounter
+from app.models.seed import Seed
+from app.services import catalog_snapshot as snapshot_module
+from app.services.catalog import CATALOG_CHANNEL, CatalogService
+from app.services.catalog_snapshot import CatalogSnapshot
+from app.services.shared_state import get_shared_state
+
+CATEGORIES = ["Flower", "Herb", "Vegetable", "Fruit"]
+
+QUERIES = [
+    {},
+    {"categories": ["flower"]},
+    {"categories": ["Herb", "Fruit"], "sort": "-price"},
+    {"min_price": 5, "max_price": 20, "sort": "price"},
+    {"in_stock": True, "sort": "-quantity", "limit": 7},
+    {"q": "seed 1", "sort": "name"},
+    {"categories": ["Vegetable"], "in_stock": True, "sort": "-name", "offset": 3, "limit": 5},
+    {"max_price": 10, "sort": "price", "limit": 3, "offset": 2},
+    # Names repeat (see the fixture), so ties fall back to id
+    {"sort": "-name", "offset": 4, "limit": 9},
+    {"q": "seed 2", "sort": "name", "limit": 5},
+]
+
+
+@pytest.fixture
+def catalog(db_session):
+    rng = random.Random(7)
+    db_session.add_all(
+        Seed(name=f"Seed {i % 100}", category=rng.choice(CATEGORIES),
+             price=rng.choice([1.0, 5.0, 9.5, 12.0, 20.0, 33.0]),
+             quantity=rng.choice([0, 0, 3, 10]))
+        for i in range(120))
+    db_session.commit()
+    return CatalogService(db_session)
+
+
+def assert_same(snapshot, catalog):
+    for params in QUERIES:
+        expected = catalog.query(**params)
+        actual = snapshot.query(catalog, **params)
+        assert actual["total"] == expected["total"], params
+        assert actual["facets"] == expected["facets"], params
+        assert [i["id"] for i in actual["items"]] == [i["id"] for i in expected["items"]], params
+        assert actual["items"] == expected["items"], params
+
+
+def test_snapshot_matches_sql(catalog):
+    """Test that the columnar snapshot answers exactly like SQL"""
+    assert_same(CatalogSnapshot(), catalog)
+
+
+def test_snapshot_applies_changes_incrementally(catalog, db_session):
+    """Test that mutations reach the snapshot through delta sync"""
+    snapshot = CatalogSnapshot()
+    snapshot.query(catalog)
+    ids = [seed.id for seed in db_session.query(Seed).order_by(Seed.id)]
+
+    catalog.purchase(next(i for i in ids if db_session.get(Seed, i).quantity > 0))
+    catalog.restock(ids[1], 5)
+    catalog.update(ids[2], {"name": "Renamed", "category": "Tree", "price": 2.0})
+    catalog.delete(ids[3])
+    catalog.create({"name": "Brand New", "category": "Flower", "price": 4.0, "quantity": 1})
+    db_session.expire_all()
+
+    loads = []
+    original = snapshot._load
+    snapshot._load = lambda c: loads.append(1) or original(c)
+    assert_same(snapshot, catalog)
+    assert loads == []  # caught up without a reload
+
+
+def test_snapshot_compacts_after_many_deletes(catalog, db_session):
+    """Test that deleted positions are reclaimed"""
+    snapshot = CatalogSnapshot()
+    snapshot.query(catalog)
+    for seed_id in [s.id for s in db_session.query(Seed).limit(100)]:
+        catalog.delete(seed_id)
+    snapshot.ensure_current(catalog)
+    snapshot._compact()
+    assert snapshot.size == snapshot.live == 20
+    assert_same(snapshot, catalog)
+
+
+def test_snapshot_reloads_after_restore(catalog, db_session, monkeypatch):
+    """Test that a restore announcement drops the snapshot, even once newer
+    changes have taken the counter past the snapshot's sequence"""
+    catalog.create({"name": "Brand New", "category": "Flower", "price": 4.0, "quantity": 1})
+    snapshot = CatalogSnapshot()
+    monkeypatch.setattr(snapshot_module, "catalog_snapshot", snapshot)
+    snapshot.query(catalog)
+    # As if the database were restored to before the create...
+    db_session.query(Seed).filter(Seed.name == "Brand New").delete()
+    db_session.execute(update(SequenceCounter).values(value=SequenceCounter.value - 1))
+    db_session.commit()
+    # ...and written to again before the next query
+    catalog.create({"name": "After Restore", "category": "Herb", "price": 1.0, "quantity": 1})
+    catalog.create({"name": "After Again", "category": "Herb", "price": 1.0, "quantity": 1})
+    get_shared_state().publish(CATALOG_CHANNEL, "restore:0")
+
+    loads = []
+    original = snapshot._load
+    snapshot._load = lambda c: loads.append(1) or original(c)
+    assert_same(snapshot, catalog)
+    assert loads == [1]
+
+
+def test_query_endpoint_with_snapshot(client, user_token, catalog, monkeypatch):
+    """Test GET /api/seeds/query on both engines"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    params = {"category": ["Flower", "Herb"], "sort": "-price", "limit": 5}
+    sql = client.get("/api/seeds/query", params=params, headers=headers)
+    assert sql.status_code == status.HTTP_200_OK
+
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT", True)
+    monkeypatch.setattr(snapshot_module, "catalog_snapshot", None)
+    columnar = client.get("/api/seeds/query", params=params, headers=headers)
+    assert columnar.status_code == status.HTTP_200_OK
+    assert columnar.json() == sql.json()
+    assert len(sql.json()["items"]) == 5
+
+
+def test_query_rejects_unknown_sort(client, user_token):
+    """Test that only known sort fields are accepted"""
+    response = client.get("/api/seeds/query?sort=image",
+                          headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 422
@@ -0,0 +1,141 @@
+import pytest
+from fastapi import status
+from sqlalchemy import update
+from app.models.meta import committed_sequence, reserve_sequence
+from app.models.seed import Seed
+from app.services.catalog import CATALOG_SEQUENCE, CatalogService
+from tests.conftest import TestingSessionLocal, requires_postgres
+
+
+def changes(client, token, since=None, **params):
+    if since is not None:
+        params["since"] = since
+    response = client.get(
+        "/api/seeds/changes",
+        params=params,
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_initial_sync_returns_whole_catalog(client, user_token, test_seed):
+    """Test that a sync without `since` returns every seed and a cursor"""
+    data = changes(client, user_token)
+    assert [s["id"] for s in data["changed"]] == [test_seed.id]
+    assert data["deleted"] == []
+    assert data["seq"] >= 0
+
+
+def test_changes_return_only_rows_touched_since(client, user_token, admin_token,
+                                               db_session, test_seed):
+    """Test that purchases, updates and restocks show up once each"""
+    other = Seed(name="Untouched", category="Sample", price=1.0, quantity=5)
+    db_session.add(other)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    cursor = changes(client, user_token)["seq"]
+
+    client.post(f"/api/seeds/{test_seed.id}/purchase", headers=headers)
+    data = changes(client, user_token, cursor)
+    assert [(s["id"], s["quantity"]) for s in data["changed"]] == [(test_seed.id, 99)]
+    cursor = data["seq"]
+
+    assert changes(client, user_token, cursor)["changed"] == []
+
+    client.put(f"/api/seeds/{test_seed.id}", json={"price": 3.0}, headers=headers)
+    client.post(f"/api/seeds/{test_seed.id}/restock", json={"quantity": 1}, headers=headers)
+    data = changes(client, user_token, cursor)
+    assert [s["id"] for s in data["changed"]] == [test_seed.id]
+    assert data["changed"][0]["quantity"] == 100
+
+
+def test_deletes_are_reported_as_tombstones(client, user_token, admin_token, test_seed):
+    """Test that a deleted seed appears in `deleted`"""
+    cursor = changes(client, user_token)["seq"]
+    client.delete(f"/api/seeds/{test_seed.id}",
+                  headers={"Authorization": f"Bearer {admin_token}"})
+    data = changes(client, user_token, cursor)
+    assert data["changed"] == []
+    assert data["deleted"] == [test_seed.id]
+
+
+def test_changes_are_paginated_in_sequence_order(client, user_token, db_session):
+    """Test that limit splits changes across calls without losing any"""
+    cursor = changes(client, user_token)["seq"]
+    catalog = CatalogService(db_session)
+    created = [catalog.create({"name": f"Seed {i}", "category": "Page",
+                               "price": 1.0, "quantity": 1}).id
+               for i in range(3)]
+    catalog.delete(created[0])
+
+    seen, deleted = [], []
+    while True:
+        data = changes(client, user_token, cursor, limit=1)
+        seen += [s["id"] for s in data["changed"]]
+        deleted += data["deleted"]
+        cursor = data["seq"]
+        if not data["has_more"]:
+            break
+
+    assert seen == created[1:]
+    assert deleted == [created[0]]
+
+
+def test_unknown_cursor_requires_resync(client, user_token, test_seed):
+    """Test that a cursor ahead of the database asks for a full sync"""
+    seq = changes(client, user_token)["seq"]
+    response = client.get("/api/seeds/changes", params={"since": seq + 100},
+                          headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_410_GONE
+
+
+def test_batched_purchases_get_distinct_sequences(db_session, test_seed):
+    """Test that purchase_many stamps each changed row"""
+    second = Seed(name="Second", category="Sample", price=1.0, quantity=5)
+    db_session.add(second)
+    db_session.commit()
+
+    CatalogService(db_session).purchase_many([test_seed.id, second.id, test_seed.id])
+
+    db_session.expire_all()
+    seqs = {test_seed.change_seq, second.change_seq}
+    assert len(seqs) == 2 and 0 not in seqs
+
+
+def test_uncommitted_sequences_are_not_committed(db_session):
+    """Test that reserved values count only once their transaction commits"""
+    before = committed_sequence(db_session, CATALOG_SEQUENCE)
+    writer = TestingSessionLocal()
+    try:
+        seqs = reserve_sequence(writer, CATALOG_SEQUENCE, 3)
+        assert seqs == list(range(seqs[0], seqs[0] + 3)) and seqs[0] > before
+        assert committed_sequence(db_session, CATALOG_SEQUENCE) == before
+        writer.commit()
+    finally:
+        writer.close()
+    assert committed_sequence(db_session, CATALOG_SEQUENCE) == seqs[-1]
+
+
+@requires_postgres
+def test_changes_hold_back_values_committed_out_of_order(db_session, test_seed):
+    """Test that a change committed before an earlier-numbered one waits for it"""
+    second = Seed(name="Second", category="Sample", price=1.0, quantity=5)
+    db_session.add(second)
+    db_session.commit()
+    catalog = CatalogService(db_session)
+    since = catalog.changes(None)["seq"]
+    slow, fast = TestingSessionLocal(), TestingSessionLocal()
+    try:
+        [early] = reserve_sequence(slow, CATALOG_SEQUENCE)
+        CatalogService(fast).update(second.id, {"price": 2.0})
+        page = catalog.changes(since)
+        assert page["changed"] == [] and page["seq"] == since
+
+        slow.execute(update(Seed).where(Seed.id == test_seed.id).values(change_seq=early))
+        slow.commit()
+        page = catalog.changes(since)
+        assert [s["id"] for s in page["changed"]] == [test_seed.id, second.id]
+    finally:
+        slow.close()
+        fast.close()
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.database import create_engines
+from tests.conftest import SQLALCHEMY_DATABASE_URL, requires_postgres
+
+
+@pytest.fixture
+def engines(tmp_path):
+    writer, reader = create_engines(f"sqlite:///{tmp_path / 'split.db'}")
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    yield writer, reader
+    reader.dispose()
+    writer.dispose()
+
+
+def test_sqlite_file_gets_separate_reader_and_writer(engines):
+    """Test that a SQLite file gets a WAL writer and a distinct reader pool"""
+    writer, reader = engines
+    assert writer is not reader
+    with writer.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+def test_reader_sees_commits_but_cannot_write(engines):
+    """Test that reader connections are read-only"""
+    writer, reader = engines
+    with writer.begin() as conn:
+        conn.execute(text("INSERT INTO items (name) VALUES ('sunflower')"))
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT name FROM items")).scalar() == "sunflower"
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO items (name) VALUES ('poppy')"))
+
+
+def test_reads_do_not_block_behind_open_write(engines):
+    """Test that a reader is not blocked by an uncommitted write transaction"""
+    writer, reader = engines
+    with writer.connect() as write_conn:
+        write_conn.execute(text("INSERT INTO items (name) VALUES ('pending')"))
+        with reader.connect() as read_conn:
+            assert read_conn.execute(text("SELECT COUNT(*) FROM items")).scalar() == 0
+        write_conn.commit()
+
+
+def test_memory_database_shares_one_engine():
+    """Test that non-file databases use one engine for both roles"""
+    writer, reader = create_engines("sqlite://")
+    assert writer is reader
+
+
+def test_postgres_engine_options(monkeypatch):
+    """Test that PostgreSQL pools are sized, pinged and time-limited"""
+    from app.database import postgres_engine_options, settings
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    options = postgres_engine_options()
+    assert options["pool_pre_ping"] is True
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["connect_args"]["options"] == "-c statement_timeout=1500"
+
+
+@requires_postgres
+def test_postgres_connections_apply_statement_timeout():
+    """Test that connections from create_engines carry statement_timeout"""
+    writer, reader = create_engines(SQLALCHEMY_DATABASE_URL)
+    try:
+        assert writer is reader
+        with writer.connect() as conn:
+            assert conn.execute(text("SHOW statement_timeout")).scalar() != "0"
+    finally:
+        writer.dispose()
@@ -0,0 +1,87 @@
+import random
+from fastapi import status
+from app.models.seed import Seed
+from app.services.catalog import CatalogService, OutOfStockError
+from app.services.facets import PRICE_BUCKETS, price_bucket, read_facets, rebuild_facets, scan_facets
+
+
+def test_price_bucket_bounds():
+    """Test that bucket lower bounds are inclusive and the last is open"""
+    assert price_bucket(0.5) == 0
+    assert price_bucket(5) == 1
+    assert price_bucket(19.99) == 2
+    assert price_bucket(1000) == len(PRICE_BUCKETS) - 1
+
+
+def test_facets_follow_every_mutation(db_session):
+    """Test that maintained facets always equal a GROUP BY over seeds"""
+    catalog = CatalogService(db_session)
+    rng = random.Random(3)
+    categories = ["Flower", "Herb", "Vegetable"]
+    ids = []
+    for i in range(30):
+        ids.append(catalog.create({
+            "name": f"Seed {i}", "category": rng.choice(categories),
+            "price": rng.choice([1.0, 4.99, 7.5, 25.0, 120.0]),
+            "quantity": rng.choice([0, 1, 2])}).id)
+    assert read_facets(db_session) == scan_facets(db_session)
+
+    for step in range(150):
+        seed_id = rng.choice(ids)
+        action = rng.choice(["purchase", "purchase", "restock", "update", "batch"])
+        if action == "purchase":
+            try:
+                catalog.purchase(seed_id)
+            except OutOfStockError:
+                pass
+        elif action == "restock":
+            catalog.restock(seed_id, rng.randint(1, 3))
+        elif action == "update":
+            catalog.update(seed_id, rng.choice([
+                {"price": rng.choice([0.5, 9.0, 60.0])},
+                {"category": rng.choice(categories + ["Tree"])},
+                {"quantity": rng.randint(0, 2)},
+                {"name": f"Renamed {step}"},
+            ]))
+        else:
+            catalog.purchase_many(rng.sample(ids, 5) + [seed_id, seed_id])
+        assert read_facets(db_session) == scan_facets(db_session), action
+
+    for seed_id in ids[:20]:
+        catalog.delete(seed_id)
+        assert read_facets(db_session) == scan_facets(db_session)
+
+
+def test_last_seed_removes_category(db_session):
+    """Test that a category disappears with its last seed"""
+    catalog = CatalogService(db_session)
+    seed = catalog.create({"name": "Lonely", "category": "Moss", "price": 3.0})
+    assert [c["category"] for c in read_facets(db_session)["categories"]] == ["Moss"]
+    catalog.update(seed.id, {"category": "Fern"})
+    assert [c["category"] for c in read_facets(db_session)["categories"]] == ["Fern"]
+    catalog.delete(seed.id)
+    assert read_facets(db_session)["categories"] == []
+
+
+def test_facets_endpoint(client, user_token, db_session):
+    """Test GET /api/seeds/facets"""
+    db_session.add_all([
+        Seed(name="A", category="Herb", price=2.0, quantity=0),
+        Seed(name="B", category="Herb", price=12.0, quantity=4),
+        Seed(name="C", category="Flower", price=6.0, quantity=1),
+    ])
+    db_session.flush()
+    rebuild_facets(db_session)
+    db_session.commit()
+
+    response = client.get("/api/seeds/facets",
+                          headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["price_buckets"] == list(PRICE_BUCKETS)
+    assert data["categories"] == [
+        {"category": "Flower", "count": 1, "in_stock": 1, "min_price": 6.0,
+         "max_price": 6.0, "histogram": [0, 1, 0, 0, 0, 0]},
+        {"category": "Herb", "count": 2, "in_stock": 1, "min_price": 2.0,
+         "max_price": 12.0, "histogram": [1, 0, 1, 0, 0, 0]},
+    ]
@@ -0,0 +1,136 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi import status
+from app.models.forecast import ReorderSuggestion, SeedDailySales
+from app.services.catalog import CatalogService
+from app.services.forecast import FORECAST_JOB, epoch_day, forecast, run_forecast
+from app.services.jobs import enqueue, run_pending
+from tests.conftest import TestingSessionLocal
+
+
+def _forecast(sales, on_hand, lead_days=7, cover_days=28):
+    return forecast(np.asarray(sales, np.float32), on_hand, half_life=14.0,
+                    lead_days=lead_days, cover_days=cover_days, z=1.65)
+
+
+def test_forecast_rates_and_reorders():
+    """Test rate, safety stock and suggestions for steady, idle and bursty seeds"""
+    days = 120
+    steady = np.full(days, 4.0)
+    bursty = np.tile([0.0, 8.0], days // 2)
+    result = _forecast([steady, np.zeros(days), bursty, steady],
+                       [10, 50, 500, 1000])
+
+    assert np.allclose(result["daily_rate"], [4, 0, 4, 4], atol=0.1)
+    assert np.allclose(result["seasonality"], 1.0)  # under a year of history
+    assert result["safety_stock"][0] == 0 and result["safety_stock"][2] > 0
+    # 10 on hand is below 7 days of demand: top up to 35 days of it
+    assert result["suggested_quantity"].tolist() == [130, 0, 0, 0]
+    assert np.isnan(result["days_of_cover"][1])
+    assert np.isclose(result["days_of_cover"][3], 250)
+
+
+def test_forecast_seasonality():
+    """Test that last year's rise over the coming weeks scales the forecast"""
+    days, horizon = 730, 35
+    sales = np.full((2, days), 2.0)
+    sales[0, days - 365:days - 365 + horizon] = 6.0  # a peak this time last year
+    result = _forecast(sales, [0, 0])
+    assert 2.5 < result["seasonality"][0] <= 3.0
+    assert np.isclose(result["seasonality"][1], 1.0)
+    assert result["forecast_daily"][0] > 5 and np.isclose(result["forecast_daily"][1], 2.0)
+    assert result["suggested_quantity"][0] > result["suggested_quantity"][1]
+
+
+def test_purchases_record_daily_sales(client, db_session, user_token):
+    """Test that purchase, purchase_many and checkout all count units sold"""
+    catalog = CatalogService(db_session)
+    a, b = (catalog.create({"name": f"Seed {i}", "category": "Herb", "price": 2.0,
+                            "quantity": 20}).id for i in range(2))
+    catalog.purchase(a)
+    catalog.purchase_many([a, b, b])
+    response = client.post("/api/orders", headers={"Authorization": f"Bearer {user_token}"},
+                           json={"items": [{"seed_id": a, "quantity": 3}]})
+    assert response.status_code == status.HTTP_201_CREATED
+
+    db_session.expire_all()
+    today = epoch_day()
+    assert {(row.seed_id, row.day): row.units
+            for row in db_session.query(SeedDailySales)} == {(a, today): 5, (b, today): 2}
+
+
+def test_reorder_suggestions_endpoint(client, db_session, user_token, admin_token):
+    """Test the forecast job and the suggestions it leaves for admins"""
+    catalog = CatalogService(db_session)
+    low, full, idle = (catalog.create({"name": name, "category": "Herb", "price": 2.0,
+                                       "quantity": quantity}).id
+                       for name, quantity in (("Low", 5), ("Full", 900), ("Idle", 5)))
+    today = epoch_day()
+    db_session.add_all(SeedDailySales(seed_id=seed_id, day=today - age, units=3)
+                       for seed_id in (low, full) for age in range(1, 61))
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert client.post("/api/analytics/forecast",
+                       headers={"Authorization": f"Bearer {user_token}"}).status_code == 403
+    assert client.post("/api/analytics/forecast", headers=headers).status_code == 202
+    assert run_pending(TestingSessionLocal) == 1
+
+    body = client.get("/api/analytics/reorder-suggestions", headers=headers).json()
+    assert body["suggested"] == 1 and body["last_run"]["seeds"] == 3
+    [item] = body["items"]
+    assert (item["seed_id"], item["name"]) == (low, "Low")
+    # Demand over the 7 + 28 days ahead, plus safety stock, less the 5 on hand
+    assert item["suggested_quantity"] == math.ceil(
+        item["forecast_daily"] * 35 + item["safety_stock"] - 5)
+    everything = client.get("/api/analytics/reorder-suggestions?all=true",
+                            headers=headers).json()["items"]
+    assert [i["seed_id"] for i in everything] == [low, full, idle]
+    assert everything[2]["days_of_cover"] is None
+
+    # Another run replaces the previous suggestions
+    catalog.delete(full)
+    enqueue(db_session, FORECAST_JOB)
+    assert run_pending(TestingSessionLocal) == 1
+    assert db_session.query(ReorderSuggestion).count() == 2
+
+
+def test_run_forecast_ignores_old_sales_and_deleted_seeds(db_session):
+    """Test the history window and sales rows whose seed is gone"""
+    catalog = CatalogService(db_session)
+    first, gone, last = (catalog.create({"name": f"Seed {i}", "category": "Herb",
+                                         "price": 2.0, "quantity": 0}).id
+                         for i in range(3))
+    at = datetime(2026, 6, 1)
+    day = epoch_day(at)
+    db_session.add_all([SeedDailySales(seed_id=first, day=day - 3000, units=50),
+                        SeedDailySales(seed_id=gone, day=day - 1, units=7),
+                        SeedDailySales(seed_id=last, day=day, units=9),
+                        SeedDailySales(seed_id=last, day=day - 1, units=1)])
+    catalog.delete(gone)
+    stats = run_forecast(db_session, at + timedelta(hours=12))
+    assert stats["seeds"] == 2
+    rates = {s.seed_id: s.daily_rate for s in db_session.query(ReorderSuggestion)}
+    assert rates[first] == 0 and 0 < rates[last] < 1
+
+
+def test_forecast_job_loads_on_reader(db_session):
+    """Test that the job reads sales on a reader and writes only the results"""
+    catalog = CatalogService(db_session)
+    seed = catalog.create({"name": "Basil", "category": "Herb", "price": 2.0,
+                           "quantity": 0}).id
+    db_session.add(SeedDailySales(seed_id=seed, day=epoch_day() - 1, units=4))
+    db_session.commit()
+    opened = []
+
+    def reader_factory():
+        opened.append(TestingSessionLocal())
+        return opened[-1]
+
+    enqueue(db_session, FORECAST_JOB)
+    assert run_pending(TestingSessionLocal, read_session_factory=reader_factory) == 1
+    assert len(opened) == 1
+    [suggestion] = db_session.query(ReorderSuggestion).all()
+    assert suggestion.seed_id == seed and suggestion.suggested_quantity > 0
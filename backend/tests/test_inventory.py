@@ -62,3 +62,39 @@ def test_restock_invalid_quantity(client, admin_token, test_seed):
         headers={"Authorization": f"Bearer {admin_token}"}
     )
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_concurrent_purchases_never_oversell(db_session, test_seed):
+    """Test that purchases from concurrent writers sell exactly the stock"""
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.catalog import CatalogService, OutOfStockError
+    from tests.conftest import TestingSessionLocal
+
+    test_seed.quantity = 10
+    db_session.commit()
+
+    def buy(_):
+        db = TestingSessionLocal()
+        try:
+            CatalogService(db).purchase(test_seed.id)
+            return True
+        except OutOfStockError:
+            return False
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        sold = sum(pool.map(buy, range(16)))
+
+    assert sold == 10
+    db_session.refresh(test_seed)
+    assert test_seed.quantity == 0
+
+
+def test_purchase_missing_seed(client, user_token):
+    """Test purchasing a seed that does not exist"""
+    response = client.post(
+        "/api/seeds/9999/purchase",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
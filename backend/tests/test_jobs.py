@@ -0,0 +1,186 @@
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import status
+from sqlalchemy import update
+from app.models.job import Job
+from app.services import jobs
+from app.services.jobs import JobRunner, enqueue, job_handler, requeue_stale, run_pending
+from tests.conftest import TestingSessionLocal
+
+calls = []
+
+
+@job_handler("test_echo")
+def echo(db, payload):
+    calls.append(payload)
+    return {"echo": payload.get("value")}
+
+
+@job_handler("test_flaky")
+def flaky(db, payload):
+    calls.append(payload)
+    if len(calls) < payload["succeed_on"]:
+        raise RuntimeError(f"attempt {len(calls)} failed")
+    return {"attempts": len(calls)}
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def load(db_session, job_id):
+    db_session.expire_all()
+    return db_session.get(Job, job_id)
+
+
+def make_due(db_session, job_id):
+    db_session.execute(update(Job).where(Job.id == job_id)
+                       .values(run_after=datetime.now(timezone.utc)))
+    db_session.commit()
+
+
+def test_job_runs_and_records_result(db_session):
+    """Test enqueue -> claim -> run -> succeeded"""
+    job = enqueue(db_session, "test_echo", {"value": 7})
+    assert job.status == "queued"
+    assert run_pending(TestingSessionLocal) == 1
+    job = load(db_session, job.id)
+    assert (job.status, job.attempts, job.result) == ("succeeded", 1, '{"echo": 7}')
+    assert job.finished_at is not None
+
+
+def test_failed_job_retries_with_backoff(db_session):
+    """Test that failures are retried after a growing delay, then succeed"""
+    job = enqueue(db_session, "test_flaky", {"succeed_on": 3})
+    run_pending(TestingSessionLocal)
+    first = load(db_session, job.id)
+    assert first.status == "queued" and first.attempts == 1
+    assert "attempt 1 failed" in first.last_error
+    assert run_pending(TestingSessionLocal) == 0  # not due yet
+
+    make_due(db_session, job.id)
+    run_pending(TestingSessionLocal)
+    assert load(db_session, job.id).attempts == 2
+    make_due(db_session, job.id)
+    run_pending(TestingSessionLocal)
+    job = load(db_session, job.id)
+    assert (job.status, job.attempts) == ("succeeded", 3)
+    assert jobs.retry_delay(2) == 2 * jobs.retry_delay(1)
+
+
+def test_job_fails_after_max_attempts(db_session):
+    """Test that a job gives up after max_attempts"""
+    job = enqueue(db_session, "test_flaky", {"succeed_on": 10}, max_attempts=2)
+    run_pending(TestingSessionLocal)
+    make_due(db_session, job.id)
+    run_pending(TestingSessionLocal)
+    job = load(db_session, job.id)
+    assert (job.status, job.attempts) == ("failed", 2)
+    assert "attempt 2 failed" in job.last_error
+
+    unknown = enqueue(db_session, "no_such_kind")
+    run_pending(TestingSessionLocal)
+    assert load(db_session, unknown.id).status == "failed"
+
+
+def test_dedupe_key_returns_existing_job(db_session):
+    """Test that a dedupe key is only queued once"""
+    first = enqueue(db_session, "test_echo", dedupe_key="once")
+    assert enqueue(db_session, "test_echo", dedupe_key="once").id == first.id
+
+
+def test_stale_running_job_is_requeued(db_session):
+    """Test that a job whose worker died runs again after its lease"""
+    job = enqueue(db_session, "test_echo", {"value": 1})
+    db_session.execute(update(Job).where(Job.id == job.id).values(
+        status="running", locked_by="dead:1:0",
+        locked_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+    db_session.commit()
+    assert requeue_stale(db_session) == 1
+    assert run_pending(TestingSessionLocal) == 1
+    assert load(db_session, job.id).status == "succeeded"
+
+
+def test_unrecordable_outcome_is_logged(db_session, monkeypatch, capsys):
+    """Test that failing to store a job's outcome is retried, then logged"""
+    job = enqueue(db_session, "test_echo", {"value": 1})
+    finish, failures = jobs._finish, []
+
+    def flaky_finish(db, job_id, **values):
+        if len(failures) < 2:
+            failures.append(values["status"])
+            raise RuntimeError("database is locked")
+        finish(db, job_id, **values)
+
+    monkeypatch.setattr(jobs, "_finish", flaky_finish)
+    assert run_pending(TestingSessionLocal) == 1  # does not raise
+    assert failures == ["succeeded", "succeeded"]
+    assert "could not record its outcome" in capsys.readouterr().out
+    # Left running for requeue_stale, and the next attempt's outcome is stored
+    assert load(db_session, job.id).status == "running"
+    db_session.execute(update(Job).where(Job.id == job.id).values(
+        locked_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+    db_session.commit()
+    assert requeue_stale(db_session) == 1
+    assert run_pending(TestingSessionLocal) == 1
+    assert load(db_session, job.id).status == "succeeded"
+
+
+def test_read_session_uses_reader_factory(db_session):
+    """Test that handlers get readers from the runner's read factory"""
+    opened = []
+
+    def reader_factory():
+        opened.append(TestingSessionLocal())
+        return opened[-1]
+
+    @job_handler("test_reads")
+    def reads(db, payload):
+        with jobs.read_session(db) as reader:
+            return {"separate": reader is not db, "jobs": reader.query(Job).count()}
+
+    job = enqueue(db_session, "test_reads")
+    assert run_pending(TestingSessionLocal, read_session_factory=reader_factory) == 1
+    assert load(db_session, job.id).result == '{"separate": true, "jobs": 1}'
+    assert len(opened) == 1
+
+
+def test_runner_threads_run_each_job_once(db_session):
+    """Test the worker pool end to end, including the drain on stop"""
+    runner = JobRunner(TestingSessionLocal, workers=3, poll_seconds=0.05)
+    runner.start()
+    try:
+        ids = [enqueue(db_session, "test_echo", {"value": i}).id for i in range(20)]
+        deadline = time.monotonic() + 10
+        while runner.succeeded < 20 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        assert runner.stop(timeout=5)
+    assert sorted(p["value"] for p in calls) == list(range(20))
+    assert {load(db_session, i).status for i in ids} == {"succeeded"}
+
+
+def test_job_endpoints(client, db_session, test_user, user_token, admin_token):
+    """Test 202 hand-off and the job status endpoints"""
+    response = client.post("/api/seeds/facets/rebuild",
+                           headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()["id"]
+    assert response.json()["status"] == "queued"
+    run_pending(TestingSessionLocal)
+
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    data = client.get(f"/api/jobs/{job_id}", headers=admin).json()
+    assert data["status"] == "succeeded" and data["result"] == {"categories": 0}
+    assert client.get(f"/api/jobs/{job_id}",
+                      headers={"Authorization": f"Bearer {user_token}"}).status_code == 404
+    own = enqueue(db_session, "test_echo", created_by=test_user.id)
+    assert client.get(f"/api/jobs/{own.id}",
+                      headers={"Authorization": f"Bearer {user_token}"}).status_code == 200
+
+    listed = client.get("/api/jobs?status=queued", headers=admin).json()
+    assert [job["id"] for job in listed] == [own.id]
+    stats = client.get("/api/jobs/stats", headers=admin).json()
+    assert stats["counts"] == {"queued": 1, "succeeded": 1}
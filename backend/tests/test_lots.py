@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+from fastapi import status
+from sqlalchemy import func, select
+from app.models.lot import SeedLot
+from app.services.catalog import CatalogService
+from app.services.lots import backfill_lots
+
+TODAY = date.today()
+
+
+def remaining(db_session, seed_id):
+    return [(lot.expires_on, lot.remaining) for lot in db_session.execute(
+        select(SeedLot).where(SeedLot.seed_id == seed_id, SeedLot.remaining > 0)
+        .order_by(SeedLot.expires_on)).scalars()]
+
+
+def lot_total(db_session, seed_id):
+    return db_session.execute(select(func.coalesce(func.sum(SeedLot.remaining), 0))
+                              .where(SeedLot.seed_id == seed_id)).scalar()
+
+
+def test_purchases_take_first_expiring_lot(db_session):
+    """Test FEFO: a later restock with an earlier expiry is sold first"""
+    catalog = CatalogService(db_session)
+    seed = catalog.create({"name": "Basil", "category": "Herb", "price": 2.0, "quantity": 2})
+    soon = TODAY + timedelta(days=10)
+    catalog.restock(seed.id, 3, expires_on=soon)
+
+    catalog.purchase(seed.id)
+    catalog.purchase(seed.id)
+    assert remaining(db_session, seed.id)[0] == (soon, 1)
+
+    results = catalog.purchase_many([seed.id, seed.id])
+    assert results[-1][4] == 1  # quantity column
+    lots = remaining(db_session, seed.id)
+    assert len(lots) == 1 and lots[0][1] == 1 and lots[0][0] > soon
+    assert lot_total(db_session, seed.id) == 1
+
+
+def test_quantity_edits_adjust_lots(db_session):
+    """Test that setting quantity adds a lot or writes off the oldest stock"""
+    catalog = CatalogService(db_session)
+    seed = catalog.create({"name": "Dill", "category": "Herb", "price": 2.0, "quantity": 5})
+    catalog.restock(seed.id, 5, expires_on=TODAY + timedelta(days=3))
+    catalog.update(seed.id, {"quantity": 6})
+    assert [lot[1] for lot in remaining(db_session, seed.id)] == [1, 5]
+    catalog.update(seed.id, {"quantity": 9})
+    assert lot_total(db_session, seed.id) == 9
+    catalog.delete(seed.id)
+    assert lot_total(db_session, seed.id) == 0
+
+
+def test_untracked_stock_is_still_sold(db_session, test_seed):
+    """Test that stock without lots sells, and backfill turns it into a lot"""
+    catalog = CatalogService(db_session)
+    assert catalog.purchase(test_seed.id)["quantity"] == 99
+    assert backfill_lots(db_session) == 1
+    db_session.commit()
+    assert lot_total(db_session, test_seed.id) == 99
+
+
+def test_restock_endpoint_records_lot(client, admin_token, test_seed):
+    """Test restocking with explicit lot dates and listing the lots"""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.post(f"/api/seeds/{test_seed.id}/restock", headers=headers, json={
+        "quantity": 4, "packed_on": "2025-01-01", "expires_on": "2026-01-01"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["quantity"] == 104
+
+    lots = client.get(f"/api/seeds/{test_seed.id}/lots", headers=headers).json()
+    assert [(lot["remaining"], lot["expires_on"]) for lot in lots] == [(4, "2026-01-01")]
+
+
+def test_restock_rejects_expiry_before_packing(client, admin_token, test_seed):
+    """Test that a lot cannot expire before it was packed"""
+    response = client.post(
+        f"/api/seeds/{test_seed.id}/restock",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"quantity": 1, "packed_on": "2025-06-01", "expires_on": "2025-05-01"})
+    assert response.status_code == 422
+
+
+def test_expiring_report(client, admin_token, user_token, test_seed, db_session):
+    """Test GET /api/seeds/lots/expiring"""
+    catalog = CatalogService(db_session)
+    catalog.restock(test_seed.id, 2, expires_on=TODAY - timedelta(days=1))
+    catalog.restock(test_seed.id, 3, expires_on=TODAY + timedelta(days=20))
+    catalog.restock(test_seed.id, 4, expires_on=TODAY + timedelta(days=90))
+    catalog.restock(test_seed.id, 1, expires_on=TODAY + timedelta(days=5))
+    catalog.purchase(test_seed.id)  # sold from the expired lot
+    catalog.update(test_seed.id, {"quantity": 108})  # writes off its last unit
+
+    response = client.get("/api/seeds/lots/expiring?days=30",
+                          headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [(lot["remaining"], lot["name"]) for lot in response.json()] == [
+        (1, "Sample Seed"), (3, "Sample Seed")]
+
+    response = client.get("/api/seeds/lots/expiring",
+                          headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
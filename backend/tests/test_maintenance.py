@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import status
+from app.models.seed import Seed
+from app.services.jobs import run_pending
+from app.services.maintenance import (
+    MaintenanceScheduler, database_stats, last_runs, run_task, task_intervals)
+from tests.conftest import TestingSessionLocal, engine, requires_sqlite
+
+
+@requires_sqlite
+def test_tasks_run_and_record_stats(db_session):
+    """Test that every task runs and its last run lands in app_meta"""
+    for name in ("analyze", "optimize", "checkpoint", "vacuum"):
+        record = run_task(db_session, name, idle=True)
+        assert record["error"] is None, record
+        assert record["duration_ms"] >= 0
+    runs = last_runs(db_session)
+    assert set(runs) == {"analyze", "optimize", "checkpoint", "vacuum"}
+    assert runs["checkpoint"]["result"]["mode"] == "TRUNCATE"
+
+
+@requires_sqlite
+def test_incremental_vacuum_returns_free_pages(db_session):
+    """Test that deleted rows' pages go back to the OS in bounded steps"""
+    assert run_task(db_session, "enable_incremental_vacuum")["error"] is None
+    assert database_stats(engine)["auto_vacuum"] == "incremental"
+    db_session.add_all(Seed(name=f"Seed {i}" + "x" * 500, category="Bulk", price=1.0,
+                            quantity=1) for i in range(2000))
+    db_session.commit()
+    db_session.query(Seed).delete()
+    db_session.commit()
+    run_task(db_session, "checkpoint", idle=True)
+    before = database_stats(engine)
+    assert before["freelist_pages"] > 0
+
+    record = run_task(db_session, "vacuum")
+    assert record["error"] is None
+    assert record["result"]["pages_freed"] > 0
+    after = database_stats(engine)
+    assert after["freelist_pages"] < before["freelist_pages"]
+
+
+def test_scheduler_waits_for_idle_unless_overdue(db_session):
+    """Test that due tasks wait for a lull until twice their interval"""
+    scheduler = MaintenanceScheduler(TestingSessionLocal)
+    # Nothing has run yet, so everything is long overdue
+    assert set(scheduler.due_tasks(idle=False)) == set(task_intervals())
+
+    for name in task_intervals():
+        run_task(db_session, name)
+    now = datetime.now(timezone.utc)
+    assert scheduler.due_tasks(idle=True, now=now) == []
+    interval = task_intervals()["checkpoint"]
+    later = now + timedelta(seconds=interval * 1.5)
+    assert scheduler.due_tasks(idle=False, now=later) == []
+    assert scheduler.due_tasks(idle=True, now=later) == ["checkpoint"]
+    much_later = now + timedelta(seconds=interval * 2.5)
+    assert scheduler.due_tasks(idle=False, now=much_later) == ["checkpoint"]
+
+
+@requires_sqlite
+def test_maintenance_endpoints(client, db_session, test_user, user_token, admin_token):
+    """Test the admin report and running a task as a job"""
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    response = client.get("/api/admin/maintenance",
+                          headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    response = client.post("/api/admin/maintenance/defrag", headers=admin)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = client.post("/api/admin/maintenance/analyze", headers=admin)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["payload"] == {"task": "analyze"}
+    assert run_pending(TestingSessionLocal) == 1
+
+    response = client.get("/api/admin/maintenance", headers=admin)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["tasks"]["analyze"]["error"] is None
+    assert data["intervals"]["checkpoint"] == task_intervals()["checkpoint"]
+    assert data["database"]["file_bytes"] > 0
+    assert data["database"]["page_count"] > 0
+    assert data["leader"] in (True, False, None)
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from app.database import init_db, get_schema_version, SCHEMA_VERSION
+from app.migrations import advisor
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE app_meta (key VARCHAR PRIMARY KEY, value VARCHAR NOT NULL)",
+    "INSERT INTO app_meta (key, value) VALUES ('schema_version', '1')",
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL, "
+    "password_hash VARCHAR NOT NULL, role VARCHAR NOT NULL, created_at DATETIME)",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    "CREATE TABLE seeds (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+    "category VARCHAR NOT NULL, price FLOAT NOT NULL, quantity INTEGER NOT NULL, "
+    "image VARCHAR, created_at DATETIME, updated_at DATETIME)",
+    "CREATE INDEX ix_seeds_name ON seeds (name)",
+    "CREATE INDEX ix_seeds_category ON seeds (category)",
+]
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database created by the original create_all, before migrations"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_upgrade_legacy_database(legacy_engine):
+    """Test that an existing database gets the new indexes"""
+    assert init_db(legacy_engine) is True
+    assert get_schema_version(legacy_engine) == SCHEMA_VERSION
+    indexes = {i["name"] for i in inspect(legacy_engine).get_indexes("seeds")}
+    assert {"ix_seeds_category_price", "ix_seeds_price"} <= indexes
+    assert "ix_seeds_category" not in indexes
+    assert "ix_seeds_change_seq" in indexes
+    with legacy_engine.connect() as conn:
+        assert conn.execute(
+            text("SELECT value FROM counters WHERE name = 'catalog'")).scalar() == 0
+    assert {"category_stats", "category_price_buckets", "audit_log"} <= set(
+        inspect(legacy_engine).get_table_names())
+    assert init_db(legacy_engine) is False
+
+
+def test_index_advisor_flags_missing_index(legacy_engine):
+    """Test that the advisor flags the price-range scan until migrated"""
+    flagged = [r.case.name for r in advisor.analyze(legacy_engine) if r.flagged]
+    assert "seeds: search by price range" in flagged
+
+    init_db(legacy_engine)
+    assert not [r for r in advisor.analyze(legacy_engine) if r.flagged]
+
+
+def test_migration_backfills_lots(legacy_engine):
+    """Test that existing stock becomes one lot per seed"""
+    with legacy_engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO seeds (name, category, price, quantity, created_at) VALUES "
+            "('A', 'Herb', 1.0, 7, '2025-03-04 10:00:00'), ('B', 'Herb', 1.0, 0, NULL)"))
+    init_db(legacy_engine)
+    with legacy_engine.connect() as conn:
+        lots = conn.execute(text(
+            "SELECT quantity, remaining, packed_on FROM seed_lots")).all()
+    assert lots == [(7, 7, "2025-03-04")]
+
+
+def test_migration_backfills_price_history(legacy_engine):
+    """Test that existing seeds get their current price as history"""
+    with legacy_engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO seeds (name, category, price, quantity, created_at) VALUES "
+            "('A', 'Herb', 1.5, 7, '2025-03-04 10:00:00')"))
+    init_db(legacy_engine)
+    with legacy_engine.connect() as conn:
+        prices = conn.execute(text(
+            "SELECT seed_id, price, effective_from FROM seed_prices")).all()
+    assert prices == [(1, 1.5, "2025-03-04 10:00:00")]
@@ -0,0 +1,126 @@
+import json
+from fastapi import status
+from app.models.job import Job
+from app.models.recommendation import RelatedSeed, SeedPair
+from app.models.seed import Seed
+from app.services import pricing
+from app.services.catalog import CatalogService
+from app.services.facets import read_facets, scan_facets
+from app.services.jobs import enqueue, run_pending
+from app.services.recommendations import REBUILD_RECOMMENDATIONS_JOB
+from tests.conftest import TestingSessionLocal
+
+
+def _seeds(db_session, count=4):
+    catalog = CatalogService(db_session)
+    return [catalog.create({"name": f"Seed {i}", "category": "Herb", "price": 2.0,
+                            "quantity": 10}).id
+            for i in range(count)]
+
+
+def _checkout(client, token, *items):
+    return client.post("/api/orders", headers={"Authorization": f"Bearer {token}"},
+                       json={"items": [{"seed_id": seed_id, "quantity": quantity}
+                                       for seed_id, quantity in items]})
+
+
+def _pairs(db_session):
+    return {(p.seed_id, p.related_id): p.orders for p in db_session.query(SeedPair)}
+
+
+def _related(db_session):
+    return [(r.seed_id, r.rank, r.related_id, r.orders)
+            for r in db_session.query(RelatedSeed).order_by(RelatedSeed.seed_id,
+                                                             RelatedSeed.rank)]
+
+
+def test_checkout_creates_order(client, db_session, user_token, admin_token):
+    """Test stock, facets, prices and that a failed checkout changes nothing"""
+    a, b, _, _ = _seeds(db_session)
+    pricing.create_rule(db_session, {"name": "5+", "seed_id": a, "percent_off": 50,
+                                     "min_quantity": 5})
+    response = _checkout(client, user_token, (a, 2), (b, 1), (a, 3))
+    assert response.status_code == status.HTTP_201_CREATED
+    order = response.json()
+    assert [(line["seed_id"], line["quantity"], line["unit_price"]) for line in order["lines"]] \
+        == [(a, 5, 1.0), (b, 1, 2.0)]
+    assert (order["total"], order["pricing_version"]) == (7.0, 1)
+
+    response = _checkout(client, user_token, (b, 1), (a, 6))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Only 5 of seed" in response.json()["detail"]
+    assert _checkout(client, user_token, (9999, 1)).status_code == 404
+
+    db_session.expire_all()
+    assert [db_session.get(Seed, i).quantity for i in (a, b)] == [5, 9]
+    assert read_facets(db_session) == scan_facets(db_session)
+
+    mine = client.get("/api/orders", headers={"Authorization": f"Bearer {user_token}"})
+    assert [o["id"] for o in mine.json()["items"]] == [order["id"]]
+    others = client.get(f"/api/orders/{order['id']}",
+                        headers={"Authorization": f"Bearer {admin_token}"})
+    assert others.json()["total"] == 7.0
+
+
+def test_related_seeds_follow_checkouts(client, db_session, user_token):
+    """Test incremental pair counts and the ranked top lists"""
+    a, b, c, d = _seeds(db_session)
+    _checkout(client, user_token, (a, 1), (b, 1))
+    _checkout(client, user_token, (a, 1), (b, 1), (c, 1))
+    _checkout(client, user_token, (a, 1), (d, 1))
+
+    assert _pairs(db_session)[(a, b)] == 2
+    headers = {"Authorization": f"Bearer {user_token}"}
+    related = client.get(f"/api/seeds/{a}/related", headers=headers).json()
+    assert [(item["id"], item["orders"]) for item in related] == [(b, 2), (c, 1), (d, 1)]
+    assert len(client.get(f"/api/seeds/{a}/related?limit=1", headers=headers).json()) == 1
+    assert client.get(f"/api/seeds/{d}/related", headers=headers).json()[0]["id"] == a
+    assert client.get("/api/seeds/9999/related", headers=headers).status_code == 404
+
+
+def test_rebuild_matches_incremental(client, db_session, user_token, admin_token,
+                                     monkeypatch):
+    """Test that the NumPy rebuild reproduces what checkouts maintained"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "RECOMMENDATIONS_TOP_K", 2)
+    ids = _seeds(db_session, 5)
+    for items in ([0, 1, 2], [0, 1], [1, 2, 3, 4], [0, 4], [2, 3]):
+        _checkout(client, user_token, *[(ids[i], 1) for i in items])
+    pairs, related = _pairs(db_session), _related(db_session)
+
+    response = client.post("/api/seeds/recommendations/rebuild",
+                           headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert run_pending(TestingSessionLocal) == 1
+    db_session.expire_all()
+    assert _pairs(db_session) == pairs
+    assert _related(db_session) == related
+
+    # The rebuild also repairs lists that drifted
+    db_session.query(RelatedSeed).delete()
+    db_session.commit()
+    enqueue(db_session, REBUILD_RECOMMENDATIONS_JOB)
+    run_pending(TestingSessionLocal)
+    db_session.expire_all()
+    assert _related(db_session) == related
+
+
+def test_rebuild_includes_orders_during_compute(client, db_session, user_token, monkeypatch):
+    """Test that checkouts committed while the rebuild computes are kept"""
+    from app.services import recommendations
+    a, b, c, _ = _seeds(db_session)
+    _checkout(client, user_token, (a, 1), (b, 1))
+    expected_before = _pairs(db_session)
+    compute = recommendations.cooccurrence
+
+    def checkout_meanwhile(order_ids, seed_ids):
+        assert _checkout(client, user_token, (a, 1), (c, 1)).status_code == 201
+        return compute(order_ids, seed_ids)
+
+    monkeypatch.setattr(recommendations, "cooccurrence", checkout_meanwhile)
+    job = enqueue(db_session, REBUILD_RECOMMENDATIONS_JOB)
+    assert run_pending(TestingSessionLocal) == 1
+    db_session.expire_all()
+    assert json.loads(db_session.get(Job, job.id).result)["orders_after_load"] == 1
+    assert _pairs(db_session) == {**expected_before, (a, c): 1, (c, a): 1}
+    assert [(r[0], r[2]) for r in _related(db_session) if r[0] == a] == [(a, b), (a, c)]
@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import status
+from app.models.price import SeedPrice
+from app.models.seed import Seed
+from app.services.catalog import CatalogService, NoPriceError
+from app.services.facets import read_facets, scan_facets
+
+
+def _seed(db_session, name, price, category="Herb"):
+    return CatalogService(db_session).create(
+        {"name": name, "category": category, "price": price, "quantity": 5})
+
+
+def _backdate(db_session, seed_id, when):
+    # Move a seed's history to a known time so as-of queries are exact
+    db_session.query(SeedPrice).filter(SeedPrice.seed_id == seed_id).update(
+        {"effective_from": when})
+    db_session.commit()
+
+
+def test_price_changes_append_history(client, db_session):
+    """Test that create, update and delete each append one history row"""
+    catalog = CatalogService(db_session)
+    seed = _seed(db_session, "Basil", 2.5)
+    catalog.update(seed.id, {"price": 3.0})
+    catalog.update(seed.id, {"quantity": 9})  # no price change, no row
+    catalog.delete(seed.id)
+
+    history = catalog.price_history(seed.id)
+    assert [row["price"] for row in history] == [None, 3.0, 2.5]
+
+
+def test_price_at_and_prices_at(client, db_session):
+    """Test as-of lookups before, between and after price changes"""
+    catalog = CatalogService(db_session)
+    basil, dill, sage = (_seed(db_session, name, price)
+                         for name, price in (("Basil", 2.0), ("Dill", 1.0), ("Sage", 4.0)))
+    _backdate(db_session, basil.id, datetime(2025, 1, 1))
+    _backdate(db_session, dill.id, datetime(2025, 1, 1))
+    _backdate(db_session, sage.id, datetime(2025, 6, 1))
+    catalog.update(basil.id, {"price": 2.5})
+    catalog.delete(dill.id)
+
+    assert catalog.price_at(basil.id, datetime(2025, 3, 1))["price"] == 2.0
+    assert catalog.price_at(basil.id, datetime.now(timezone.utc))["price"] == 2.5
+    with pytest.raises(NoPriceError):
+        catalog.price_at(basil.id, datetime(2024, 1, 1))
+
+    in_march = {row["seed_id"]: row["price"] for row in catalog.prices_at(datetime(2025, 3, 1))}
+    assert in_march == {basil.id: 2.0, dill.id: 1.0}
+    now = {row["seed_id"]: row["price"]
+           for row in catalog.prices_at(datetime.now(timezone.utc) + timedelta(seconds=1))}
+    assert now == {basil.id: 2.5, sage.id: 4.0}
+
+
+def test_reprice_endpoint(client, db_session, user_token, admin_token):
+    """Test bulk repricing: admin only, history, facets and missing ids"""
+    basil = _seed(db_session, "Basil", 2.0)
+    dill = _seed(db_session, "Dill", 1.0)
+    body = {"items": [{"seed_id": basil.id, "price": 3.0},
+                      {"seed_id": dill.id, "price": 1.0},
+                      {"seed_id": 9999, "price": 5.0}]}
+
+    response = client.post("/api/seeds/reprice", json=body,
+                           headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    response = client.post("/api/seeds/reprice", json=body,
+                           headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"updated": [basil.id], "missing": [9999]}
+
+    db_session.expire_all()
+    assert db_session.get(Seed, basil.id).price == 3.0
+    assert read_facets(db_session) == scan_facets(db_session)
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    history = client.get(f"/api/seeds/{basil.id}/prices", headers=headers).json()
+    assert [row["price"] for row in history] == [3.0, 2.0]
+    current = client.get(f"/api/seeds/{basil.id}/price", headers=headers).json()
+    assert current["price"] == 3.0
+
+
+def test_price_endpoints_errors(client, db_session, user_token):
+    """Test 404s for unknown seeds and times before the first price"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    assert client.get("/api/seeds/9999/prices", headers=headers).status_code == 404
+    seed = _seed(db_session, "Basil", 2.0)
+    response = client.get(f"/api/seeds/{seed.id}/price?at=2000-01-01T00:00:00Z",
+                          headers=headers)
+    assert response.status_code == 404
+    response = client.get("/api/seeds/prices?at=2000-01-01T00:00:00Z", headers=headers)
+    assert response.json() == []
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import status
+from app.models.audit import AuditEntry
+from app.models.pricing import PricingRule
+from app.models.seed import Seed
+from app.services import audit, pricing
+from app.services.audit import AuditLog
+from app.services.pricing import PriceBook, pricing_engine
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def seeds(db_session):
+    seeds = [Seed(name="Basil", category="Herb", price=10.0, quantity=5),
+             Seed(name="Dill", category="Herb", price=4.0, quantity=5),
+             Seed(name="Rose", category="Flower", price=8.0, quantity=5)]
+    db_session.add_all(seeds)
+    db_session.commit()
+    return seeds
+
+
+def _rule(rule_id, **fields):
+    return PricingRule(id=rule_id, **{"seed_id": None, "category": None, "percent_off": None,
+                                      "amount_off": None, "min_quantity": 1,
+                                      "starts_at": None, "ends_at": None, **fields})
+
+
+def test_price_book_picks_lowest_price():
+    """Test targets, quantity breaks, amount discounts and no stacking"""
+    book = PriceBook([_rule(1, category="herb", percent_off=10),
+                      _rule(2, seed_id=1, percent_off=20, min_quantity=5),
+                      _rule(3, amount_off=0.5)], version=1)
+    items = [(1, "Herb", 10.0, 1), (1, "Herb", 10.0, 5), (2, "Herb", 4.0, 1),
+             (3, "Flower", 8.0, 1), (3, "Flower", 0.25, 1)]
+    assert book.price_many(items) == [(9.0, 1), (8.0, 2), (3.5, 3), (7.5, 3), (0.0, 3)]
+
+
+def test_price_book_time_windows():
+    """Test that promotions switch on and off without recompiling"""
+    start, end = datetime(2030, 1, 1), datetime(2030, 2, 1)
+    book = PriceBook([_rule(1, percent_off=50, starts_at=start, ends_at=end)], version=1)
+    item = [(1, "Herb", 10.0, 1)]
+    assert book.price_many(item, at=start - timedelta(seconds=1)) == [(10.0, None)]
+    assert book.price_many(item, at=start) == [(5.0, 1)]
+    assert book.price_many(item, at=end - timedelta(seconds=1)) == [(5.0, 1)]
+    assert book.price_many(item, at=end) == [(10.0, None)]
+
+
+def test_rules_recompile_only_on_change(client, seeds, user_token, admin_token):
+    """Test rule CRUD, validation and that quotes reuse the compiled book"""
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    user = {"Authorization": f"Bearer {user_token}"}
+    cart = {"items": [{"seed_id": seeds[0].id, "quantity": 2},
+                      {"seed_id": seeds[0].id, "quantity": 3},
+                      {"seed_id": 9999}]}
+
+    response = client.post("/api/pricing/rules", json={"name": "x", "category": "Herb"},
+                           headers=admin)
+    assert response.status_code == 422
+    response = client.post("/api/pricing/rules", json={"name": "x", "percent_off": 10},
+                           headers=user)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    rule = client.post("/api/pricing/rules", json={
+        "name": "5+ basil", "seed_id": seeds[0].id, "percent_off": 20, "min_quantity": 5},
+        headers=admin).json()
+    quote = client.post("/api/pricing/quote", json=cart, headers=user).json()
+    assert quote["items"] == [{"seed_id": seeds[0].id, "name": "Basil", "quantity": 5,
+                               "list_price": 10.0, "unit_price": 8.0,
+                               "rule_id": rule["id"], "line_total": 40.0}]
+    assert (quote["missing"], quote["total"], quote["version"]) == ([9999], 40.0, 1)
+    compiles = pricing_engine.compiles
+    client.post("/api/pricing/quote", json=cart, headers=user)
+    assert pricing_engine.compiles == compiles
+
+    response = client.put(f"/api/pricing/rules/{rule['id']}", json={"min_quantity": 10},
+                          headers=admin)
+    assert response.json()["min_quantity"] == 10
+    quote = client.post("/api/pricing/quote", json=cart, headers=user).json()
+    assert (quote["total"], quote["version"]) == (50.0, 2)
+    assert pricing_engine.compiles == compiles + 1
+
+    response = client.delete(f"/api/pricing/rules/{rule['id']}", headers=admin)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.put(f"/api/pricing/rules/{rule['id']}", json={"active": False},
+                          headers=admin)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/api/pricing/rules", headers=admin).json() == []
+
+
+def test_query_page_has_effective_prices(client, seeds, db_session, user_token, tmp_path,
+                                         monkeypatch):
+    """Test that catalog pages carry effective prices and rule changes are audited"""
+    log = AuditLog(TestingSessionLocal, flush_seconds=3600,
+                   spill_path=str(tmp_path / "spill.jsonl"))
+    monkeypatch.setattr(audit, "audit_log", log)
+    pricing.create_rule(db_session, {"name": "Herb week", "category": "Herb",
+                                     "percent_off": 25}, actor=object())
+    response = client.get("/api/seeds/query?sort=id",
+                          headers={"Authorization": f"Bearer {user_token}"})
+    prices = [(item["name"], item["price"], item["effective_price"])
+              for item in response.json()["items"]]
+    assert prices == [("Basil", 10.0, 7.5), ("Dill", 4.0, 3.0), ("Rose", 8.0, 8.0)]
+
+    log.flush()
+    entry = db_session.query(AuditEntry).one()
+    assert (entry.entity, entry.action) == ("pricing_rule", "create")
@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from fastapi import status
+from app.main import app
+from app.services.catalog import CatalogService, OutOfStockError, SeedNotFoundError
+from app.services.purchase_queue import PurchaseBatcher, get_purchase_batcher
+from tests.conftest import TestingSessionLocal
+
+
+def test_purchase_many_serves_requests_in_order(db_session, test_seed):
+    """Test that a batch sells remaining stock to the earliest requests"""
+    test_seed.quantity = 2
+    db_session.commit()
+
+    outcomes = CatalogService(db_session).purchase_many(
+        [test_seed.id, 9999, test_seed.id, test_seed.id])
+
+    assert outcomes[0][4] == 0  # quantity column of the returned row
+    assert isinstance(outcomes[1], SeedNotFoundError)
+    assert outcomes[2][4] == 0
+    assert isinstance(outcomes[3], OutOfStockError)
+    db_session.refresh(test_seed)
+    assert test_seed.quantity == 0
+
+
+def test_batcher_coalesces_concurrent_purchases(db_session, test_seed):
+    """Test that concurrent purchases are applied in one transaction"""
+    test_seed.quantity = 3
+    db_session.commit()
+
+    async def run():
+        batcher = PurchaseBatcher(TestingSessionLocal, window_ms=50, max_batch=10)
+        results = await asyncio.gather(
+            *(batcher.submit(test_seed.id) for _ in range(5)),
+            return_exceptions=True)
+        await batcher.stop()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+
+    assert batcher.batches == 1
+    assert batcher.purchases == 5
+    assert sum(isinstance(r, dict) for r in results) == 3
+    assert sum(isinstance(r, OutOfStockError) for r in results) == 2
+    db_session.refresh(test_seed)
+    assert test_seed.quantity == 0
+
+
+def test_purchase_endpoint_with_batching(client, user_token, test_seed):
+    """Test the purchase endpoint when group commit is enabled"""
+    batcher = PurchaseBatcher(TestingSessionLocal, window_ms=1)
+    app.dependency_overrides[get_purchase_batcher] = lambda: batcher
+    try:
+        response = client.post(
+            f"/api/seeds/{test_seed.id}/purchase",
+            headers={"Authorization": f"Bearer {user_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["quantity"] == test_seed.quantity - 1
+
+        response = client.post(
+            "/api/seeds/9999/purchase",
+            headers={"Authorization": f"Bearer {user_token}"}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    finally:
+        # The writer task runs on the client's event loop; stop it there
+        client.portal.call(batcher.stop)
+        app.dependency_overrides.pop(get_purchase_batcher, None)
@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import status
+from app.models.refresh_token import RefreshToken
+from app.services.refresh_tokens import hash_token
+
+
+def login(client):
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "test@example.com", "password": "testpassword123"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def refresh(client, token):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def test_login_issues_hashed_refresh_token(client, db_session, test_user):
+    """Test that login returns a refresh token stored only as its digest"""
+    token = login(client)["refresh_token"]
+    row = db_session.query(RefreshToken).one()
+    assert row.token_hash == hash_token(token)
+    assert row.user_id == test_user.id
+
+
+def test_refresh_rotates_token(client, test_user):
+    """Test that refresh returns a new pair and retires the old token"""
+    first = login(client)["refresh_token"]
+
+    response = refresh(client, first)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["access_token"]
+    assert data["refresh_token"] != first
+
+    me = client.get("/api/seeds", headers={"Authorization": f"Bearer {data['access_token']}"})
+    assert me.status_code == status.HTTP_200_OK
+    assert refresh(client, data["refresh_token"]).status_code == status.HTTP_200_OK
+
+
+def test_reused_refresh_token_revokes_family(client, test_user):
+    """Test that replaying a rotated token revokes its successors too"""
+    first = login(client)["refresh_token"]
+    second = refresh(client, first).json()["refresh_token"]
+
+    reused = refresh(client, first)
+    assert reused.status_code == status.HTTP_401_UNAUTHORIZED
+    assert "reuse" in reused.json()["detail"].lower()
+    assert refresh(client, second).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_expired_or_unknown_refresh_token(client, db_session, test_user):
+    """Test that expired and unknown tokens are rejected"""
+    token = login(client)["refresh_token"]
+    row = db_session.query(RefreshToken).one()
+    row.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+
+    assert refresh(client, token).status_code == status.HTTP_401_UNAUTHORIZED
+    assert refresh(client, "made-up").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_logout_revokes_refresh_token(client, test_user):
+    """Test that logout revokes the token's family"""
+    token = login(client)["refresh_token"]
+    response = client.post("/api/auth/logout", json={"refresh_token": token})
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert refresh(client, token).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_logout_all_revokes_every_session(client, test_user, user_token):
+    """Test that logout-all revokes tokens from every login"""
+    tokens = [login(client)["refresh_token"] for _ in range(2)]
+    response = client.post(
+        "/api/auth/logout-all", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    for token in tokens:
+        assert refresh(client, token).status_code == status.HTTP_401_UNAUTHORIZED
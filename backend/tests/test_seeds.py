@@ -1,5 +1,6 @@
 import pytest
 from fastapi import status
+from app.models.seed import Seed
 
 
 def test_create_seed_as_admin(client, admin_token):
@@ -132,3 +133,47 @@ def test_delete_seed_as_user(client, user_token, test_seed):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_list_serialization_matches_seed_response(client, user_token, test_seed):
+    """Test that the fast list path emits exactly the SeedResponse fields"""
+    from app.schemas.seed import SeedResponse
+
+    response = client.get(
+        "/api/seeds",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/json"
+    item = next(i for i in response.json() if i["id"] == test_seed.id)
+    expected = SeedResponse.model_validate(test_seed).model_dump(mode="json")
+    assert item == expected
+
+
+def test_dump_seed_rows_matches_seed_response_for_aware_datetimes():
+    """Test that timezone-aware timestamps (PostgreSQL) format as pydantic does"""
+    from datetime import datetime, timedelta, timezone
+    import json
+    from app.schemas.seed import SeedResponse
+    from app.utils.serialization import SEED_COLUMNS, dump_seed_rows
+
+    row = (1, "Basil", "Herb", 2.5, 3, None,
+           datetime(2026, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc),
+           datetime(2026, 5, 2, 8, 0, tzinfo=timezone(timedelta(hours=2))))
+    expected = SeedResponse(**dict(zip(SEED_COLUMNS, row))).model_dump(mode="json")
+    assert json.loads(dump_seed_rows([row])) == [expected]
+    assert expected["created_at"].endswith("Z")
+
+
+def test_list_streams_in_chunks(client, user_token, db_session, monkeypatch):
+    """Test that the list endpoint joins chunked fetches into one array"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "DB_STREAM_BATCH_SIZE", 2)
+    db_session.add_all(Seed(name=f"Chunk {i}", category="Test", price=1.0, quantity=1)
+                       for i in range(5))
+    db_session.commit()
+
+    response = client.get(
+        "/api/seeds", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(s["name"] for s in response.json()) == [f"Chunk {i}" for i in range(5)]
@@ -0,0 +1,88 @@
+import pytest
+from app.services.leader import file_lock
+from app.services.shared_state import (
+    LocalStateBackend, SharedStateBackend, SQLiteStateBackend)
+
+
+def test_local_backend_values_and_invalidations():
+    """Test the single-process backend"""
+    state = LocalStateBackend()
+    received = []
+    state.subscribe("catalog", received.append)
+
+    state.set("greeting", {"text": "hi"})
+    assert state.get("greeting") == {"text": "hi"}
+    assert state.incr("hits") == 1
+    assert state.incr("hits", 2) == 3
+    state.delete("greeting")
+    assert state.get("greeting") is None
+
+    state.publish("catalog", "seed:1")
+    assert received == ["seed:1"]
+
+
+def test_sqlite_backend_shared_between_instances(tmp_path):
+    """Test that two workers see each other's values and invalidations"""
+    path = str(tmp_path / "state.db")
+    worker_a = SQLiteStateBackend(path)
+    worker_b = SQLiteStateBackend(path)
+    received_a, received_b = [], []
+    worker_a.subscribe("catalog", received_a.append)
+    worker_b.subscribe("catalog", received_b.append)
+    try:
+        worker_a.set("version", 7)
+        assert worker_b.get("version") == 7
+        assert worker_a.incr("counter") == 1
+        assert worker_b.incr("counter") == 2
+
+        worker_a.publish("catalog", "seed:42")
+        assert received_a == ["seed:42"]
+        assert received_b == []
+        assert worker_b.poll() == 1
+        assert received_b == ["seed:42"]
+        # Own events are not delivered twice
+        assert worker_a.poll() == 0
+        assert received_a == ["seed:42"]
+    finally:
+        worker_a.close()
+        worker_b.close()
+
+
+def test_sqlite_backend_ttl(tmp_path):
+    """Test that expired keys are not returned"""
+    state = SQLiteStateBackend(str(tmp_path / "state.db"))
+    try:
+        state.set("short", "lived", ttl=-1)
+        assert state.get("short") is None
+    finally:
+        state.close()
+
+
+def test_incomplete_backend_cannot_be_created():
+    """Test that a backend missing a method fails when instantiated"""
+    class NoPublish(SharedStateBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl=None):
+            pass
+
+        def delete(self, key):
+            pass
+
+        def incr(self, key, amount=1):
+            return amount
+
+    with pytest.raises(TypeError, match="publish"):
+        NoPublish()
+
+
+def test_file_lock_excludes_second_holder(tmp_path):
+    """Test that only one holder gets the leader lock"""
+    path = str(tmp_path / "startup.lock")
+    with file_lock(path) as leader:
+        assert leader
+        with file_lock(path, blocking=False) as follower:
+            assert not follower
+    with file_lock(path, blocking=False) as next_leader:
+        assert next_leader
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import pytest
+from fastapi import status
+from app.services import catalog as catalog_module
+from app.services.single_flight import SingleFlight
+
+
+def run_concurrently(flight, calls):
+    async def main():
+        return await asyncio.gather(*(flight.do(key, fn) for key, fn in calls),
+                                    return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_identical_calls_share_one_execution():
+    """Test that concurrent calls with one key run the function once"""
+    flight = SingleFlight()
+    runs = []
+
+    def load():
+        runs.append(1)
+        threading.Event().wait(0.05)
+        return b"[]"
+
+    results = run_concurrently(flight, [("list", load)] * 5)
+
+    assert results == [b"[]"] * 5
+    assert len(runs) == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_run_separately():
+    """Test that calls with different keys do not share results"""
+    flight = SingleFlight()
+    results = run_concurrently(flight, [("a", lambda: "a"), ("b", lambda: "b")])
+    assert results == ["a", "b"]
+    assert flight.coalesced == 0
+
+
+def test_errors_reach_every_caller_and_clear_the_flight():
+    """Test that a failed flight raises for all callers and is not reused"""
+    flight = SingleFlight()
+
+    def fail():
+        threading.Event().wait(0.05)
+        raise RuntimeError("database is down")
+
+    results = run_concurrently(flight, [("list", fail)] * 3)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert run_concurrently(flight, [("list", lambda: "ok")]) == ["ok"]
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    """Test that followers still get the result if the leader goes away"""
+    flight = SingleFlight()
+
+    async def main():
+        release = threading.Event()
+        leader = asyncio.ensure_future(flight.do("list", lambda: release.wait(1) and "rows"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("list", lambda: "other"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        release.set()
+        return await follower
+
+    assert asyncio.run(main()) == "rows"
+
+
+def test_catalog_change_starts_a_new_flight(client, admin_token, test_seed):
+    """Test that a committed change moves list requests to a new key"""
+    before = catalog_module._generation
+    response = client.post(
+        f"/api/seeds/{test_seed.id}/restock",
+        json={"quantity": 5},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert catalog_module._generation > before
+
+
+def test_search_params_are_normalized():
+    """Test that searches differing only in ASCII case share a key"""
+    assert catalog_module._optional_text("Sun") == catalog_module._optional_text("sUN")
+    assert catalog_module._optional_text("") is None
+    assert catalog_module._optional_price(10) == catalog_module._optional_price(10.0)
+
+
+def test_catalog_flights_report(client, user_token, test_seed):
+    """Test the coalescing metrics endpoint"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    assert client.get("/api/seeds", headers=headers).status_code == status.HTTP_200_OK
+    stats = client.get("/health/catalog-flights").json()
+    assert stats["flights"] >= 1
+    assert {"coalesced", "in_flight", "coalesced_ratio"} <= stats.keys()
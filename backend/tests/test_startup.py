@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import app.main as main_module
+from app.database import init_db, get_schema_version, SCHEMA_VERSION
+from app.models.meta import get_meta
+from app.models.seed import Seed
+from app import seed_data
+from app.config import settings
+from app.seed_data import DEFAULT_SEEDS_MARKER
+from app.services.jobs import run_pending
+
+
+@pytest.fixture
+def fresh_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_init_db_skips_create_all_when_schema_current(fresh_engine):
+    """Test that create_all only runs when the schema version changes"""
+    assert get_schema_version(fresh_engine) is None
+    assert init_db(fresh_engine) is True
+    assert get_schema_version(fresh_engine) == SCHEMA_VERSION
+    assert init_db(fresh_engine) is False
+
+
+def test_default_seeding_runs_once(fresh_engine, monkeypatch):
+    """Test that default seeding is one-shot even if the catalog is emptied"""
+    Session = sessionmaker(bind=fresh_engine)
+    monkeypatch.setattr(main_module, "SessionLocal", Session)
+    monkeypatch.setattr(main_module, "init_db", lambda: init_db(fresh_engine))
+
+    main_module.run_startup_tasks()
+    assert run_pending(Session) == 1  # the queued seeding job
+    db = Session()
+    try:
+        assert db.query(Seed).count() > 0
+        assert get_meta(db, DEFAULT_SEEDS_MARKER) == "1"
+        db.query(Seed).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    main_module.run_startup_tasks()
+    assert run_pending(Session) == 0
+    db = Session()
+    try:
+        assert db.query(Seed).count() == 0
+    finally:
+        db.close()
+
+
+def test_failed_default_seeding_is_retried(fresh_engine, monkeypatch):
+    """Test that seeding is only recorded once it commits"""
+    Session = sessionmaker(bind=fresh_engine)
+    monkeypatch.setattr(main_module, "SessionLocal", Session)
+    monkeypatch.setattr(main_module, "init_db", lambda: init_db(fresh_engine))
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 1)
+    monkeypatch.setattr(seed_data, "DEFAULT_SEEDS", [{"name": "Broken"}])
+
+    main_module.run_startup_tasks()
+    assert run_pending(Session) == 1  # fails: no category or price
+    db = Session()
+    try:
+        assert get_meta(db, DEFAULT_SEEDS_MARKER) is None
+    finally:
+        db.close()
+
+    monkeypatch.undo()
+    monkeypatch.setattr(main_module, "SessionLocal", Session)
+    monkeypatch.setattr(main_module, "init_db", lambda: init_db(fresh_engine))
+    main_module.run_startup_tasks()
+    assert run_pending(Session) == 1
+    db = Session()
+    try:
+        assert db.query(Seed).count() == len(seed_data.DEFAULT_SEEDS)
+        assert get_meta(db, DEFAULT_SEEDS_MARKER) == "1"
+    finally:
+        db.close()
+
+
+def test_default_seeding_inline_without_job_runner(fresh_engine, monkeypatch):
+    """Test that seeding does not wait for a job runner that never starts"""
+    Session = sessionmaker(bind=fresh_engine)
+    monkeypatch.setattr(main_module, "SessionLocal", Session)
+    monkeypatch.setattr(main_module, "init_db", lambda: init_db(fresh_engine))
+    monkeypatch.setattr(settings, "JOB_RUNNER", False)
+
+    main_module.run_startup_tasks()
+    db = Session()
+    try:
+        assert db.query(Seed).count() == len(seed_data.DEFAULT_SEEDS)
+        assert get_meta(db, DEFAULT_SEEDS_MARKER) == "1"
+    finally:
+        db.close()
+
+
+def test_startup_report(client):
+    """Test the startup profiler endpoint"""
+    client.get("/health")
+    data = client.get("/health/startup").json()
+    assert data["ready_ms"] is not None
+    assert data["first_request_ms"] is not None
+    assert {"init_db", "default_seeds"} <= {p["name"] for p in data["phases"]}
@@ -0,0 +1,134 @@
+import pytest
+from fastapi import status
+from sqlalchemy import select
+from app import database
+from app.config import settings
+from app.database import ShardRouter
+from app.models.store import StockOutbox, StoreRollupCursor
+from app.services.stores import StoreInventory, drain_all, drain_outbox
+from app.utils.auth import create_access_token, verify_token
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    """Two stores, each with a shard in a temporary directory"""
+    monkeypatch.setattr(settings, "STORES", "north,south")
+    router = ShardRouter(["north", "south"], str(tmp_path))
+    monkeypatch.setattr(database, "shard_router", router)
+    yield router
+    router.dispose()
+
+
+def store_token(user, store_id):
+    return create_access_token(
+        data={"sub": user.id, "email": user.email, "role": user.role, "store": store_id})
+
+
+def join_store(db_session, user, store_id):
+    user.store_id = store_id
+    db_session.commit()
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_admin_assigns_store_membership(client, router, admin_token):
+    """Test that only admins choose a user's store, which tokens then carry"""
+    response = client.post("/api/auth/register", json={
+        "email": "shopper@example.com", "password": "password123", "store_id": "south"})
+    assert response.status_code == status.HTTP_201_CREATED
+    token = response.json()["access_token"]
+    assert "store" not in verify_token(token)  # chosen at signup: ignored
+    user_id = int(verify_token(token)["sub"])
+    url = f"/api/admin/users/{user_id}/store"
+
+    assert client.put(url, json={"store_id": "south"},
+                      headers=auth(token)).status_code == status.HTTP_403_FORBIDDEN
+    assert client.put(url, json={"store_id": "east"},
+                      headers=auth(admin_token)).status_code == status.HTTP_400_BAD_REQUEST
+    response = client.put(url, json={"store_id": "south"}, headers=auth(admin_token))
+    assert response.json()["store_id"] == "south"
+    response = client.post("/api/auth/login", json={
+        "email": "shopper@example.com", "password": "password123"})
+    assert verify_token(response.json()["access_token"])["store"] == "south"
+
+
+def test_store_purchase_flow(client, router, test_user, admin_token, test_seed, db_session):
+    """Test restock, purchase and stock in one store's shard"""
+    url = f"/api/stores/north/seeds/{test_seed.id}"
+    response = client.post(f"{url}/restock", json={"quantity": 2}, headers=auth(admin_token))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"store_id": "north", "seed_id": test_seed.id, "quantity": 2}
+
+    join_store(db_session, test_user, "north")
+    token = store_token(test_user, "north")
+    assert client.post(f"{url}/purchase", headers=auth(token)).json()["quantity"] == 1
+    assert client.post(f"{url}/purchase", headers=auth(token)).json()["quantity"] == 0
+    assert client.post(f"{url}/purchase", headers=auth(token)).status_code == 400
+    opened = []
+    session = router.session
+    router.session = lambda store_id, write=True: opened.append(write) or session(store_id, write)
+    stock = client.get("/api/stores/north/stock", headers=auth(token)).json()
+    assert stock == [{"store_id": "north", "seed_id": test_seed.id, "quantity": 0}]
+    assert opened == [False]  # read on the shard's reader, not its writer
+
+    # The global catalog is untouched
+    db_session.refresh(test_seed)
+    assert test_seed.quantity == 100
+
+
+def test_store_access_rules(client, router, test_user, user_token, admin_token, test_seed,
+                            db_session):
+    """Test that users only reach their own store"""
+    url = f"/api/stores/south/seeds/{test_seed.id}/purchase"
+    # A forged or stale claim is not membership
+    assert client.post(url, headers=auth(store_token(test_user, "south"))).status_code == 403
+    join_store(db_session, test_user, "north")
+    assert client.post(url, headers=auth(store_token(test_user, "north"))).status_code == 403
+    assert client.post(url, headers=auth(user_token)).status_code == 403
+    join_store(db_session, test_user, "south")
+    assert client.post(url, headers=auth(store_token(test_user, "south"))).status_code == 404
+    assert client.get("/api/stores/east/stock", headers=auth(admin_token)).status_code == 404
+    response = client.post("/api/stores/south/seeds/9999/restock", json={"quantity": 1},
+                           headers=auth(admin_token))
+    assert response.status_code == 404
+    response = client.post(f"/api/stores/south/seeds/{test_seed.id}/restock",
+                           json={"quantity": 1}, headers=auth(store_token(test_user, "south")))
+    assert response.status_code == 403
+
+
+def test_rollup_totals(client, router, user_token, db_session):
+    """Test that outboxes roll up into cross-store totals exactly once"""
+    north = StoreInventory("north", router.session("north"))
+    south = StoreInventory("south", router.session("south"))
+    north.restock(1, 10)
+    south.restock(1, 5)
+    south.restock(2, 3)
+    for _ in range(4):
+        north.purchase(1)
+    south.purchase(2)
+
+    assert drain_all(router, TestingSessionLocal) == 8
+    assert drain_all(router, TestingSessionLocal) == 0
+    response = client.get("/api/stores/stock-totals", headers=auth(user_token))
+    assert response.json() == [{"seed_id": 1, "quantity": 11}, {"seed_id": 2, "quantity": 2}]
+
+    # An entry left behind by a crash after the totals commit is not re-applied
+    cursor = db_session.execute(select(StoreRollupCursor.last_outbox_id).where(
+        StoreRollupCursor.store_id == "north")).scalar()
+    shard = router.session("north")
+    shard.add(StockOutbox(id=cursor, seed_id=1, delta=-1))
+    shard.commit()
+    assert drain_outbox(router, "north", TestingSessionLocal) == 0
+    assert shard.execute(select(StockOutbox)).all() == []
+    shard.close()
+
+    north.purchase(1)
+    drain_all(router, TestingSessionLocal)
+    db_session.expire_all()
+    response = client.get("/api/stores/stock-totals?ids=1", headers=auth(user_token))
+    assert response.json() == [{"seed_id": 1, "quantity": 10}]
+    north.db.close()
+    south.db.close()
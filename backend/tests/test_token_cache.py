@@ -0,0 +1,84 @@
+import time
+import pytest
+from datetime import timedelta
+from app.config import settings
+from app.utils import auth
+from app.utils.auth import create_access_token, token_cache, verify_token
+from app.utils.token_cache import InvalidToken, TokenCache, decode_hmac
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+def test_verified_token_is_served_from_cache(monkeypatch):
+    """Test that a repeat token skips decoding"""
+    token = create_access_token({"sub": "1"})
+    assert verify_token(token)["sub"] == "1"
+    hits = token_cache.hits
+
+    monkeypatch.setattr(auth, "_decode_token", lambda t: pytest.fail("decoded again"))
+    assert verify_token(token)["sub"] == "1"
+    assert token_cache.hits == hits + 1
+
+
+def test_rejected_token_is_negatively_cached(monkeypatch):
+    """Test that a bad token is rejected from cache on repeat"""
+    assert verify_token("not.a.token") is None
+    negative_hits = token_cache.negative_hits
+
+    monkeypatch.setattr(auth, "_decode_token", lambda t: pytest.fail("decoded again"))
+    assert verify_token("not.a.token") is None
+    assert token_cache.negative_hits == negative_hits + 1
+
+
+def test_entries_expire_before_token_exp():
+    """Test that payloads are dropped expiry_margin seconds before exp"""
+    cache = TokenCache(maxsize=10, expiry_margin=5)
+    cache.store(b"soon", {"exp": time.time() + 3})
+    cache.store(b"later", {"exp": time.time() + 60})
+    assert cache.lookup(b"soon") is None
+    assert cache.lookup(b"later") is not None
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache stays within maxsize"""
+    cache = TokenCache(maxsize=2)
+    exp = time.time() + 60
+    cache.store(b"a", {"exp": exp})
+    cache.store(b"b", {"exp": exp})
+    cache.lookup(b"a")
+    cache.store(b"c", {"exp": exp})
+    assert cache.lookup(b"b") is None
+    assert cache.lookup(b"a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_hmac_backend_matches_jose(monkeypatch):
+    """Test that the stdlib verifier accepts and rejects like jose"""
+    token = create_access_token({"sub": "7", "role": "user"})
+    payload = decode_hmac(token, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+    assert payload["sub"] == "7"
+
+    with pytest.raises(InvalidToken):
+        decode_hmac(token, "wrong-secret", settings.JWT_ALGORITHM)
+    expired = create_access_token({"sub": "7"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(InvalidToken):
+        decode_hmac(expired, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+
+    monkeypatch.setattr(settings, "JWT_BACKEND", "hmac")
+    assert verify_token(token)["role"] == "user"
+    assert verify_token(expired) is None
+
+
+def test_token_cache_report(client, user_token):
+    """Test the cache hit rate endpoint"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    client.get("/api/seeds", headers=headers)
+    client.get("/api/seeds", headers=headers)
+    stats = client.get("/health/token-cache").json()
+    assert stats["hits"] >= 1
+    assert 0 < stats["hit_rate"] <= 1